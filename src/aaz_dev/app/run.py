@@ -94,6 +94,46 @@ def is_port_in_use(host, port):
     expose_value=False,
     help="The folder to load and save workspaces."
 )
+@click.option(
+    "--no-swagger-cache",
+    is_flag=True,
+    default=False,
+    callback=Config.validate_and_setup_no_swagger_cache,
+    expose_value=False,
+    help="Disable the cache of parsed swagger files under the aaz-dev folder."
+)
+@click.option(
+    "--pruned-swagger-loading/--full-swagger-loading",
+    default=Config.SWAGGER_PRUNED_LOADING,
+    callback=Config.validate_and_setup_swagger_pruned_loading,
+    expose_value=False,
+    help="Only load the parts of swagger files reachable from the selected resources when generating commands."
+)
+@click.option(
+    "--generation-workers",
+    type=int,
+    default=Config.COMMAND_GENERATION_WORKERS,
+    callback=Config.validate_and_setup_command_generation_workers,
+    expose_value=False,
+    help="The number of processes to generate the commands of resources added together, 0 to use all the cpus, "
+         "1 to generate them one by one."
+)
+@click.option(
+    "--profile",
+    is_flag=True,
+    default=False,
+    callback=Config.validate_and_setup_profile,
+    expose_value=False,
+    help="Time the phases of command generation, the trace is appended into AAZ_PROFILE_TRACE_FILE or a file under "
+         "the aaz-dev folder."
+)
+@click.option(
+    "--git-change-detection/--no-git-change-detection",
+    default=Config.GIT_CHANGE_DETECTION,
+    callback=Config.validate_and_setup_git_change_detection,
+    expose_value=False,
+    help="Detect the changed swagger files by git commands instead of checking the stat of every file."
+)
 @click.option(
     "--reload/--no-reload",
     default=None,
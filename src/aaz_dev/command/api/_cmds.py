@@ -74,17 +74,34 @@ def resource_id_type(value):
     required=True,
     help="Swagger tag with input files."
 )
+@click.option(
+    "--no-swagger-cache",
+    is_flag=True,
+    default=False,
+    callback=Config.validate_and_setup_no_swagger_cache,
+    expose_value=False,
+    help="Disable the cache of parsed swagger files under the aaz-dev folder."
+)
+@click.option(
+    "--profile",
+    is_flag=True,
+    default=False,
+    callback=Config.validate_and_setup_profile,
+    expose_value=False,
+    help="Time the phases of command generation, the trace is appended into AAZ_PROFILE_TRACE_FILE or a file under "
+         "the aaz-dev folder."
+)
 @click.option(
     "--workspace-path",
     help="The path to export the workspace for modification."
 )
 def generate_command_models_from_swagger(swagger_tag, workspace_path=None):
     from swagger.controller.specs_manager import SwaggerSpecsManager
+    from command.controller.batch_generator import build_tag_version_resources, fill_default_help
     from command.controller.specs_manager import AAZSpecsManager
     from command.controller.workspace_manager import WorkspaceManager
     from utils.config import Config
     from utils.exceptions import InvalidAPIUsage
-    from command.model.configuration import CMDHelp
 
     try:
         swagger_specs = SwaggerSpecsManager()
@@ -93,31 +110,14 @@ def generate_command_models_from_swagger(swagger_tag, workspace_path=None):
         module_manager = swagger_specs.get_module_manager(Config.DEFAULT_PLANE, Config.DEFAULT_SWAGGER_MODULE)
         rp = module_manager.get_openapi_resource_provider(Config.DEFAULT_RESOURCE_PROVIDER)
 
-        resource_map = rp.get_resource_map_by_tag(swagger_tag)
-        if not resource_map:
-            raise InvalidAPIUsage(f"Tag `{swagger_tag}` is not exist")
-
-        version_resource_map = {}
-        for resource_id, version_map in resource_map.items():
-            v_list = [v for v in version_map]
-            if len(v_list) > 1:
-                raise InvalidAPIUsage(f"Tag `{swagger_tag}` contains multiple api versions of one resource", payload={
-                    "Resource": resource_id,
-                    "versions": v_list,
-                })
-            v = v_list[0]
-            if v not in version_resource_map:
-                version_resource_map[v] = []
-            version_resource_map[v].append({
-                "id": resource_id
-            })
+        version_resource_map = build_tag_version_resources(rp, swagger_tag)
 
         mod_names = Config.DEFAULT_SWAGGER_MODULE.split('/')
         ws = WorkspaceManager.new(
             name=Config.DEFAULT_SWAGGER_MODULE,
             plane=Config.DEFAULT_PLANE,
             folder=workspace_path or WorkspaceManager.IN_MEMORY,  # if workspace path exist, use workspace else use in memory folder
-            mod_names=mod_names,
+            mod_names=Config.DEFAULT_SWAGGER_MODULE,
             resource_provider=rp.name,
             swagger_manager=swagger_specs,
             aaz_manager=aaz_specs,
@@ -129,19 +129,7 @@ def generate_command_models_from_swagger(swagger_tag, workspace_path=None):
             )
 
         # provide default short summary
-        for node in ws.iter_command_tree_nodes():
-            if not node.help:
-                node.help = CMDHelp()
-            if not node.help.short:
-                node.help.short = f"Manage {node.names[-1]}"
-
-        for leaf in ws.iter_command_tree_leaves():
-            if not leaf.help:
-                leaf.help = CMDHelp()
-            if not leaf.help.short:
-                n = leaf.names[-1]
-                n = n[0].upper() + n[1:]
-                leaf.help.short = f"{n} {leaf.names[-2]}"
+        fill_default_help(ws)
 
         if not ws.is_in_memory:
             ws.save()
@@ -156,6 +144,104 @@ def generate_command_models_from_swagger(swagger_tag, workspace_path=None):
         sys.exit(1)
 
 
+@bp.cli.command("generate-from-swagger-batch", short_help="Generate command models of many resource providers into aaz from swagger specs")
+@click.option(
+    "--swagger-path", '-s',
+    type=click.Path(file_okay=False, dir_okay=True, readable=True, resolve_path=True),
+    default=Config.SWAGGER_PATH,
+    required=not Config.SWAGGER_PATH,
+    callback=Config.validate_and_setup_swagger_path,
+    expose_value=False,
+    help="The local path of azure-rest-api-specs repo. Official repo is https://github.com/Azure/azure-rest-api-specs"
+)
+@click.option(
+    "--aaz-path", '-a',
+    type=click.Path(file_okay=False, dir_okay=True, writable=True, readable=True, resolve_path=True),
+    default=Config.AAZ_PATH,
+    required=not Config.AAZ_PATH,
+    callback=Config.validate_and_setup_aaz_path,
+    expose_value=False,
+    help="The local path of aaz repo."
+)
+@click.option(
+    "--module", '-m', "module_names",
+    multiple=True,
+    required=True,
+    help="The names of swagger modules, `all` for all the modules of management plane."
+)
+@click.option(
+    "--resource-provider", "--rp", "rp_names",
+    multiple=True,
+    help="The names of resource providers to generate, all the resource providers of modules by default."
+)
+@click.option(
+    "--swagger-tag", "--tag",
+    help="Swagger tag with input files, the latest tag of every resource provider by default. "
+         "The resource providers without the tag are skipped."
+)
+@click.option(
+    "--workers", '-w',
+    type=int,
+    default=1,
+    help="The number of resource providers generated concurrently."
+)
+@click.option(
+    "--checkpoint-file",
+    type=click.Path(file_okay=True, dir_okay=False, resolve_path=True),
+    help="The file to record the generated resource providers, so that an interrupted run can be resumed. "
+         "Default to a file under the aaz-dev folder."
+)
+@click.option(
+    "--restart",
+    is_flag=True,
+    default=False,
+    help="Ignore the resource providers recorded in checkpoint file and generate all of them again."
+)
+@click.option(
+    "--no-swagger-cache",
+    is_flag=True,
+    default=False,
+    callback=Config.validate_and_setup_no_swagger_cache,
+    expose_value=False,
+    help="Disable the cache of parsed swagger files under the aaz-dev folder."
+)
+@click.option(
+    "--profile",
+    is_flag=True,
+    default=False,
+    callback=Config.validate_and_setup_profile,
+    expose_value=False,
+    help="Time the phases of command generation, the trace is appended into AAZ_PROFILE_TRACE_FILE or a file under "
+         "the aaz-dev folder."
+)
+def generate_command_models_from_swagger_batch(module_names, rp_names, swagger_tag, workers, checkpoint_file, restart):
+    from command.controller.batch_generator import SwaggerBatchGenerator
+    from utils.exceptions import InvalidAPIUsage
+
+    if not checkpoint_file:
+        checkpoint_file = os.path.join(Config.AAZ_DEV_FOLDER, "generate-from-swagger-batch.json")
+    if restart and os.path.exists(checkpoint_file):
+        os.remove(checkpoint_file)
+
+    try:
+        generator = SwaggerBatchGenerator(checkpoint_path=checkpoint_file, workers=workers)
+        results = generator.generate(module_names, rp_names=rp_names, swagger_tag=swagger_tag)
+    except InvalidAPIUsage as err:
+        logger.error(err)
+        sys.exit(1)
+    except ValueError as err:
+        logger.error(err)
+        sys.exit(1)
+
+    failed = [key for key, result in results.items() if result['status'] == SwaggerBatchGenerator.Status.Failed]
+    logger.info(f"Generated {len(results) - len(failed)} resource providers, {len(failed)} failed. "
+                f"Checkpoint: {checkpoint_file}")
+    if failed:
+        for key in failed:
+            logger.error(f"Failed resource provider: {key} : {results[key]['error']}")
+        sys.exit(1)
+
+
 @bp.cli.command("verify", short_help="Verify data consistency within `aaz` repository.")
 @click.option(
     "--aaz-path", "-a",
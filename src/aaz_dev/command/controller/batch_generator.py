@@ -0,0 +1,220 @@
+import json
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from command.model.configuration import CMDHelp
+from swagger.controller.specs_manager import SwaggerSpecsManager
+from swagger.model.specs import OpenAPIResourceProvider
+from swagger.utils.source import SourceTypeEnum
+from utils import exceptions
+from utils.config import Config
+from .specs_manager import AAZSpecsManager
+from .workspace_manager import WorkspaceManager
+
+logger = logging.getLogger('backend')
+
+
+def build_tag_version_resources(rp, swagger_tag):
+    """Return the resources of a swagger tag grouped by api versions."""
+    resource_map = rp.get_resource_map_by_tag(swagger_tag)
+    if not resource_map:
+        raise exceptions.InvalidAPIUsage(f"Tag `{swagger_tag}` is not exist")
+
+    version_resource_map = {}
+    for resource_id, version_map in resource_map.items():
+        v_list = [v for v in version_map]
+        if len(v_list) > 1:
+            raise exceptions.InvalidAPIUsage(
+                f"Tag `{swagger_tag}` contains multiple api versions of one resource", payload={
+                    "Resource": resource_id,
+                    "versions": v_list,
+                })
+        v = v_list[0]
+        if v not in version_resource_map:
+            version_resource_map[v] = []
+        version_resource_map[v].append({
+            "id": resource_id
+        })
+    return version_resource_map
+
+
+def fill_default_help(ws):
+    """Provide default short summaries for the command groups and commands in workspace."""
+    for node in ws.iter_command_tree_nodes():
+        if not node.help:
+            node.help = CMDHelp()
+        if not node.help.short:
+            node.help.short = f"Manage {node.names[-1]}"
+
+    for leaf in ws.iter_command_tree_leaves():
+        if not leaf.help:
+            leaf.help = CMDHelp()
+        if not leaf.help.short:
+            n = leaf.names[-1]
+            n = n[0].upper() + n[1:]
+            leaf.help.short = f"{n} {leaf.names[-2]}"
+
+
+class SwaggerBatchGenerator:
+    """Generate the command models of many resource providers from swagger into aaz.
+
+    The swagger and aaz specs managers are shared by all the resource providers. The draft commands of resource
+    providers are generated concurrently, while the workspaces are merged into aaz specs one by one. The result of
+    every resource provider is written into the checkpoint file once it's finished, so a run interrupted is resumed
+    by skipping the resource providers already generated or skipped with the same swagger tag option.
+    """
+
+    CHECKPOINT_VERSION = 1
+
+    class Status:
+        Succeeded = "succeeded"
+        Failed = "failed"
+        Skipped = "skipped"
+
+    def __init__(self, checkpoint_path=None, workers=1, swagger_specs=None, aaz_specs=None):
+        self.checkpoint_path = checkpoint_path
+        self.workers = max(1, workers)
+        self.swagger_specs = swagger_specs or SwaggerSpecsManager()
+        self.aaz_specs = aaz_specs or AAZSpecsManager()
+        self._aaz_lock = threading.Lock()
+        self._checkpoint_lock = threading.Lock()
+        self._results = self._load_checkpoint()
+
+    @property
+    def results(self):
+        with self._checkpoint_lock:
+            return dict(self._results)
+
+    def iter_resource_providers(self, module_names, rp_names=None):
+        """Yield the module name and openapi resource providers of the modules, 'all' for all the modules."""
+        if "all" in module_names:
+            module_names = ['/'.join(module.names) for module in self.swagger_specs.get_modules(Config.DEFAULT_PLANE)]
+        for module_name in module_names:
+            module_manager = self.swagger_specs.get_module_manager(Config.DEFAULT_PLANE, module_name.split('/'))
+            for rp in module_manager.get_resource_providers():
+                if not isinstance(rp, OpenAPIResourceProvider):
+                    continue
+                if rp_names and rp.name not in rp_names:
+                    continue
+                yield module_name, rp
+
+    def generate(self, module_names, rp_names=None, swagger_tag=None):
+        """Generate the resource providers of modules, return the results of this run keyed by `module/rp`."""
+        jobs = []
+        for module_name, rp in self.iter_resource_providers(module_names, rp_names=rp_names):
+            key = self.get_key(module_name, rp)
+            result = self.results.get(key, None)
+            if result is not None and result['status'] != self.Status.Failed and \
+                    result.get('swaggerTag', None) == swagger_tag:
+                logger.info(f"Skip generated resource provider: {key}")
+                continue
+            jobs.append((module_name, rp))
+
+        results = {}
+        if self.workers > 1 and len(jobs) > 1:
+            with ThreadPoolExecutor(max_workers=self.workers) as executor:
+                futures = [executor.submit(self._generate_job, module_name, rp, swagger_tag)
+                           for module_name, rp in jobs]
+                for (module_name, rp), future in zip(jobs, futures):
+                    results[self.get_key(module_name, rp)] = future.result()
+        else:
+            for module_name, rp in jobs:
+                results[self.get_key(module_name, rp)] = self._generate_job(module_name, rp, swagger_tag)
+        return results
+
+    @staticmethod
+    def get_key(module_name, rp):
+        return f"{module_name}/{rp.name}"
+
+    def generate_resource_provider(self, module_name, rp, swagger_tag):
+        version_resource_map = build_tag_version_resources(rp, swagger_tag)
+        mod_names = module_name.split('/')
+        with self._aaz_lock:
+            ws = WorkspaceManager.new(
+                name=module_name,
+                plane=Config.DEFAULT_PLANE,
+                folder=WorkspaceManager.IN_MEMORY,
+                mod_names=module_name,
+                resource_provider=rp.name,
+                swagger_manager=self.swagger_specs,
+                aaz_manager=self.aaz_specs,
+                source=SourceTypeEnum.OpenAPI,
+                # the processes of command generation are shared by the resource providers generated concurrently
+                generation_workers=max(1, Config.COMMAND_GENERATION_WORKERS // self.workers),
+            )
+        # the drafts are generated without the aaz specs, which are changed by the other resource providers
+        drafts = [
+            ws.create_draft_command_groups_by_swagger(mod_names=mod_names, version=version, resources=resources)
+            for version, resources in version_resource_map.items()
+        ]
+        with self._aaz_lock:
+            for swagger_resources, resource_options, command_groups in drafts:
+                ws.add_draft_command_groups(swagger_resources, resource_options, command_groups)
+            fill_default_help(ws)
+            ws.generate_to_aaz()
+
+    def _generate_job(self, module_name, rp, swagger_tag):
+        key = self.get_key(module_name, rp)
+        tag = None
+        try:
+            tag = self._select_tag(rp, swagger_tag)
+            if tag is None:
+                logger.warning(f"Skip resource provider without swagger tag: {key}")
+                result = {"status": self.Status.Skipped}
+            else:
+                self.generate_resource_provider(module_name, rp, tag)
+                logger.info(f"Generated resource provider: {key} : {tag}")
+                result = {"status": self.Status.Succeeded, "tag": tag}
+        except Exception as err:
+            # the failed resource provider is generated again when the run is resumed
+            logger.exception(f"Failed to generate resource provider: {key} : {tag} : {err}")
+            result = {"status": self.Status.Failed, "tag": tag, "error": str(err) or err.__class__.__name__}
+        # the result is reused only by the runs of the same swagger tag option
+        result["swaggerTag"] = swagger_tag
+        self._save_result(key, result)
+        return result
+
+    @staticmethod
+    def _select_tag(rp, swagger_tag):
+        tags = [str(tag) for tag in rp.tags]
+        if swagger_tag:
+            return swagger_tag if swagger_tag in tags else None
+        # the tags are ordered by date from latest
+        return tags[0] if tags else None
+
+    def _load_checkpoint(self):
+        if not self.checkpoint_path or not os.path.isfile(self.checkpoint_path):
+            return {}
+        try:
+            with open(self.checkpoint_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError) as err:
+            logger.warning(f"InvalidCheckpointFile: {self.checkpoint_path} : {err}")
+            return {}
+        if data.get('version', None) != self.CHECKPOINT_VERSION:
+            return {}
+        return data.get('resourceProviders', {})
+
+    def _save_result(self, key, result):
+        with self._checkpoint_lock:
+            self._results[key] = result
+            if not self.checkpoint_path:
+                return
+            data = {
+                "version": self.CHECKPOINT_VERSION,
+                "resourceProviders": self._results,
+            }
+            # the checkpoint only saves the work of an interrupted run, so the failure doesn't stop the batch
+            tmp_path = f"{self.checkpoint_path}.{os.getpid()}.tmp"
+            try:
+                if os.path.dirname(self.checkpoint_path):
+                    os.makedirs(os.path.dirname(self.checkpoint_path), exist_ok=True)
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    json.dump(data, f, indent=2, ensure_ascii=False)
+                os.replace(tmp_path, self.checkpoint_path)
+            except OSError as err:
+                logger.warning(f"SaveCheckpointFailed: {self.checkpoint_path} : {err}")
+                if os.path.isfile(tmp_path):
+                    os.remove(tmp_path)
@@ -807,6 +807,24 @@ class CfgReader:
                 return (_parent, _schema, _schema_idx), False
             return None, False
 
+        for match in cls._iter_schema_in_operations(operations, schema_filter):
+            yield match
+
+    @classmethod
+    def find_schema_in_operations(cls, operations, schema):
+        """Return the `(parent, schema, schema_idx)` of the schema instance, or None if it's not in operations."""
+        def schema_filter(_parent, _schema, _schema_idx):
+            if _schema is schema:
+                return (_parent, _schema, _schema_idx), True
+            return None, False
+
+        for parent, match, schema_idx in cls._iter_schema_in_operations(operations, schema_filter):
+            if match is not None:
+                return parent, match, schema_idx
+        return None
+
+    @classmethod
+    def _iter_schema_in_operations(cls, operations, schema_filter):
         for op in operations:
             if isinstance(op, CMDHttpOperation):
                 if op.http.request:
@@ -7,6 +7,7 @@ from command.model.configuration import *
 from utils import exceptions
 from utils.base64 import b64encode_str
 from utils.case import to_camel_case
+from utils.profiler import span
 from .cfg_reader import CfgReader
 from .workspace_helper import ArgumentUpdateMixin
 
@@ -58,7 +59,8 @@ class WorkspaceCfgEditor(CfgReader, ArgumentUpdateMixin):
         cfg.resources = resources
         cfg.command_groups = command_groups
         cfg_editor = cls(cfg)
-        cfg_editor.reformat()
+        with span("reformat"):
+            cfg_editor.reformat()
         return cfg_editor
 
     def __init__(self, cfg, deleted=False):
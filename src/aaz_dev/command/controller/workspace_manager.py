@@ -5,16 +5,18 @@ import shutil
 from datetime import datetime
 
 from command.model.configuration import CMDHelp, CMDResource, CMDCommandExample, CMDArg, CMDCommand, \
-    CMDBuildInVariants, CMDHttpOperation
+    CMDBuildInVariants, CMDHttpOperation, CMDCommandGroup
 from command.model.editor import CMDEditorWorkspace, CMDCommandTreeNode, CMDCommandTreeLeaf
 from swagger.controller.example_generator import ExampleGenerator
 from swagger.controller.command_generator import SwaggerCommandGenerator, TypespecCommandGenerator
+from swagger.controller.parallel_generator import generate_draft_command_groups
 from swagger.controller.specs_manager import SwaggerSpecsManager
 from swagger.utils.exceptions import InvalidSwaggerValueError
 from utils import exceptions
 from utils.config import Config
 from utils.plane import PlaneEnum
 from utils.base64 import b64encode_str
+from utils.profiler import span
 from .specs_manager import AAZSpecsManager
 from .workspace_cfg_editor import WorkspaceCfgEditor, build_endpoint_selector_for_client_config
 from .workspace_client_cfg_editor import WorkspaceClientCfgEditor
@@ -68,7 +70,7 @@ class WorkspaceManager:
         manager.inherit_client_cfg_from_spec()
         return manager
 
-    def __init__(self, name, folder=None, aaz_manager=None, swagger_manager=None):
+    def __init__(self, name, folder=None, aaz_manager=None, swagger_manager=None, generation_workers=None):
         self.name = name
         if not folder:
             if not Config.AAZ_DEV_WORKSPACE_FOLDER or os.path.exists(Config.AAZ_DEV_WORKSPACE_FOLDER) and not os.path.isdir(Config.AAZ_DEV_WORKSPACE_FOLDER):
@@ -90,6 +92,8 @@ class WorkspaceManager:
 
         self._aaz_specs = aaz_manager
         self._swagger_specs = swagger_manager
+        # the number of processes to generate draft commands, `Config.COMMAND_GENERATION_WORKERS` by default
+        self.generation_workers = generation_workers
         self._swagger_command_generator = None
         
         self._typespec_command_generator = None
@@ -108,7 +112,7 @@ class WorkspaceManager:
     @property
     def swagger_specs(self):
         if not self._swagger_specs:
-            self._swagger_specs = SwaggerSpecsManager()
+            self._swagger_specs = SwaggerSpecsManager.shared()
         return self._swagger_specs
 
     @property
@@ -126,7 +130,8 @@ class WorkspaceManager:
     @property
     def swagger_example_generator(self):
         if not self._swagger_example_generator:
-            self._swagger_example_generator = ExampleGenerator()
+            # the swagger models loaded by the command generator are reused
+            self._swagger_example_generator = ExampleGenerator(command_generator=self.swagger_command_generator)
 
         return self._swagger_example_generator
 
@@ -528,13 +533,15 @@ class WorkspaceManager:
         # load swagger resource
         cmd_operation_ids = {op.operation_id: op for op in command.operations}
         self.swagger_example_generator.load_examples(swagger_resources)
-
-        examples = self.swagger_example_generator.create_draft_examples_by_swagger(
-            swagger_resources,
-            command,
-            cmd_operation_ids,
-            cmd_name
-        )
+        try:
+            examples = self.swagger_example_generator.create_draft_examples_by_swagger(
+                swagger_resources,
+                command,
+                cmd_operation_ids,
+                cmd_name
+            )
+        finally:
+            self.swagger_example_generator.release_examples(swagger_resources)
 
         return examples
 
@@ -605,6 +612,17 @@ class WorkspaceManager:
         return new_name
 
     def add_new_resources_by_swagger(self, mod_names, version, resources):
+        with span("add_new_resources_by_swagger", version=version):
+            swagger_resources, resource_options, command_groups = self.create_draft_command_groups_by_swagger(
+                mod_names, version, resources)
+            self.add_draft_command_groups(swagger_resources, resource_options, command_groups)
+
+    def create_draft_command_groups_by_swagger(self, mod_names, version, resources):
+        """Generate the draft command groups of swagger resources without changing the workspace.
+
+        Return the swagger resources, their options and command groups, which are added by `add_draft_command_groups`.
+        The aaz specs are not used here, so the drafts of different workspaces can be generated concurrently.
+        """
         root_node = self.find_command_tree_node()
         assert root_node
 
@@ -624,10 +642,33 @@ class WorkspaceManager:
             resource_options.append(r.get("options", {}))
             used_resource_ids.update(r['id'])
 
+        workers = self.generation_workers or Config.COMMAND_GENERATION_WORKERS
+        if workers > 1 and len(swagger_resources) > 1:
+            results = generate_draft_command_groups(
+                plane=self.ws.plane, mod_names=mod_names, version=version,
+                resources=swagger_resources, resource_options=resource_options, workers=workers)
+            if results is not None:
+                command_groups = []
+                for data, error in results:
+                    if error is not None:
+                        raise exceptions.InvalidAPIUsage(message=error)
+                    command_groups.append(CMDCommandGroup(data))
+                return swagger_resources, resource_options, command_groups
+
         # load swagger resources
-        self.swagger_command_generator.load_resources(swagger_resources)
+        with span("load_resources"):
+            self.swagger_command_generator.load_resources(swagger_resources)
+        try:
+            command_groups = [
+                self._create_draft_command_group(self.swagger_command_generator, swagger_resource, options)
+                for swagger_resource, options in zip(swagger_resources, resource_options)
+            ]
+        finally:
+            self.swagger_command_generator.release_resources(swagger_resources)
+        return swagger_resources, resource_options, command_groups
 
-        self._add_new_resources(self.swagger_command_generator, swagger_resources, resource_options)
+    def add_draft_command_groups(self, resources, resource_options, command_groups):
+        self._add_new_resources(None, resources, resource_options, command_groups=command_groups)
 
     def add_new_resources_by_typespec(self, version, resources):
         root_node = self.find_command_tree_node()
@@ -655,18 +696,15 @@ class WorkspaceManager:
 
         self._add_new_resources(self.typespec_command_generator, cmd_resources, resource_options)
     
-    def _add_new_resources(self, command_generator, resources, resource_options):
-        # generate cfg editors by resource
+    def _add_new_resources(self, command_generator, resources, resource_options, command_groups=None):
+        # generate cfg editors by resource, the command groups can be generated in advance
         cfg_editors = []
         aaz_ref = {}
-        for resource, options in zip(resources, resource_options):
-            try:
-                command_group = command_generator.create_draft_command_group(
-                    resource, instance_var=CMDBuildInVariants.Instance, **options)
-            except InvalidSwaggerValueError as err:
-                raise exceptions.InvalidAPIUsage(
-                    message=str(err)
-                ) from err
+        for idx, (resource, options) in enumerate(zip(resources, resource_options)):
+            if command_groups is not None:
+                command_group = command_groups[idx]
+            else:
+                command_group = self._create_draft_command_group(command_generator, resource, options)
             assert not command_group.command_groups, "The logic to support sub command groups is not supported"
             if not isinstance(resource, CMDResource):
                 # Typespec use CMDResource directly, but swagger use swagger Resource
@@ -685,13 +723,25 @@ class WorkspaceManager:
                         self.ws.plane, resource.id, aaz_version)
                 except ValueError as err:
                     raise exceptions.InvalidAPIUsage(message=str(err)) from err
-                cfg_editor.inherit_modification(aaz_cfg_reader)
+                with span("inherit_modification", resource=resource.id):
+                    cfg_editor.inherit_modification(aaz_cfg_reader)
                 for cmd_names, _ in cfg_editor.iter_commands():
                     aaz_ref[' '.join(cmd_names)] = aaz_version
             cfg_editors.append(cfg_editor)
         # add cfg_editors
         self._add_cfg_editors(cfg_editors, aaz_ref=aaz_ref)
 
+    @staticmethod
+    def _create_draft_command_group(command_generator, resource, options):
+        try:
+            with span("create_draft_command_group", resource=resource.id):
+                return command_generator.create_draft_command_group(
+                    resource, instance_var=CMDBuildInVariants.Instance, **options)
+        except InvalidSwaggerValueError as err:
+            raise exceptions.InvalidAPIUsage(
+                message=str(err)
+            ) from err
+
     def _add_cfg_editors(self, cfg_editors, aaz_ref=None):
         for cfg_editor in cfg_editors:
             # command group rename
@@ -769,8 +819,10 @@ class WorkspaceManager:
             swagger_resources.append(resource)
 
         self.swagger_command_generator.load_resources(swagger_resources)
-        
-        self._reload_resources(self.swagger_command_generator, reload_resource_map)
+        try:
+            self._reload_resources(self.swagger_command_generator, reload_resource_map)
+        finally:
+            self.swagger_command_generator.release_resources(swagger_resources)
 
     def reload_resources_by_typespec(self, resources):
         reload_resource_map = {
@@ -1206,9 +1258,12 @@ class WorkspaceManager:
             resource.subresource = subresource
 
             # build get operation by draft command
-            get_op = self.swagger_command_generator.create_draft_command_group(
-                swagger_resource, instance_var=CMDBuildInVariants.EndpointInstance, methods=('get',)
-            ).commands[0].operations[0]
+            try:
+                get_op = self.swagger_command_generator.create_draft_command_group(
+                    swagger_resource, instance_var=CMDBuildInVariants.EndpointInstance, methods=('get',)
+                ).commands[0].operations[0]
+            finally:
+                self.swagger_command_generator.release_resources([swagger_resource])
 
             selector = build_endpoint_selector_for_client_config(get_op, subresource_idx=resource.subresource)
 
@@ -1,7 +1,7 @@
 import re
 
-import inflect
 from utils.case import to_camel_case
+from utils.inflection import singular_noun
 
 from ._arg import CMDArg, CMDArgBase, CMDArgumentHelp, CMDArgEnum, CMDArgDefault, CMDBooleanArgBase, \
     CMDArgBlank, CMDObjectArgAdditionalProperties, CMDResourceLocationArgBase, CMDClsArgBase, CMDPasswordArgPromptInput
@@ -12,7 +12,6 @@ from ._schema import CMDObjectSchema, CMDSchema, CMDSchemaBase, CMDObjectSchemaB
 
 
 class CMDArgBuilder:
-    _inflect_engine = inflect.engine()
 
     @classmethod
     def new_builder(cls, schema, parent=None, var_prefix=None, ref_args=None, ref_arg=None, is_update_action=False):
@@ -313,7 +312,7 @@ class CMDArgBuilder:
             if name == "[Index]" or name == "{Key}":
                 assert self._arg_var.endswith(name)
                 prefix = self._arg_var[:-len(name)].split('.')[-1]
-                prefix = self._inflect_engine.singular_noun(prefix)
+                prefix = singular_noun(prefix)
                 if name == "[Index]":
                     name = f'{prefix}-index'
                 elif name == "{Key}":
@@ -321,7 +320,7 @@ class CMDArgBuilder:
             elif name.startswith('[].') or name.startswith('{}.'):
                 assert self._arg_var.endswith(name)
                 prefix = self._arg_var[:-len(name)].split('.')[-1]
-                prefix = self._inflect_engine.singular_noun(prefix)
+                prefix = singular_noun(prefix)
                 name = prefix + name[2:]
             name = name.replace('.', '-')
             opt_name = self._build_option_name(name)  # some schema name may contain $
@@ -338,7 +337,7 @@ class CMDArgBuilder:
         # Disable singular options by default
         # if isinstance(self.schema, CMDArraySchema):
         #     opt_name = self._build_option_name(self.schema.name.replace('$', ''))  # some schema name may contain $
-        #     singular_opt_name = self._inflect_engine.singular_noun(opt_name) or opt_name
+        #     singular_opt_name = singular_noun(opt_name) or opt_name
         #     if singular_opt_name != opt_name:
         #         return [singular_opt_name, ]
         return None
@@ -0,0 +1,54 @@
+import hashlib
+
+from schematics.models import Model
+
+
+class CMDSchemaHasher:
+    """Merkle hashes of CMD schema trees.
+
+    The digest of a schema combines its model type, its fields and the digests of its sub schemas, so the identical
+    sub trees have the same digest, and every schema is hashed once no matter how many times its parents are hashed.
+    The schemas must not be changed during the hasher is used.
+    """
+
+    # the fields about the position of a schema in its parent, instead of its structure
+    POSITION_FIELDS = ('name', 'arg', 'required', 'description', 'skip_url_encoding', 'client_flatten', 'cls')
+
+    def __init__(self):
+        # digests keyed by the id of models, the models are kept so that the ids are not reused
+        self._digests = {}
+
+    def hash_structure(self, schema):
+        """Return the digest of the schema without its position fields."""
+        return self._hash_model(schema, self.POSITION_FIELDS)
+
+    def hash(self, value):
+        if isinstance(value, Model):
+            cached = self._digests.get(id(value), None)
+            if cached is None:
+                cached = self._digests[id(value)] = (value, self._hash_model(value, ()))
+            return cached[1]
+        if isinstance(value, (list, tuple)):
+            h = hashlib.sha1(b'[')
+            for item in value:
+                h.update(self.hash(item))
+            return h.digest()
+        if isinstance(value, dict):
+            h = hashlib.sha1(b'{')
+            for key in sorted(value):
+                h.update(repr(key).encode('utf-8'))
+                h.update(self.hash(value[key]))
+            return h.digest()
+        return hashlib.sha1(repr(value).encode('utf-8')).digest()
+
+    def _hash_model(self, model, skip_fields):
+        h = hashlib.sha1(type(model).__name__.encode('utf-8'))
+        for name in sorted(model._schema.fields):
+            if name in skip_fields:
+                continue
+            value = model.get(name)
+            if value is None:
+                continue
+            h.update(name.encode('utf-8'))
+            h.update(self.hash(value))
+        return h.digest()
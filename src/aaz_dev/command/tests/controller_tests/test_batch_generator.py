@@ -0,0 +1,108 @@
+import json
+import os
+from unittest.mock import patch
+
+from command.controller.batch_generator import SwaggerBatchGenerator
+from command.controller.specs_manager import AAZSpecsManager
+from command.controller.workspace_client_cfg_editor import WorkspaceClientCfgEditor
+from swagger.tests.common import TempSwaggerSpecsTestCase
+from utils.client import CloudEnum
+from utils.plane import PlaneEnum
+
+
+class SwaggerBatchGeneratorTest(TempSwaggerSpecsTestCase):
+
+    VERSION = "2021-01-01"
+
+    def setUp(self):
+        super().setUp()
+        self.aaz_folder = self.make_temp_folder()
+        self.patch_config(AAZ_PATH=self.aaz_folder)
+        self.checkpoint_path = os.path.join(self.dev_folder, "checkpoint.json")
+        for module_name, rp_name in (("foo", "Microsoft.Foo"), ("bar", "Microsoft.Bar")):
+            self._write_module(module_name, rp_name)
+
+        # the in memory workspaces inherit the client configuration of management plane in aaz
+        aaz_specs = AAZSpecsManager()
+        aaz_specs.update_client_cfg(WorkspaceClientCfgEditor.new_client_cfg(
+            plane=PlaneEnum.Mgmt,
+            auth={"aad": {"scopes": ["https://management.azure.com/.default"]}},
+            endpoints=WorkspaceClientCfgEditor.new_client_endpoints_by_template(
+                [{"cloud": CloudEnum.AzureCloud, "template": "https://management.azure.com"}], None),
+        ).cfg)
+        aaz_specs.save()
+
+    def _write_module(self, module_name, rp_name):
+        readme = (
+            f"# {module_name}\n\n"
+            f"### Tag: package-2021-01\n\n"
+            f"``` yaml $(tag) == 'package-2021-01'\n"
+            f"input-file:\n"
+            f"  - {rp_name}/stable/{self.VERSION}/{module_name}.json\n"
+            f"```\n"
+        )
+        parameters = [
+            {"name": "subscriptionId", "in": "path", "required": True, "type": "string"},
+            {"name": "widgetName", "in": "path", "required": True, "type": "string"},
+            {"name": "api-version", "in": "query", "required": True, "type": "string"},
+        ]
+        response = {"200": {"description": "OK", "schema": {"$ref": "#/definitions/Widget"}}}
+        self.write_swagger(module_name, rp_name, self.VERSION, {
+            "swagger": "2.0",
+            "info": {"title": module_name, "version": self.VERSION},
+            "paths": {
+                f"/subscriptions/{{subscriptionId}}/providers/{rp_name}/widgets/{{widgetName}}": {
+                    "get": {"operationId": "Widgets_Get", "parameters": parameters, "responses": response},
+                },
+            },
+            "definitions": {
+                "Widget": {"type": "object", "properties": {"name": {"type": "string"}}},
+            },
+        }, readme=readme)
+
+    def test_generate_and_resume(self):
+        generator = SwaggerBatchGenerator(checkpoint_path=self.checkpoint_path, workers=2)
+        results = generator.generate(["all"])
+        self.assertEqual(results, {
+            "bar/Microsoft.Bar": {"status": "succeeded", "tag": "package-2021-01", "swaggerTag": None},
+            "foo/Microsoft.Foo": {"status": "succeeded", "tag": "package-2021-01", "swaggerTag": None},
+        })
+        aaz_specs = AAZSpecsManager()
+        for module_name in ("foo", "bar"):
+            self.assertIsNotNone(aaz_specs.find_command(module_name, "widget", "show"))
+        with open(self.checkpoint_path, 'r', encoding='utf-8') as f:
+            self.assertEqual(json.load(f)["resourceProviders"], results)
+
+        # the generated resource providers are skipped by a resumed run
+        with patch.object(SwaggerBatchGenerator, "generate_resource_provider") as generate_resource_provider:
+            self.assertEqual(SwaggerBatchGenerator(checkpoint_path=self.checkpoint_path).generate(["all"]), {})
+            generate_resource_provider.assert_not_called()
+
+        # the failed ones are generated again
+        with patch.object(SwaggerBatchGenerator, "generate_resource_provider", side_effect=ValueError("broken")):
+            generator = SwaggerBatchGenerator(checkpoint_path=os.path.join(self.dev_folder, "new.json"))
+            self.assertEqual(generator.generate(["bar"], swagger_tag="package-2021-01"), {
+                "bar/Microsoft.Bar": {
+                    "status": "failed", "tag": "package-2021-01", "error": "broken", "swaggerTag": "package-2021-01"},
+            })
+            self.assertEqual(generator.generate(["bar"], swagger_tag="package-2022-01"), {
+                "bar/Microsoft.Bar": {"status": "skipped", "swaggerTag": "package-2022-01"},
+            })
+        self.assertEqual(
+            SwaggerBatchGenerator(checkpoint_path=os.path.join(self.dev_folder, "new.json")).generate(["bar"]),
+            {"bar/Microsoft.Bar": {"status": "succeeded", "tag": "package-2021-01", "swaggerTag": None}})
+
+    def test_checkpoint_write_failure(self):
+        # the checkpoint path is a folder, which cannot be replaced by a file
+        checkpoint_path = self.make_temp_folder()
+        generator = SwaggerBatchGenerator(checkpoint_path=checkpoint_path)
+        with self.assertLogs('backend', level='WARNING') as logs:
+            results = generator.generate(["foo"])
+        self.assertEqual(results, {
+            "foo/Microsoft.Foo": {"status": "succeeded", "tag": "package-2021-01", "swaggerTag": None},
+        })
+        self.assertTrue(any("SaveCheckpointFailed" in line for line in logs.output))
+        self.assertEqual(generator.results, results)
+        self.assertEqual(
+            [name for name in os.listdir(os.path.dirname(checkpoint_path))
+             if name.startswith(os.path.basename(checkpoint_path) + ".")], [])
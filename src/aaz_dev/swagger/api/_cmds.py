@@ -21,6 +21,14 @@ bp.cli.short_help = "Manage azure-rest-api-specs/azure-rest-api-specs-pr repos."
     expose_value=False,
     help="The local path of azure-rest-api-specs repo. Official repo is https://github.com/Azure/azure-rest-api-specs"
 )
+@click.option(
+    "--workers", '-w',
+    type=int,
+    default=Config.SWAGGER_SCAN_WORKERS,
+    callback=Config.validate_and_setup_swagger_scan_workers,
+    expose_value=False,
+    help="The number of processes to parse swagger files, 0 to use all the cpus."
+)
 @click.option(
     "--output-file", '-o',
     type=click.Path(file_okay=True, dir_okay=False, resolve_path=True),
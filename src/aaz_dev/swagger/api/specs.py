@@ -3,7 +3,7 @@ from flask.helpers import send_from_directory
 import os
 
 from swagger.controller.specs_manager import SwaggerSpecsManager
-from swagger.model.specs import OpenAPIResourceProvider, TypeSpecResourceProvider
+from swagger.model.specs import OpenAPIResourceProvider, TypeSpecResourceProvider, SwaggerLoader
 from swagger.utils.source import SourceTypeEnum
 
 bp = Blueprint('swagger', __name__, url_prefix='/Swagger/Specs')
@@ -34,10 +34,16 @@ def get_path_stat(path):
     })
 
 
+@bp.route("/Refresh", methods=("POST",))
+def refresh_specs():
+    SwaggerSpecsManager.shared().refresh()
+    return "", 200
+
+
 # modules
 @bp.route("/<plane>", methods=("GET",))
 def get_modules_by(plane):
-    specs_manager = SwaggerSpecsManager()
+    specs_manager = SwaggerSpecsManager.shared()
     result = []
     for module in specs_manager.get_modules(plane):
         m = {
@@ -51,7 +57,7 @@ def get_modules_by(plane):
 
 @bp.route("/<plane>/<list_path:mod_names>", methods=("GET",))
 def get_module(plane, mod_names):
-    specs_module_manager = SwaggerSpecsManager().get_module_manager(plane, mod_names)
+    specs_module_manager = SwaggerSpecsManager.shared().get_module_manager(plane, mod_names)
     module = specs_module_manager.module
     result = {
         "url": url_for('swagger.get_module', plane=plane, mod_names=mod_names),
@@ -75,7 +81,7 @@ def get_module(plane, mod_names):
 def get_resource_providers_by(plane, mod_names):
     # get query param type in request
     rp_type = request.args.get('type', None)
-    specs_module_manager = SwaggerSpecsManager().get_module_manager(plane, mod_names)
+    specs_module_manager = SwaggerSpecsManager.shared().get_module_manager(plane, mod_names)
     result = []
     for rp in specs_module_manager.get_resource_providers():
         if isinstance(rp, OpenAPIResourceProvider):
@@ -102,7 +108,7 @@ def get_resource_providers_by(plane, mod_names):
 # TODO: may need to add OpenAPI segment in the url
 @bp.route("/<plane>/<list_path:mod_names>/ResourceProviders/<rp_name>", methods=("GET",))
 def get_openapi_resource_provider(plane, mod_names, rp_name):
-    specs_module_manager = SwaggerSpecsManager().get_module_manager(plane, mod_names)
+    specs_module_manager = SwaggerSpecsManager.shared().get_module_manager(plane, mod_names)
     rp = specs_module_manager.get_openapi_resource_provider(rp_name)
     result = {
         "url": url_for('swagger.get_openapi_resource_provider', plane=plane, mod_names=mod_names, rp_name=rp.name),
@@ -137,7 +143,7 @@ def get_openapi_resource_provider(plane, mod_names, rp_name):
 
 @bp.route("/<plane>/<list_path:mod_names>/ResourceProviders/<rp_name>/TypeSpec", methods=("GET",))
 def get_typespec_resource_provider(plane, mod_names, rp_name):
-    specs_module_manager = SwaggerSpecsManager().get_module_manager(plane, mod_names)
+    specs_module_manager = SwaggerSpecsManager.shared().get_module_manager(plane, mod_names)
     rp = specs_module_manager.get_typespec_resource_provider(rp_name)
     result = {
         "url": url_for('swagger.get_typespec_resource_provider', plane=plane, mod_names=mod_names, rp_name=rp.name),
@@ -151,7 +157,7 @@ def get_typespec_resource_provider(plane, mod_names, rp_name):
 # resources
 @bp.route("/<plane>/<list_path:mod_names>/ResourceProviders/<rp_name>/Resources", methods=("GET",))
 def get_resources_by(plane, mod_names, rp_name):
-    specs_module_manager = SwaggerSpecsManager().get_module_manager(plane, mod_names)
+    specs_module_manager = SwaggerSpecsManager.shared().get_module_manager(plane, mod_names)
     result = []
     rp = specs_module_manager.get_openapi_resource_provider(rp_name)
     resource_op_group_map = specs_module_manager.get_grouped_resource_map(rp_name)
@@ -183,7 +189,7 @@ def get_resources_by(plane, mod_names, rp_name):
 @bp.route("/<plane>/<list_path:mod_names>/ResourceProviders/<rp_name>/Resources/<base64:resource_id>",
           methods=("GET",))
 def get_resource_in_rp(plane, mod_names, rp_name, resource_id):
-    specs_module_manager = SwaggerSpecsManager().get_module_manager(plane, mod_names)
+    specs_module_manager = SwaggerSpecsManager.shared().get_module_manager(plane, mod_names)
     version_map = specs_module_manager.get_resource_version_map(resource_id, rp_name)
     rp = list(version_map.values())[0].resource_provider
     op_group_name = specs_module_manager.get_resource_op_group_name(version_map)
@@ -210,7 +216,7 @@ def get_resource_in_rp(plane, mod_names, rp_name, resource_id):
 
 @bp.route("/<plane>/<list_path:mod_names>/Resources/<base64:resource_id>", methods=("GET",))
 def get_resource_in_module(plane, mod_names, resource_id):
-    specs_module_manager = SwaggerSpecsManager().get_module_manager(plane, mod_names)
+    specs_module_manager = SwaggerSpecsManager.shared().get_module_manager(plane, mod_names)
     version_map = specs_module_manager.get_resource_version_map(resource_id)
     rp = list(version_map.values())[0].resource_provider
     op_group_name = specs_module_manager.get_resource_op_group_name(version_map)
@@ -241,7 +247,7 @@ def get_resource_in_module(plane, mod_names, resource_id):
     methods=("GET",)
 )
 def get_resource_version_in_rp(plane, mod_names, rp_name, resource_id, version):
-    specs_module_manager = SwaggerSpecsManager().get_module_manager(plane, mod_names)
+    specs_module_manager = SwaggerSpecsManager.shared().get_module_manager(plane, mod_names)
     resource = specs_module_manager.get_resource_in_version(rp_name, resource_id, version)
     result = {
         "url": url_for('swagger.get_resource_version_in_rp',
@@ -258,7 +264,7 @@ def get_resource_version_in_rp(plane, mod_names, rp_name, resource_id, version):
 
 @bp.route("/<plane>/<list_path:mod_names>/Resources/<base64:resource_id>/V/<base64:version>", methods=("GET",))
 def get_resource_version_in_module(plane, mod_names, resource_id, version):
-    specs_module_manager = SwaggerSpecsManager().get_module_manager(plane, mod_names)
+    specs_module_manager = SwaggerSpecsManager.shared().get_module_manager(plane, mod_names)
     resource = specs_module_manager.get_resource_in_version(resource_id, version)
     result = {
         "url": url_for('swagger.get_resource_version_in_rp',
@@ -271,3 +277,28 @@ def get_resource_version_in_module(plane, mod_names, resource_id, version):
         "operations": resource.operations
     }
     return jsonify(result)
+
+
+@bp.route(
+    "/<plane>/<list_path:mod_names>/ResourceProviders/<rp_name>/Resources/<base64:resource_id>/V/<base64:version>"
+    "/Dependencies",
+    methods=("GET",)
+)
+def get_resource_version_dependencies(plane, mod_names, rp_name, resource_id, version):
+    """List the swagger files referenced by the file of the resource transitively, with the references of each file."""
+    specs_module_manager = SwaggerSpecsManager.shared().get_module_manager(plane, mod_names)
+    resource = specs_module_manager.get_resource_in_version(resource_id, version, rp_name=rp_name)
+    graph = SwaggerLoader.build_dependency_graph([resource.file_path])
+    result = {
+        "id": resource_id,
+        "version": version,
+        "file": resource.file_path,
+        "files": []
+    }
+    for file_path in graph.get_transitive_files([resource.file_path]):
+        result['files'].append({
+            "file": file_path,
+            "references": graph.files.get(file_path, []),
+            "referencedBy": graph.get_referrers(file_path),
+        })
+    return jsonify(result)
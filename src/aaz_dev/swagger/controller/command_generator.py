@@ -1,31 +1,31 @@
 import logging
 import re
 
-import inflect
 from abc import abstractmethod, ABC
 
 from command.model.configuration import CMDCommandGroup, CMDCommand, CMDHttpOperation, CMDHttpRequest, \
     CMDSchemaDefault, CMDHttpResponseJsonBody, CMDArrayOutput, CMDJsonInstanceUpdateAction, \
     CMDInstanceUpdateOperation, CMDRequestJson, DEFAULT_CONFIRMATION_PROMPT, CMDClsSchemaBase, CMDHttpResponse, \
     CMDResponseJson, CMDResource
-from swagger.model.schema.cmd_builder import CMDBuilder
+from swagger.model.schema.cmd_builder import CMDBuilder, CMDSchemaCache
 from swagger.model.schema.fields import MutabilityEnum
 from swagger.model.schema.path_item import PathItem
 from swagger.model.schema.x_ms_parameterized_host import XmsParameterizedHost
-from swagger.model.specs import SwaggerLoader
+from swagger.model.specs import SwaggerLoader, SwaggerModelPool
 from swagger.model.specs._utils import operation_id_separate, camel_case_to_snake_case, get_url_path_valid_parts
 from swagger.model.schema.typespec.path_item import TypeSpecPathItem
 from utils import exceptions
 from utils.config import Config
 from utils.plane import PlaneEnum
 from utils.error_format import AAZErrorFormatEnum
+from utils.inflection import singular_noun
+from utils.profiler import span
 
 logger = logging.getLogger('backend')
 
 
 class _CommandGenerator(ABC):
 
-    _inflect_engine = inflect.engine()
 
     @staticmethod
     def generate_command_version(resource):
@@ -49,8 +49,10 @@ class _CommandGenerator(ABC):
         command.description = op.description
         command.operations = [op]
 
-        command.generate_args()
-        command.generate_outputs(pageable=cmd_builder.get_pageable(path_item, op))
+        with span("generate_args"):
+            command.generate_args()
+        with span("generate_outputs"):
+            command.generate_outputs(pageable=cmd_builder.get_pageable(path_item, op))
 
         output = command.outputs[0] if command.outputs else None
         command.name = cls._generate_command_name(path_item, resource, cmd_builder.method, output)
@@ -93,8 +95,10 @@ class _CommandGenerator(ABC):
             put_op
         ]
 
-        command.generate_args()
-        command.generate_outputs()
+        with span("generate_args"):
+            command.generate_args()
+        with span("generate_outputs"):
+            command.generate_outputs()
 
         assert command.outputs
 
@@ -161,7 +165,7 @@ class _CommandGenerator(ABC):
             part = re.sub(r"\{[^{}]*}", '', part)
             part = re.sub(r"[^a-zA-Z0-9\-._]", '', part)
             name = camel_case_to_snake_case(part, '-')
-            singular_name = cls._inflect_engine.singular_noun(name) or name
+            singular_name = singular_noun(name) or name
             names.append(singular_name)
         return " ".join([name for name in names if name])
 
@@ -183,7 +187,7 @@ class _CommandGenerator(ABC):
                     #     f"Command Name For Get set to 'list' by nexLink: {resource.path} :"
                     #     f" {path_item.get.operation_id} : {path_item.traces}"
                     # )
-                elif sub_url_path in resource.resource_provider.get_resource_map():
+                elif sub_url_path in resource.resource_provider.get_resource_id_index():
                     command_name = f"{group_name} list"
                     # logger.debug(
                     #     f"Command Name For Get set to 'list' by sub_url_path: {resource.path} :"
@@ -387,17 +391,19 @@ class _CommandGenerator(ABC):
         command_group.commands = []
         path_item = self.get_path_item(resource)
         parameterized_host = self.get_parameterized_host(resource)
+        # the schemas shared by operations, such as `systemData`, are converted once
+        schema_cache = CMDSchemaCache() if Config.CMD_SCHEMA_CACHE else None
 
         if path_item.get is not None and 'get' in methods:
             cmd_builder = CMDBuilder(path=resource.path, method='get', mutability=MutabilityEnum.Read,
-                                     parameterized_host=parameterized_host)
+                                     parameterized_host=parameterized_host, schema_cache=schema_cache)
             op = self.generate_operation(cmd_builder, path_item, instance_var)
             show_or_list_command = self.generate_command(path_item, resource, instance_var, cmd_builder, op)
             command_group.commands.append(show_or_list_command)
 
         if path_item.delete is not None and 'delete' in methods:
             cmd_builder = CMDBuilder(path=resource.path, method='delete', mutability=MutabilityEnum.Create,
-                                     parameterized_host=parameterized_host)
+                                     parameterized_host=parameterized_host, schema_cache=schema_cache)
             op = self.generate_operation(cmd_builder, path_item, instance_var)
             delete_command = self.generate_command(path_item, resource, instance_var, cmd_builder, op)
             delete_command.confirmation = DEFAULT_CONFIRMATION_PROMPT   # add confirmation for delete command by default
@@ -405,21 +411,21 @@ class _CommandGenerator(ABC):
 
         if path_item.put is not None and 'put' in methods:
             cmd_builder = CMDBuilder(path=resource.path, method='put', mutability=MutabilityEnum.Create,
-                                     parameterized_host=parameterized_host)
+                                     parameterized_host=parameterized_host, schema_cache=schema_cache)
             op = self.generate_operation(cmd_builder, path_item, instance_var)
             create_command = self.generate_command(path_item, resource, instance_var, cmd_builder, op)
             command_group.commands.append(create_command)
 
         if path_item.post is not None and 'post' in methods:
             cmd_builder = CMDBuilder(path=resource.path, method='post', mutability=MutabilityEnum.Create,
-                                     parameterized_host=parameterized_host)
+                                     parameterized_host=parameterized_host, schema_cache=schema_cache)
             op = self.generate_operation(cmd_builder, path_item, instance_var)
             action_command = self.generate_command(path_item, resource, instance_var, cmd_builder, op)
             command_group.commands.append(action_command)
 
         if path_item.head is not None and 'head' in methods:
             cmd_builder = CMDBuilder(path=resource.path, method='head', mutability=MutabilityEnum.Read,
-                                     parameterized_host=parameterized_host)
+                                     parameterized_host=parameterized_host, schema_cache=schema_cache)
             op = self.generate_operation(cmd_builder, path_item, instance_var)
             head_command = self.generate_command(path_item, resource, instance_var, cmd_builder, op)
             command_group.commands.append(head_command)
@@ -430,12 +436,12 @@ class _CommandGenerator(ABC):
             update_by_generic_command = None
             if path_item.patch is not None and 'patch' in methods:
                 cmd_builder = CMDBuilder(path=resource.path, method='patch', mutability=MutabilityEnum.Update,
-                                         parameterized_host=parameterized_host)
+                                         parameterized_host=parameterized_host, schema_cache=schema_cache)
                 op = self.generate_operation(cmd_builder, path_item, instance_var)
                 update_by_patch_command = self.generate_command(path_item, resource, instance_var, cmd_builder, op)
             if path_item.get is not None and path_item.put is not None and 'get' in methods and 'put' in methods:
                 cmd_builder = CMDBuilder(path=resource.path,
-                                         parameterized_host=parameterized_host)
+                                         parameterized_host=parameterized_host, schema_cache=schema_cache)
                 get_op = self.generate_operation(
                     cmd_builder, path_item, instance_var, method='get', mutability=MutabilityEnum.Read)
                 put_op = self.generate_operation(
@@ -453,7 +459,7 @@ class _CommandGenerator(ABC):
                 if 'get' not in methods or 'put' not in methods:
                     raise exceptions.InvalidAPIUsage(f"Invalid update_by resource: '{resource}': 'get' or 'put' not in methods: '{methods}'")
                 cmd_builder = CMDBuilder(path=resource.path,
-                                         parameterized_host=parameterized_host)
+                                         parameterized_host=parameterized_host, schema_cache=schema_cache)
                 get_op = self.generate_operation(
                     cmd_builder, path_item, instance_var, method='get', mutability=MutabilityEnum.Read)
                 put_op = self.generate_operation(
@@ -470,7 +476,7 @@ class _CommandGenerator(ABC):
                 if 'patch' not in methods:
                     raise exceptions.InvalidAPIUsage(f"Invalid update_by resource: '{resource}': 'patch' not in methods: '{methods}'")
                 cmd_builder = CMDBuilder(path=resource.path, method='patch', mutability=MutabilityEnum.Update,
-                                         parameterized_host=parameterized_host)
+                                         parameterized_host=parameterized_host, schema_cache=schema_cache)
                 op = self.generate_operation(cmd_builder, path_item, instance_var)
                 patch_update_command = self.generate_command(path_item, resource, instance_var, cmd_builder, op)
                 command_group.commands.append(patch_update_command)
@@ -515,6 +521,10 @@ class _CommandGenerator(ABC):
     @abstractmethod
     def load_resources(self, resources):
         raise NotImplementedError()
+
+    def release_resources(self, resources):
+        """Release the resources loaded by `load_resources` after the commands are generated."""
+        pass
     
     @abstractmethod
     def generate_operation(self, cmd_builder, path_item, instance_var, **kwargs):
@@ -533,12 +543,33 @@ class SwaggerCommandGenerator(_CommandGenerator):
 
     def __init__(self):
         super().__init__()
-        self.loader = SwaggerLoader()
+        # the examples are linked by the example generator when they're used
+        self._own_loader = SwaggerLoader(pruned=Config.SWAGGER_PRUNED_LOADING, defer_examples=True)
+        self.loader = self._own_loader
+        # the loaders borrowed from the shared model pool, in the order of loading
+        self._borrowed_loaders = []
 
     def load_resources(self, resources):
+        if not self._own_loader.pruned and SwaggerModelPool.is_enabled():
+            # the linked models of the same files are shared with other workspaces
+            self.loader = SwaggerModelPool.shared().borrow([resource.file_path for resource in resources])
+            self._borrowed_loaders.append(self.loader)
+            return
+        # read the referenced files concurrently, instead of one by one when they are found by linking
+        # the files are kept in loader until the resources are released
+        self.loader.acquire([resource.file_path for resource in resources])
+        self.loader.prefetch_files([resource.file_path for resource in resources])
         for resource in resources:
-            self.loader.load_file(resource.file_path)
+            self.loader.load_paths(resource.file_path, [resource.path])
         self.loader.link_swaggers()
+        logger.debug(f"LoadResources: {self.loader.get_stats()}")
+
+    def release_resources(self, resources):
+        if self._borrowed_loaders:
+            SwaggerModelPool.shared().give_back(self._borrowed_loaders.pop())
+            self.loader = self._borrowed_loaders[-1] if self._borrowed_loaders else self._own_loader
+            return
+        self.loader.release([resource.file_path for resource in resources])
     
     def get_path_item(self, resource):
         swagger = self.loader.get_loaded(resource.file_path)
@@ -557,8 +588,10 @@ class SwaggerCommandGenerator(_CommandGenerator):
 
     def generate_operation(self, cmd_builder, path_item, instance_var, **kwargs):
         assert isinstance(path_item, PathItem)
-        op = cmd_builder(path_item, **kwargs)
-        return self.format_http_operation(op, instance_var)
+        with span("cmd_builder"):
+            op = cmd_builder(path_item, **kwargs)
+        with span("format_http_operation"):
+            return self.format_http_operation(op, instance_var)
 
 
 class TypespecCommandGenerator(_CommandGenerator):
@@ -584,7 +617,8 @@ class TypespecCommandGenerator(_CommandGenerator):
         op = getattr(op, mutability, None)
         if op is None:
             return None
-        return self.format_http_operation(op, instance_var)
+        with span("format_http_operation"):
+            return self.format_http_operation(op, instance_var)
     
     def get_parameterized_host(self, resource):
         return None
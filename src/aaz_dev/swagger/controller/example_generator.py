@@ -1,77 +1,112 @@
 from swagger.controller._example_builder import SwaggerExampleBuilder
-from swagger.model.schema.example_item import XmsExamplesField
+from swagger.controller.command_generator import SwaggerCommandGenerator
 from swagger.model.schema.path_item import PathItem
-from swagger.model.specs import SwaggerLoader
+from swagger.model.specs import SwaggerModelPool
 
 
 class ExampleGenerator:
-    def __init__(self):
-        self.loader = SwaggerLoader()
+    """Generate the command examples from the x-ms-examples of swagger operations.
+
+    The swagger files are loaded by the command generator, so the models loaded to generate commands in a workspace
+    are reused. Only the example files of the resources are loaded when the examples are generated.
+    """
+
+    # the methods of which the operation examples are used, in the order of priority
+    EXAMPLE_METHODS = ("get", "delete", "put", "post", "head")
+
+    def __init__(self, command_generator=None):
+        self.command_generator = command_generator or SwaggerCommandGenerator()
+        # the operation index and the path items count of loaded swagger files, keyed by file path
+        self._operation_indexes = {}
+
+    @property
+    def loader(self):
+        return self.command_generator.loader
 
     def load_examples(self, resources):
+        self.command_generator.load_resources(resources)
+        if not self.loader.defer_examples:
+            return
+        operations = []
         for resource in resources:
-            self.loader.load_file(resource.file_path)
-            self.loader.link_swaggers()
+            path_item = self.get_path_item(resource)
+            if path_item is None:
+                continue
+            for method in self.EXAMPLE_METHODS:
+                operation = getattr(path_item, method)
+                if operation is not None:
+                    operations.append(operation)
+        if SwaggerModelPool.is_enabled():
+            # the loader may be borrowed from the model pool, which is shared by the other generators
+            SwaggerModelPool.shared().link_examples(self.loader, operations)
+        else:
+            self.loader.link_examples(operations)
+
+    def release_examples(self, resources):
+        self.command_generator.release_resources(resources)
+
+    def get_path_item(self, resource):
+        swagger = self.loader.get_loaded(resource.file_path)
+        if not swagger:
+            return None
+        path_item = (swagger.paths or {}).get(resource.path, None)
+        if path_item is None:
+            path_item = (swagger.x_ms_paths or {}).get(resource.path, None)
+        if not isinstance(path_item, PathItem):
+            return None
+        return path_item
+
+    def get_operation_index(self, file_path):
+        """Return the path items and methods of the operations in a loaded swagger file, keyed by operation id."""
+        swagger = self.loader.get_loaded(file_path)
+        if not swagger:
+            return {}
+        # the path items are added into the same swagger model by pruned loading
+        size = len(swagger.paths or {}) + len(swagger.x_ms_paths or {})
+        cached = self._operation_indexes.get(file_path, None)
+        if cached is not None and cached[0] is swagger and cached[1] == size:
+            return cached[2]
+
+        index = {}
+        for path_items in (swagger.paths, swagger.x_ms_paths):
+            for path_item in (path_items or {}).values():
+                if not isinstance(path_item, PathItem):
+                    continue
+                for method in self.EXAMPLE_METHODS:
+                    operation = getattr(path_item, method)
+                    if operation is not None and operation.operation_id:
+                        index.setdefault(operation.operation_id, []).append((path_item, method))
+        self._operation_indexes[file_path] = (swagger, size, index)
+        return index
 
     def create_draft_examples_by_swagger(self, resources, command, cmd_operation_ids, cmd_name):
         cmd_examples = []
 
         for resource in resources:
-            swagger = self.loader.get_loaded(resource.file_path)
-            if not swagger:
+            path_item = self.get_path_item(resource)
+            if path_item is None:
                 continue
 
-            path_item = swagger.paths.get(resource.path, None)
-            if path_item is None:
-                path_item = swagger.x_ms_paths.get(resource.path, None)
-            if not isinstance(path_item, PathItem):
+            operation_index = self.get_operation_index(resource.file_path)
+            methods = set()
+            for operation_id in cmd_operation_ids:
+                for item, method in operation_index.get(operation_id, ()):
+                    if item is path_item:
+                        methods.add(method)
+            method = next((method for method in self.EXAMPLE_METHODS if method in methods), None)
+            if method is None:
                 continue
 
-            example_builder = None
-            examples = None
-            if path_item.get is not None and path_item.get.operation_id in cmd_operation_ids:
-                example_builder = SwaggerExampleBuilder(
-                    command=command,
-                    operation=path_item.get,
-                    cmd_operation=cmd_operation_ids[path_item.get.operation_id]
-                )
-                examples = path_item.get.x_ms_examples
-
-            elif path_item.delete is not None and path_item.delete.operation_id in cmd_operation_ids:
-                example_builder = SwaggerExampleBuilder(
-                    command=command,
-                    operation=path_item.delete,
-                    cmd_operation=cmd_operation_ids[path_item.delete.operation_id]
-                )
-                examples = path_item.delete.x_ms_examples
-
-            elif path_item.put is not None and path_item.put.operation_id in cmd_operation_ids:
-                example_builder = SwaggerExampleBuilder(
-                    command=command,
-                    operation=path_item.put,
-                    cmd_operation=cmd_operation_ids[path_item.put.operation_id]
-                )
-                examples = path_item.put.x_ms_examples
-
-            elif path_item.post is not None and path_item.post.operation_id in cmd_operation_ids:
-                example_builder = SwaggerExampleBuilder(
-                    command=command,
-                    operation=path_item.post,
-                    cmd_operation=cmd_operation_ids[path_item.post.operation_id]
-                )
-                examples = path_item.post.x_ms_examples
-
-            elif path_item.head is not None and path_item.head.operation_id in cmd_operation_ids:
-                example_builder = SwaggerExampleBuilder(
-                    command=command,
-                    operation=path_item.head,
-                    cmd_operation=cmd_operation_ids[path_item.head.operation_id]
-                )
-                examples = path_item.head.x_ms_examples
-
-            if not example_builder or not examples:
+            operation = getattr(path_item, method)
+            examples = operation.x_ms_examples
+            if not examples:
                 continue
 
+            example_builder = SwaggerExampleBuilder(
+                command=command,
+                operation=operation,
+                cmd_operation=cmd_operation_ids[operation.operation_id]
+            )
             cmd_examples.extend(self.generate_examples(cmd_name, examples, example_builder))
 
         return cmd_examples
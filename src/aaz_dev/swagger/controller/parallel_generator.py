@@ -0,0 +1,100 @@
+import logging
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from command.model.configuration import CMDBuildInVariants
+from swagger.utils.exceptions import InvalidSwaggerValueError
+from utils.config import Config
+from utils.profiler import span
+
+logger = logging.getLogger('backend')
+
+# the specs manager and generator created once in every worker process
+_worker_specs = None
+_worker_generator = None
+
+
+def _init_worker(config_values):
+    global _worker_specs, _worker_generator
+    from swagger.controller.command_generator import SwaggerCommandGenerator
+    from swagger.controller.specs_manager import SwaggerSpecsManager
+
+    # the configurations set by command options are not inherited by spawned processes
+    for key, value in config_values.items():
+        setattr(Config, key, value)
+    # the forked processes may inherit a shared manager of the other configurations
+    _worker_specs = SwaggerSpecsManager()
+    _worker_generator = SwaggerCommandGenerator()
+
+
+def _generate_draft_command_groups(plane, mod_names, version, resource_ids, resource_options):
+    """Load the resources dispatched to the worker, return the primitive data of their command groups, or the error
+    messages of invalid swaggers."""
+    resources = [
+        _worker_specs.get_swagger_resource(plane=plane, mod_names=mod_names, resource_id=resource_id, version=version)
+        for resource_id in resource_ids
+    ]
+    _worker_generator.load_resources(resources)
+    try:
+        results = []
+        for resource, options in zip(resources, resource_options):
+            try:
+                with span("create_draft_command_group", resource=resource.id):
+                    command_group = _worker_generator.create_draft_command_group(
+                        resource, instance_var=CMDBuildInVariants.Instance, **options)
+            except InvalidSwaggerValueError as err:
+                results.append((None, str(err)))
+                continue
+            results.append((command_group.to_primitive(), None))
+        return results
+    finally:
+        _worker_generator.release_resources(resources)
+
+
+def _split_resources(file_paths, workers):
+    """Split the indexes of resources into at most `workers` parts, the resources in the same file are in one part.
+
+    The files with more resources are dispatched first, every file is dispatched to the part with the fewest
+    resources. The indexes in a part are in order.
+    """
+    file_indexes = OrderedDict()
+    for idx, file_path in enumerate(file_paths):
+        file_indexes.setdefault(file_path, []).append(idx)
+    parts = [[] for _ in range(min(workers, len(file_indexes)))]
+    for indexes in sorted(file_indexes.values(), key=len, reverse=True):
+        min(parts, key=len).extend(indexes)
+    return [sorted(part) for part in parts]
+
+
+def generate_draft_command_groups(plane, mod_names, version, resources, resource_options, workers):
+    """Generate the draft command groups of swagger resources in a process pool.
+
+    The resources are split by their files, every worker only loads and links the swagger files of the resources
+    dispatched to it. Return the primitive data of command groups with the error messages in the order of
+    `resources`, or None when the process pool is not available.
+    """
+    config_values = {key: value for key, value in vars(Config).items() if key.isupper()}
+    parts = _split_resources([resource.file_path for resource in resources], workers)
+    try:
+        executor = ProcessPoolExecutor(
+            max_workers=len(parts), initializer=_init_worker, initargs=(config_values, ))
+    except (OSError, NotImplementedError) as err:
+        logger.warning(f"ProcessPoolUnavailable: {err}")
+        return None
+    try:
+        with executor:
+            futures = [
+                executor.submit(
+                    _generate_draft_command_groups, plane, mod_names, version,
+                    [resources[idx].id for idx in part], [resource_options[idx] for idx in part])
+                for part in parts
+            ]
+            results = [None] * len(resources)
+            for part, future in zip(parts, futures):
+                for idx, result in zip(part, future.result()):
+                    results[idx] = result
+            return results
+    except BrokenProcessPool as err:
+        logger.warning(f"ProcessPoolBroken: {err}")
+        return None
@@ -1,26 +1,62 @@
+import logging
+import re
+import threading
+import time
 from collections import OrderedDict
 
 from swagger.model.specs import SwaggerSpecs, SingleModuleSwaggerSpecs, OpenAPIResourceProvider, SwaggerModule, TypeSpecResourceProvider
+from swagger.model.specs import SwaggerSpecsIndex, TypeSpecHelper, ResourceIdIndex
 from utils import exceptions
 from utils.config import Config
+from utils.git_changes import GitChangeSource
 from utils.plane import PlaneEnum
 
+logger = logging.getLogger('backend')
+
 
 class SwaggerSpecsModuleManager:
 
-    def __init__(self, plane, module):
+    def __init__(self, plane, module, resource_id_index=None):
         self.plane = plane
         self.module = module
+        # the index can be shared by the module managers of the same plane
+        self.resource_id_index = resource_id_index if resource_id_index is not None else ResourceIdIndex()
         self._rps_catch = None
         self._resource_op_group_map_cache = {}
         self._resource_map_cache = {}
+        self._rp_fingerprints = {}
+        self._rp_checked_at = {}
+        self._indexed_rps = set()
+        self._lock = threading.RLock()
         assert plane == PlaneEnum.Mgmt or PlaneEnum.is_data_plane(plane), f"Invalid plane: '{self.plane}'"
         assert isinstance(module, SwaggerModule), f"Invalid module type: '{type(module)}'"
 
     def get_resource_providers(self):
-        if self._rps_catch is None:
-            self._rps_catch = self.module.get_resource_providers()
-        return self._rps_catch
+        with self._lock:
+            if self._rps_catch is None:
+                self._rps_catch = self.module.get_resource_providers()
+            return self._rps_catch
+
+    def _check_resource_provider(self, rp):
+        """Drop the cached resources of the resource provider when its files changed since the last check."""
+        interval = Config.SWAGGER_SPECS_POLL_INTERVAL
+        if interval < 0:
+            return
+        key = str(rp)
+        now = time.monotonic()
+        checked_at = self._rp_checked_at.get(key, None)
+        if checked_at is not None and now - checked_at < interval:
+            return
+        self._rp_checked_at[key] = now
+        fingerprint = rp.get_fingerprint()
+        if key in self._rp_fingerprints and self._rp_fingerprints[key] != fingerprint:
+            logger.info(f"SwaggerFilesChanged: {rp}")
+            rp.clear_cache()
+            self._resource_map_cache.pop(key, None)
+            self._resource_op_group_map_cache.pop(rp.name, None)
+            self.resource_id_index.remove_resource_provider(rp)
+            self._indexed_rps.discard(key)
+        self._rp_fingerprints[key] = fingerprint
 
     def get_openapi_resource_provider(self, rp_name):
         rps = self.get_resource_providers()
@@ -50,19 +86,21 @@ class SwaggerSpecsModuleManager:
 
     def get_grouped_resource_map(self, rp_name):
         key = rp_name
-        if key in self._resource_op_group_map_cache:
-            return self._resource_op_group_map_cache[key]
+        with self._lock:
+            rp = self.get_openapi_resource_provider(rp_name)
+            self._check_resource_provider(rp)
+            if key in self._resource_op_group_map_cache:
+                return self._resource_op_group_map_cache[key]
 
-        rp = self.get_openapi_resource_provider(rp_name)
-        resource_map = self.get_resource_map(rp)
-        resource_op_group_map = OrderedDict()
-        for resource_id, version_map in resource_map.items():
-            op_group_name = self.get_resource_op_group_name(version_map)
-            if op_group_name not in resource_op_group_map:
-                resource_op_group_map[op_group_name] = OrderedDict()
-            resource_op_group_map[op_group_name][resource_id] = version_map
-        self._resource_op_group_map_cache[key] = resource_op_group_map
-        return self._resource_op_group_map_cache[key]
+            resource_map = self.get_resource_map(rp)
+            resource_op_group_map = OrderedDict()
+            for resource_id, version_map in resource_map.items():
+                op_group_name = self.get_resource_op_group_name(version_map)
+                if op_group_name not in resource_op_group_map:
+                    resource_op_group_map[op_group_name] = OrderedDict()
+                resource_op_group_map[op_group_name][resource_id] = version_map
+            self._resource_op_group_map_cache[key] = resource_op_group_map
+            return self._resource_op_group_map_cache[key]
 
     @staticmethod
     def get_resource_op_group_name(version_map):
@@ -73,11 +111,39 @@ class SwaggerSpecsModuleManager:
         )[0]
         return latest_resource.get_operation_group_name() or ""
 
-    def get_resource_version_map(self, resource_id, rp_name=None):
+    def _get_openapi_resource_providers(self, resource_id, rp_name=None):
         if rp_name:
-            rps = [self.get_openapi_resource_provider(rp_name)]
-        else:
-            rps = [rp for rp in self.get_resource_providers() if isinstance(rp, OpenAPIResourceProvider)]
+            return [self.get_openapi_resource_provider(rp_name)]
+        rps = [rp for rp in self.get_resource_providers() if isinstance(rp, OpenAPIResourceProvider)]
+        # the resource providers named by the namespaces in resource id are indexed first, the resource maps of the
+        # others are only loaded when the resource id is not defined in them
+        namespaces = set(re.findall(r'/providers/([^/]+)', resource_id.lower()))
+        for candidates in ([rp for rp in rps if rp.name.lower() in namespaces], rps):
+            if not candidates:
+                continue
+            self.build_resource_id_index(candidates)
+            rp_keys = {str(entry.rp) for entry in self.resource_id_index.get(resource_id)}
+            found = [rp for rp in candidates if str(rp) in rp_keys]
+            if found:
+                return found
+        return []
+
+    def build_resource_id_index(self, rps=None):
+        """Index the resource ids of the OpenAPI resource providers, all the ones in the module by default."""
+        with self._lock:
+            for rp in (rps if rps is not None else self.get_resource_providers()):
+                if not isinstance(rp, OpenAPIResourceProvider):
+                    continue
+                key = str(rp)
+                self._check_resource_provider(rp)
+                if key not in self._indexed_rps:
+                    # replace the entries added by the other module managers, which may be outdated
+                    self.resource_id_index.add_resource_provider(rp.swagger_module, rp, self.get_resource_map(rp))
+                    self._indexed_rps.add(key)
+            return self.resource_id_index
+
+    def get_resource_version_map(self, resource_id, rp_name=None):
+        rps = self._get_openapi_resource_providers(resource_id, rp_name)
 
         version_maps = []
         resource_rps = []
@@ -98,10 +164,7 @@ class SwaggerSpecsModuleManager:
         return version_maps[0]
 
     def get_resource_in_version(self, resource_id, version, rp_name=None):
-        if rp_name:
-            rps = [self.get_openapi_resource_provider(rp_name)]
-        else:
-            rps = [rp for rp in self.get_resource_providers() if isinstance(rp, OpenAPIResourceProvider)]
+        rps = self._get_openapi_resource_providers(resource_id, rp_name)
 
         resources = []
         for rp in rps:
@@ -123,31 +186,75 @@ class SwaggerSpecsModuleManager:
     def get_resource_map(self, rp):
         assert isinstance(rp, OpenAPIResourceProvider)
         key = str(rp)
-        if key not in self._resource_map_cache:
-            self._resource_map_cache[key] = rp.get_resource_map()
-        return self._resource_map_cache[key]
+        with self._lock:
+            self._check_resource_provider(rp)
+            if key not in self._resource_map_cache:
+                self._resource_map_cache[key] = rp.get_resource_map()
+            return self._resource_map_cache[key]
 
 
 class SwaggerSpecsManager:
 
+    _shared = None
+    _shared_key = None
+    _shared_lock = threading.Lock()
+
+    @classmethod
+    def shared(cls):
+        """Return the process wide manager, so that the caches can be reused across requests.
+
+        A new manager is created when the swagger configurations are changed.
+        """
+        key = (Config.SWAGGER_PATH, Config.SWAGGER_MODULE_PATH, Config.DEFAULT_SWAGGER_MODULE)
+        with cls._shared_lock:
+            if cls._shared is None or cls._shared_key != key:
+                cls._shared = cls()
+                cls._shared_key = key
+            return cls._shared
+
     def __init__(self):
         if Config.SWAGGER_PATH:
-            self.specs = SwaggerSpecs(folder_path=Config.SWAGGER_PATH)
+            self.index = self._build_index(Config.SWAGGER_PATH)
+            self.specs = SwaggerSpecs(folder_path=Config.SWAGGER_PATH, index=self.index)
         elif Config.SWAGGER_MODULE_PATH:
             if not Config.DEFAULT_SWAGGER_MODULE:
                 raise ValueError("SWAGGER_MODULE is required when using SWAGGER_MODULE_PATH")
+            self.index = self._build_index(Config.SWAGGER_MODULE_PATH)
             self.specs = SingleModuleSwaggerSpecs(
-                folder_path=Config.SWAGGER_MODULE_PATH, module_name=Config.DEFAULT_SWAGGER_MODULE)
+                folder_path=Config.SWAGGER_MODULE_PATH, module_name=Config.DEFAULT_SWAGGER_MODULE, index=self.index)
         else:
             raise ValueError("Require SWAGGER_PATH or SWAGGER_MODULE_PATH")
 
         self._modules_cache = {}
         self._module_managers_cache = {}
+        self._resource_id_indexes = {}
+        # the locks of building the resource id indexes of planes, keyed by plane
+        self._resource_id_index_locks = {}
+        self._lock = threading.RLock()
+
+    def refresh(self):
+        """Drop all the cached modules, resource providers and resources."""
+        with self._lock:
+            self._modules_cache = {}
+            self._module_managers_cache = {}
+            self._resource_id_indexes = {}
+            TypeSpecHelper.clear_cache()
+            GitChangeSource.expire_snapshots()
+
+    @staticmethod
+    def _build_index(folder_path):
+        if not Config.SWAGGER_INDEX_ENABLED:
+            return None
+        return SwaggerSpecsIndex(folder_path=folder_path, index_folder=Config.get_swagger_index_folder())
 
     def get_modules(self, plane):
-        if plane in self._modules_cache:
+        with self._lock:
+            if plane in self._modules_cache:
+                return self._modules_cache[plane]
+            self._modules_cache[plane] = self._get_modules(plane)
             return self._modules_cache[plane]
 
+    def _get_modules(self, plane):
         if plane == PlaneEnum.Mgmt:
             modules = self.specs.get_mgmt_plane_modules(plane=plane)
         elif PlaneEnum.is_data_plane(plane):
@@ -155,16 +262,14 @@ class SwaggerSpecsManager:
         else:
             raise exceptions.InvalidAPIUsage(f"invalid plane name '{plane}'")
 
+        # the resource providers are resolved lazily by the module managers
         result = OrderedDict()
         for m in modules:
-            for rp in m.get_resource_providers():
-                module = rp.swagger_module
+            for module in m.get_modules():
                 module_str = str(module)
                 if module_str not in result:
                     result[module_str] = module
-
-        self._modules_cache[plane] = [*result.values()]
-        return self._modules_cache[plane]
+        return [*result.values()]
 
     def get_module(self, plane, mod_names):
         if isinstance(mod_names, str):
@@ -183,11 +288,36 @@ class SwaggerSpecsManager:
 
     def get_module_manager(self, plane, mod_names, without_catch=False) -> SwaggerSpecsModuleManager:
         key = (plane, tuple(mod_names))
-        if without_catch or key not in self._module_managers_cache:
-            module = self.get_module(plane, mod_names)
-            self._module_managers_cache[key] = SwaggerSpecsModuleManager(plane, module)
-
-        return self._module_managers_cache[key]
+        with self._lock:
+            if without_catch or key not in self._module_managers_cache:
+                module = self.get_module(plane, mod_names)
+                self._module_managers_cache[key] = SwaggerSpecsModuleManager(
+                    plane, module, resource_id_index=self._get_plane_resource_id_index(plane))
+
+            return self._module_managers_cache[key]
+
+    def _get_plane_resource_id_index(self, plane):
+        with self._lock:
+            if plane not in self._resource_id_indexes:
+                self._resource_id_indexes[plane] = ResourceIdIndex()
+            return self._resource_id_indexes[plane]
+
+    def get_resource_id_index(self, plane):
+        """Return the index of the resource ids in all the modules of the plane.
+
+        The index is shared by the module managers of the plane, so every resource provider is only indexed once. It's
+        built under the lock of the plane instead of the manager lock, so the other requests are not blocked by it.
+        """
+        with self._lock:
+            module_managers = [self.get_module_manager(plane, module.names) for module in self.get_modules(plane)]
+            index = self._get_plane_resource_id_index(plane)
+            if plane not in self._resource_id_index_locks:
+                self._resource_id_index_locks[plane] = threading.Lock()
+            build_lock = self._resource_id_index_locks[plane]
+        with build_lock:
+            for module_manager in module_managers:
+                module_manager.build_resource_id_index()
+        return index
 
     def get_swagger_resource(self, plane, mod_names, resource_id, version):
         return self.get_module_manager(
@@ -1,7 +1,7 @@
 from command.model.configuration import CMDIntegerFormat, CMDStringFormat, CMDFloatFormat, CMDArrayFormat, \
     CMDObjectFormat, CMDSchemaEnum, CMDSchemaEnumItem
 
-from command.model.configuration import CMDSchemaDefault, \
+from command.model.configuration import CMDSchemaDefault, CMDSchema, \
     CMDStringSchema, CMDStringSchemaBase, \
     CMDByteSchema, CMDByteSchemaBase, \
     CMDBinarySchema, CMDBinarySchemaBase, \
@@ -19,28 +19,160 @@ from command.model.configuration import CMDSchemaDefault, \
     CMDFloatSchema, CMDFloatSchemaBase, \
     CMDFloat32Schema, CMDFloat32SchemaBase, \
     CMDFloat64Schema, CMDFloat64SchemaBase, \
-    CMDObjectSchema, CMDObjectSchemaBase, \
+    CMDObjectSchema, CMDObjectSchemaBase, CMDObjectSchemaDiscriminator, \
     CMDArraySchema, CMDArraySchemaBase, \
     CMDClsSchema, CMDClsSchemaBase, \
-    CMDHttpResponseJsonBody
+    CMDHttpResponseJsonBody, CMDSchemaHasher
 
+from schematics.models import Model, ModelDict
 from swagger.model.specs._utils import operation_id_separate
 from swagger.utils import exceptions
 from .fields import MutabilityEnum
 from .response import Response
-from .schema import ReferenceSchema
+from .schema import ReferenceSchema, Schema
 from .x_ms_pageable import XmsPageable
 from functools import reduce
 from utils.case import to_camel_case
+from utils.config import Config
 import logging
 import re
 
 logger = logging.getLogger("backend")
 
 
+class _ConversionEntry:
+    __slots__ = ('model', 'traces', 'cls_names')
+
+    def __init__(self, model, traces, cls_names):
+        self.model = model
+        self.traces = traces
+        self.cls_names = cls_names
+
+
+class _ConversionFrame:
+    __slots__ = ('traces', 'cls_names', 'cacheable')
+
+    def __init__(self):
+        self.traces = set()
+        self.cls_names = set()
+        self.cacheable = True
+
+
+class CMDSchemaCache:
+    """The CMD schemas converted from swagger schemas, shared by the builders of the operations of a resource.
+
+    A swagger schema is converted to the same CMD schema when the builder states in the key are the same, unless the
+    conversion depends on its context:
+        - the conversions which register cls definitions are not cached, because the later conversions depend on them.
+        - the cls definitions checked for reference loop are recorded, the entry is not used if any of them is in
+          progress of registering.
+        - the traces checked for reference loop by `find_traces` are recorded, the entry is not used if any of them is
+          in the parents.
+    The cached schemas are copies, so the changes of the returned schema by its parent are not shared.
+    """
+
+    def __init__(self):
+        self._entries = {}
+        self._frames = []
+        self.hits = 0
+        self.misses = 0
+
+    def convert(self, schema, builder, **kwargs):
+        if not isinstance(schema, (Schema, ReferenceSchema)) or not set(kwargs).issubset({'support_cls_schema'}):
+            return self._convert(schema, builder, None, **kwargs)
+        key = (schema.traces, builder.mutability, builder.frozen, builder.in_base, builder.read_only,
+               kwargs.get('support_cls_schema', False))
+        entry = self._entries.get(key, None)
+        if entry is not None and self._is_valid(entry, builder):
+            self.hits += 1
+            self._add_dependencies(entry.traces, entry.cls_names, True)
+            return self._copy(entry.model)
+        self.misses += 1
+        return self._convert(schema, builder, key, **kwargs)
+
+    def _convert(self, schema, builder, key, **kwargs):
+        frame = _ConversionFrame()
+        if hasattr(schema, 'traces'):
+            frame.traces.add(schema.traces)
+        self._frames.append(frame)
+        try:
+            model = schema.to_cmd(builder, **kwargs)
+        finally:
+            self._frames.pop()
+            self._add_dependencies(frame.traces, frame.cls_names, frame.cacheable)
+        if key is not None and frame.cacheable and not builder.find_any_traces(frame.traces):
+            self._entries[key] = _ConversionEntry(self._copy(model), frozenset(frame.traces), frozenset(frame.cls_names))
+        return model
+
+    def add_traces(self, traces):
+        if self._frames:
+            self._frames[-1].traces.add(traces)
+
+    def add_cls_name(self, name):
+        if self._frames:
+            self._frames[-1].cls_names.add(name)
+
+    def set_uncacheable(self):
+        if self._frames:
+            self._frames[-1].cacheable = False
+
+    def _add_dependencies(self, traces, cls_names, cacheable):
+        if self._frames:
+            frame = self._frames[-1]
+            frame.traces.update(traces)
+            frame.cls_names.update(cls_names)
+            frame.cacheable = frame.cacheable and cacheable
+
+    def _is_valid(self, entry, builder):
+        for name in entry.cls_names:
+            definition = builder.cls_definitions.get(name, None)
+            if definition is not None and 'model' not in definition:
+                return False
+        return not builder.find_any_traces(entry.traces)
+
+    @classmethod
+    def _copy(cls, value):
+        # copy the converted data directly, which is much faster than converting `to_native()` again
+        if isinstance(value, Model):
+            copied = value.__class__.__new__(value.__class__)
+            copied.__dict__.update(value.__dict__)
+            copied._data = ModelDict(converted={key: cls._copy(v) for key, v in value._data.items()})
+            return copied
+        if isinstance(value, list):
+            return [cls._copy(v) for v in value]
+        if isinstance(value, dict):
+            return {key: cls._copy(v) for key, v in value.items()}
+        return value
+
+
+class _BuilderContext:
+    """The ids of the builders in the current conversion path, from the root builder to the parent of the running one.
+
+    The ids and their traces are counted in dicts, so the reference loops are found in constant time instead of
+    scanning the parent ids of every builder.
+    """
+    __slots__ = ('ids', 'traces')
+
+    def __init__(self):
+        self.ids = {}
+        self.traces = {}
+
+    def push(self, builder_id):
+        self.ids[builder_id] = self.ids.get(builder_id, 0) + 1
+        traces = builder_id[0]
+        self.traces[traces] = self.traces.get(traces, 0) + 1
+
+    def pop(self, builder_id):
+        for counts, key in ((self.ids, builder_id), (self.traces, builder_id[0])):
+            if counts[key] > 1:
+                counts[key] -= 1
+            else:
+                del counts[key]
+
+
 class CMDBuilder:
 
-    def __init__(self, path, method=None, mutability=None, in_base=False, frozen=False, parent_ids=None, cls_definitions=None, parameterized_host=None):
+    def __init__(self, path, method=None, mutability=None, in_base=False, frozen=False, parent_ids=None, cls_definitions=None, parameterized_host=None, schema_cache=None, parent=None):
         self.path = path
         self.method = method
         self.mutability = mutability
@@ -48,9 +180,32 @@ class CMDBuilder:
         self.frozen = frozen
         self.read_only = False
         self.id = None    # used to find loop
-        self.parent_ids = parent_ids or []
+        # the builders are linked to their parents, instead of copying the parent ids in every level
+        self.parent = parent
+        if parent is not None:
+            self._base_parent_ids = None
+            self._context = parent._context
+        else:
+            self._base_parent_ids = parent_ids or []
+            self._context = _BuilderContext()
+            for parent_id in self._base_parent_ids:
+                if parent_id is not None:
+                    self._context.push(parent_id)
         self.cls_definitions = {} if cls_definitions is None else cls_definitions
         self.parameterized_host = parameterized_host
+        self.schema_cache = schema_cache
+
+    @property
+    def parent_ids(self):
+        parent_ids = []
+        builder = self.parent
+        while builder is not None:
+            parent_ids.append(builder.id)
+            if builder.parent is None:
+                parent_ids.extend(reversed(builder._base_parent_ids))
+            builder = builder.parent
+        parent_ids.reverse()
+        return parent_ids
 
     def __call__(self, schema, **kwargs):
         sub_builder = CMDBuilder(
@@ -59,9 +214,10 @@ class CMDBuilder:
             mutability=kwargs.pop('mutability', self.mutability),
             in_base=kwargs.pop('in_base', self.in_base),
             frozen=kwargs.pop('frozen', self.frozen),
-            parent_ids=[*self.parent_ids, self.id],
             cls_definitions=kwargs.pop('cls_definitions', self.cls_definitions),
-            parameterized_host=kwargs.pop('parameterized_host', self.parameterized_host)
+            parameterized_host=kwargs.pop('parameterized_host', self.parameterized_host),
+            schema_cache=self.schema_cache,
+            parent=self
         )
         if getattr(schema, 'read_only', None):
             sub_builder.read_only = True
@@ -74,25 +230,35 @@ class CMDBuilder:
                     sub_builder.frozen = True
         if hasattr(schema, 'traces'):
             sub_builder.id = (schema.traces, sub_builder.mutability, sub_builder.frozen)
-            if sub_builder.id in sub_builder.parent_ids:
+            if sub_builder.id == self.id or sub_builder.id in self._context.ids:
                 if len(schema.traces) == 3:
                     # make sure the trace is reference definition, the trace should be [file_path, 'definitions', name]
+                    parent_ids = sub_builder.parent_ids
                     raise exceptions.InvalidSwaggerValueError(
                             msg="Find invalid reference loop",
                             key=sub_builder.id,
-                            value=sub_builder.parent_ids.index(sub_builder.id),
+                            value=parent_ids.index(sub_builder.id),
                         )
-        return schema.to_cmd(sub_builder, **kwargs)
+        # this builder is a parent of the sub builder until the conversion is done
+        if self.id is not None:
+            self._context.push(self.id)
+        try:
+            if self.schema_cache is not None:
+                return self.schema_cache.convert(schema, sub_builder, **kwargs)
+            return schema.to_cmd(sub_builder, **kwargs)
+        finally:
+            if self.id is not None:
+                self._context.pop(self.id)
 
     def find_traces(self, traces):
         assert traces is not None
-        for parent_id in self.parent_ids:
-            if parent_id is None:
-                continue
-            parent_traces, mutability, frozen = parent_id
-            if parent_traces == traces:
-                return True
-        return False
+        if self.schema_cache is not None:
+            self.schema_cache.add_traces(traces)
+        return traces in self._context.traces
+
+    def find_any_traces(self, traces_list):
+        """Whether any of the traces is in the parents, which is not recorded by the schema cache."""
+        return any(traces in self._context.traces for traces in traces_list)
 
     def build_schema(self, schema):
         schema_type = getattr(schema, 'type', None)
@@ -241,6 +407,11 @@ class CMDBuilder:
 
     def register_cls_definition(self, schema, support_cls_schema, **kwargs):
         name = self._get_cls_definition_name(schema)
+        if self.schema_cache is not None and not self.frozen:
+            if support_cls_schema:
+                self.schema_cache.set_uncacheable()
+            else:
+                self.schema_cache.add_cls_name(name)
         if self.frozen:
             if support_cls_schema:
                 if self.in_base:
@@ -622,6 +793,8 @@ class CMDBuilder:
         return success_responses, redirect_responses, error_responses
 
     def apply_cls_definitions(self, *cmd_ops):
+        if Config.CLS_STRUCTURAL_SHARING:
+            self._merge_identical_cls_definitions(*cmd_ops)
         for name, definition in self.cls_definitions.items():
             if definition['count'] > 1:
                 definition['model'].cls = name
@@ -650,6 +823,49 @@ class CMDBuilder:
                 WorkspaceCfgEditor.replace_schema(parent, schema, new_schema)
                 self.cls_definitions[name]['model'] = new_schema
 
+    def _merge_identical_cls_definitions(self, *cmd_ops):
+        """Replace the cls definitions by the first registered one with the same structure.
+
+        The definitions are hashed before any change, so a definition inside a merged one is still merged with its
+        identical one, and the references to it outside are linked to the kept one.
+        """
+        from command.controller.workspace_cfg_editor import WorkspaceCfgEditor
+        hasher = CMDSchemaHasher()
+        digests = {}
+        for name, definition in self.cls_definitions.items():
+            if 'model' in definition:
+                digests[name] = hasher.hash_structure(definition['model'])
+
+        targets = {}
+        for name, digest in digests.items():
+            target_name = targets.setdefault(digest, name)
+            if target_name == name:
+                continue
+            definition = self.cls_definitions[name]
+            target = self.cls_definitions[target_name]
+            model = definition['model']
+            match = WorkspaceCfgEditor.find_schema_in_operations(cmd_ops, model)
+            if match is not None:
+                parent = match[0]
+                if parent is None or not isinstance(parent, (
+                        CMDObjectSchemaBase, CMDArraySchemaBase, CMDObjectSchemaDiscriminator)):
+                    # the root schemas cannot be replaced by the cls schema
+                    continue
+                model.cls = target_name
+                if isinstance(model, CMDSchema):
+                    new_model = CMDClsSchema.build_from_schema(model, target['model'])
+                else:
+                    new_model = CMDClsSchemaBase.build_from_schema_base(model, target['model'])
+                model.cls = None
+                WorkspaceCfgEditor.replace_schema(parent, model, new_model)
+
+            for _, schema, _ in WorkspaceCfgEditor.iter_schema_cls_reference_in_operations(cmd_ops, name):
+                schema._type = f"@{target_name}"
+                schema.implement = target['model']
+            target['count'] += definition['count']
+            del self.cls_definitions[name]
+            logger.debug(f"Merge cls definition {name} into {target_name}")
+
     def get_pageable(self, path_item, op):
         pageable = getattr(path_item, self.method).x_ms_pageable
         if pageable is None and self.method == "get":
@@ -137,12 +137,19 @@ class Operation(Model, Linkable):
                 *self.traces, "x_ms_long_running_operation_options", "final_state_schema"
             )
 
-        if self.x_ms_examples is not None:
-            for key, example in self.x_ms_examples.items():
-                try:
-                    example.link(swagger_loader, *self.traces, "x_ms_examples", key)
-                except Exception as e:
-                    logger.error(f"Link example failed: {e}: {key}.")
+        if not swagger_loader.defer_examples:
+            self.link_examples(swagger_loader)
+
+    def link_examples(self, swagger_loader):
+        if self.x_ms_examples is None:
+            return
+        for key, example in self.x_ms_examples.items():
+            if example.is_linked():
+                continue
+            try:
+                example.link(swagger_loader, *self.traces, "x_ms_examples", key)
+            except Exception as e:
+                logger.error(f"Link example failed: {e}: {key}.")
 
     def to_cmd(self, builder, parent_parameters, host_path, **kwargs):
         cmd_op = CMDHttpOperation()
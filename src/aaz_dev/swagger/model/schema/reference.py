@@ -49,11 +49,15 @@ class Reference(Model, Linkable):
     def link(self, swagger_loader, *traces, **kwargs):
         if self.is_linked():
             return
-        super().link(swagger_loader, *traces, **kwargs)
 
-        self.ref_instance, instance_traces = swagger_loader.load_ref(self.ref, *self.traces, 'ref')
-        if isinstance(self.ref_instance, Linkable):
-            self.ref_instance.link(swagger_loader, *instance_traces, **kwargs)
+        # follow the chain of references iteratively, so that a long `$ref` chain will not exceed the recursion limit
+        ref = self
+        while isinstance(ref, Reference) and not ref.is_linked():
+            Linkable.link(ref, swagger_loader, *traces, **kwargs)
+            ref.ref_instance, traces = swagger_loader.load_ref(ref.ref, *ref.traces, 'ref')
+            ref = ref.ref_instance
+        if isinstance(ref, Linkable):
+            ref.link(swagger_loader, *traces, **kwargs)
 
     @classmethod
     def _claim_polymorphic(cls, data):
@@ -43,10 +43,7 @@ class Response(Model, Linkable):
         # assign resource id template to the schema and it's ref instance
         resource_id_template = kwargs.get('resource_id_template', None)
         if resource_id_template and self.schema:
-            if isinstance(self.schema, Schema):
-                self.schema.resource_id_templates.add(resource_id_template)
-            if self.schema.ref_instance and isinstance(self.schema.ref_instance, Schema):
-                self.schema.ref_instance.resource_id_templates.add(resource_id_template)
+            swagger_loader.add_resource_id_template(self.schema, resource_id_template)
 
         # TODO: add support for examples and x_ms_examples
 
@@ -55,6 +55,28 @@ def _items_claim_function(_, data):
         return None
 
 
+def _link_ref_chain(schema, swagger_loader, *traces):
+    """Link a schema and the chain of schemas referenced by `$ref`.
+
+    The chain is followed iteratively and the referencing schemas are finished from the end of chain, so that a long
+    `$ref` chain will not exceed the recursion limit.
+    """
+    chain = []
+    while isinstance(schema, (Schema, ReferenceSchema)) and not schema.is_linked():
+        Linkable.link(schema, swagger_loader, *traces)
+        chain.append(schema)
+        if schema.ref is None:
+            break
+        schema.ref_instance, traces = swagger_loader.load_ref(schema.ref, *schema.traces, 'ref')
+        schema = schema.ref_instance
+    else:
+        if isinstance(schema, Linkable):
+            schema.link(swagger_loader, *traces)
+
+    for schema in reversed(chain):
+        schema._link_referenced(swagger_loader)
+
+
 class ReferenceSchema(Model, Linkable):
     ref = ReferenceField(required=True)
     description = StringType()
@@ -83,11 +105,9 @@ class ReferenceSchema(Model, Linkable):
     def link(self, swagger_loader, *traces):
         if self.is_linked():
             return
-        super().link(swagger_loader, *traces)
+        _link_ref_chain(self, swagger_loader, *traces)
 
-        self.ref_instance, instance_traces = swagger_loader.load_ref(self.ref, *self.traces, 'ref')
-        if isinstance(self.ref_instance, Linkable):
-            self.ref_instance.link(swagger_loader, *instance_traces)
+    def _link_referenced(self, swagger_loader):
         if self.ref_instance.x_ms_azure_resource:
             self.x_ms_azure_resource = True
         if self.ref_instance.read_only:
@@ -290,12 +310,10 @@ class Schema(Model, Linkable):
     def link(self, swagger_loader, *traces):
         if self.is_linked():
             return
-        super().link(swagger_loader, *traces)
+        _link_ref_chain(self, swagger_loader, *traces)
 
-        if self.ref is not None:
-            self.ref_instance, instance_traces = swagger_loader.load_ref(self.ref, *self.traces, 'ref')
-            if isinstance(self.ref_instance, Linkable):
-                self.ref_instance.link(swagger_loader, *instance_traces)
+    def _link_referenced(self, swagger_loader):
+        if self.ref_instance is not None:
             if self.ref_instance.x_ms_azure_resource:
                 self.x_ms_azure_resource = True
             if self.ref_instance.read_only:
@@ -324,9 +342,9 @@ class Schema(Model, Linkable):
         self._link_disc()
         if self.type and self.type != "object" and self.all_of:
             if len(self.all_of) > 1:
-                print(f"\tMultiAllOf for {self.type}: {traces}")
+                logger.debug(f"MultiAllOf for {self.type}: {self.traces}")
             else:
-                print(f"\tAllOf for {self.type}: {traces}")
+                logger.debug(f"AllOf for {self.type}: {self.traces}")
 
     def _link_disc(self):
         if self.all_of is None:
@@ -1,5 +1,9 @@
 from ._resource import Resource
+from ._resource_id_index import ResourceIdIndex, ResourceIdIndexEntry
 from ._resource_provider import OpenAPIResourceProvider, TypeSpecResourceProvider
 from ._swagger_module import SwaggerModule, DataPlaneModule, MgmtPlaneModule
 from ._swagger_specs import SwaggerSpecs, SingleModuleSwaggerSpecs
+from ._swagger_index import SwaggerSpecsIndex
 from ._swagger_loader import SwaggerLoader
+from ._swagger_pool import SwaggerModelPool
+from ._typespec_helper import TypeSpecHelper
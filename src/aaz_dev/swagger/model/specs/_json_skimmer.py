@@ -0,0 +1,114 @@
+import json
+import re
+
+# JSON skimmer which reads the required fields from a json document and skips the others without building python
+# objects for them. The skipped values are only scanned for strings and brackets, so they are not fully validated.
+
+_WS_RE = re.compile(rb'[ \t\n\r]*')
+_STRING_RE = re.compile(rb'"[^"\\]*(?:\\.[^"\\]*)*"', flags=re.DOTALL)
+_SCALAR_RE = re.compile(rb'[^,:\[\]{}" \t\n\r]+')
+# content until the next run of open or close brackets, strings are consumed as a whole so that brackets inside them
+# are ignored
+_CONTAINER_RUN_RE = re.compile(
+    rb'[^"\[\]{}]*(?:"[^"\\]*(?:\\.[^"\\]*)*"[^"\[\]{}]*)*(?:([\[{]+)|([\]}]+))', flags=re.DOTALL)
+
+
+class JsonSkimmer:
+
+    def __init__(self, data):
+        self.data = data
+        self.pos = 0
+        if data[:3] == b'\xef\xbb\xbf':
+            raise ValueError("Unexpected UTF-8 BOM")
+
+    def _error(self, msg):
+        return ValueError(f"{msg}: char {self.pos}")
+
+    def _skip_ws(self):
+        self.pos = _WS_RE.match(self.data, self.pos).end()
+
+    def _peek(self):
+        self._skip_ws()
+        if self.pos >= len(self.data):
+            raise self._error("Unexpected end of json")
+        return self.data[self.pos:self.pos + 1]
+
+    def _expect(self, char):
+        if self._peek() != char:
+            raise self._error(f"Expecting '{char.decode()}'")
+        self.pos += 1
+
+    def ensure_end(self):
+        self._skip_ws()
+        if self.pos != len(self.data):
+            raise self._error("Extra data")
+
+    def is_object(self):
+        return self._peek() == b'{'
+
+    def iter_object(self):
+        """Iterate the keys of the object at current position.
+
+        After a key is yielded, the caller must consume its value by `read_value` or `skip_value`.
+        """
+        self._expect(b'{')
+        if self._peek() == b'}':
+            self.pos += 1
+            return
+        while True:
+            key = self.read_string()
+            self._expect(b':')
+            yield key
+            sep = self._peek()
+            self.pos += 1
+            if sep == b'}':
+                return
+            if sep != b',':
+                self.pos -= 1
+                raise self._error("Expecting ',' delimiter")
+
+    def read_string(self):
+        self._peek()
+        match = _STRING_RE.match(self.data, self.pos)
+        if match is None:
+            raise self._error("Expecting string")
+        self.pos = match.end()
+        return json.loads(match.group())
+
+    def read_value(self):
+        start = self.pos
+        self.skip_value()
+        return json.loads(self.data[start:self.pos])
+
+    def skip_value(self):
+        char = self._peek()
+        if char == b'"':
+            match = _STRING_RE.match(self.data, self.pos)
+            if match is None:
+                raise self._error("Unterminated string")
+            self.pos = match.end()
+        elif char in (b'{', b'['):
+            self._skip_container()
+        else:
+            match = _SCALAR_RE.match(self.data, self.pos)
+            if match is None:
+                raise self._error("Expecting value")
+            self.pos = match.end()
+
+    def _skip_container(self):
+        match = _CONTAINER_RUN_RE.match
+        pos = self.pos
+        depth = 0
+        while True:
+            m = match(self.data, pos)
+            if m is None:
+                raise self._error("Unterminated container")
+            if m.group(1) is not None:
+                depth += m.end() - m.start(1)
+            else:
+                closes = m.end() - m.start(2)
+                if closes >= depth:
+                    self.pos = m.start(2) + depth
+                    return
+                depth -= closes
+            pos = m.end()
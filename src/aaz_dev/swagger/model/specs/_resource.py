@@ -3,34 +3,118 @@ import enum
 import logging
 import os
 import re
+import sys
+from functools import lru_cache
 
-import inflect
 from fuzzywuzzy import fuzz
 
 from command.model.configuration import CMDResource
 from ._utils import map_path_2_repo
 from utils.base64 import b64encode_str, b64decode_str
+from utils.inflection import singular_noun, plural_noun
 from swagger.utils import exceptions
 
 logger = logging.getLogger('backend')
 
 
+_CAMEL_CASE_PATTERN = re.compile(r"^([a-zA-Z][a-z0-9]+)(([A-Z][a-z0-9]*)+)$")
+
+
+@lru_cache(maxsize=4096)
+def _get_operation_group_name(resource_id, operations):
+    """Return the operation group name of a resource and the operations whose operationId is in invalid format.
+
+    The result is shared by the resources with the same id and operations, such as the same resource in different
+    api versions.
+    """
+    operation_groups = set()
+    invalid_operations = []
+    for operation_id, method in operations:
+        op_group = _parse_operation_group_name(resource_id, operation_id)
+        if op_group is None:
+            invalid_operations.append((operation_id, method))
+        operation_groups.add(op_group)
+
+    if None in operation_groups:
+        return None, tuple(invalid_operations)
+
+    if len(operation_groups) == 1:
+        return operation_groups.pop(), ()
+
+    op_group_name = sorted(
+        operation_groups,
+        key=lambda nm: fuzz.partial_ratio(resource_id, nm),  # use the name which is closest to resource_id
+        reverse=True
+    )[0]
+    return op_group_name, ()
+
+
+def _parse_operation_group_name(resource_id, op_id):
+    # extract operation group name from operation_id
+    value = op_id.strip()
+    value = value.replace('-', '_')
+    if '_' in value:
+        parts = value.split('_')
+        op_group_name = parts[0]
+        if op_group_name.lower() in ("create", "get", "update", "delete", "patch"):
+            op_group_name = parts[1]
+    else:
+        if ' ' in value:
+            value = value.replace(' ', '')  # Changed to Camel Case
+        match = _CAMEL_CASE_PATTERN.match(value)
+        if not match:
+            return None
+        op_group_name = match[2]  # [OperationGroupName]
+
+    # Handle plural and singular cases
+    words = []
+    for part in resource_id.split('?')[0].split('/'):
+        if part == '{}' and len(words):
+            singular = singular_noun(words[-1])
+            if singular:
+                words[-1] = singular
+        else:
+            words.append(part.replace('_', ""))
+    op_group_singular = singular_noun(op_group_name) or op_group_name
+    words.reverse()  # search from tail
+    for word in words:
+        word_singular = singular_noun(word) or word
+        if len(word_singular) > 1 and op_group_singular.lower().endswith(word_singular.lower()):
+            if word == word_singular:
+                # use singular
+                op_group_name = op_group_singular
+            elif word != word_singular:
+                # use plural
+                op_group_plural = plural_noun(op_group_singular)
+                if op_group_plural is not False:
+                    op_group_name = op_group_plural
+            break
+    return op_group_name
+
+
+def _intern(value):
+    return sys.intern(value) if type(value) is str else value
+
+
 class Resource:
-    _CAMEL_CASE_PATTERN = re.compile(r"^([a-zA-Z][a-z0-9]+)(([A-Z][a-z0-9]*)+)$")
-    _inflect_engine = inflect.engine()
-
-    def __init__(self, resource_id, path, version, file_path, resource_provider, body):
-        self.path = path
-        self.id = resource_id
-        self._version = ResourceVersion(version)
-        self.file_path = file_path
+    # resource maps of a whole plane keep tens of thousands of resources, so the attributes are compact
+    __slots__ = ('path', 'id', '_version', 'file_path', 'resource_provider', 'file_path_version', 'operations',
+                 '_op_group_name')
+
+    def __init__(self, resource_id, path, version, file_path, resource_provider, body, file_path_version=None):
+        self.path = _intern(path)
+        self.id = _intern(resource_id)
+        self._version = ResourceVersion.get_shared(version)
+        self.file_path = _intern(file_path)
         self.resource_provider = resource_provider
-        self.file_path_version = self._get_file_path_version(file_path)
+        if file_path_version is None:
+            file_path_version = self.parse_file_path_version(file_path, resource_provider.folder_path)
+        self.file_path_version = file_path_version
 
         operations = {}
         for method, v in body.items():
             if isinstance(v, dict) and 'operationId' in v:
-                operations[v['operationId']] = method
+                operations[_intern(v['operationId'])] = _intern(method)
         self.operations = operations
 
     @property
@@ -52,75 +136,21 @@ class Resource:
         if hasattr(self, "_op_group_name"):
             return self._op_group_name
 
-        operation_groups = set()
-        for operation_id, method in self.operations.items():
-            op_group = self._parse_operation_group_name(operation_id, method)
-            operation_groups.add(op_group)
-
-        if None in operation_groups:
-            return None
-
-        if len(operation_groups) == 1:
-            return operation_groups.pop()
-
-        op_group_name = sorted(
-            operation_groups,
-            key=lambda nm: fuzz.partial_ratio(self.id, nm),  # use the name which is closest to resource_id
-            reverse=True
-        )[0]
+        op_group_name, invalid_operations = _get_operation_group_name(self.id, tuple(self.operations.items()))
+        for operation_id, method in invalid_operations:
+            logger.error(f"InvalidOperationIdFormat:"
+                         f"\toperationId should be in format of '[OperationGroupName]_[OperationName]' "
+                         f"or '[Verb][OperationGroupName]':\n"
+                         f"\tfile: {map_path_2_repo(self.file_path)}\n"
+                         f"\tpath: {self.path}\n"
+                         f"\tmethod: {method} operationId: {operation_id}\n")
         setattr(self, "_op_group_name", op_group_name)
         return op_group_name
 
-    def _parse_operation_group_name(self, op_id, method):
-        # extract operation group name from operation_id
-        value = op_id.strip()
-        value = value.replace('-', '_')
-        if '_' in value:
-            parts = value.split('_')
-            op_group_name = parts[0]
-            if op_group_name.lower() in ("create", "get", "update", "delete", "patch"):
-                op_group_name = parts[1]
-        else:
-            if ' ' in value:
-                value = value.replace(' ', '')  # Changed to Camel Case
-            match = self._CAMEL_CASE_PATTERN.match(value)
-            if not match:
-                logger.error(f"InvalidOperationIdFormat:"
-                             f"\toperationId should be in format of '[OperationGroupName]_[OperationName]' "
-                             f"or '[Verb][OperationGroupName]':\n"
-                             f"\tfile: {map_path_2_repo(self.file_path)}\n"
-                             f"\tpath: {self.path}\n"
-                             f"\tmethod: {method} operationId: {op_id}\n")
-                return None
-            op_group_name = match[2]  # [OperationGroupName]
-
-        # Handle plural and singular cases
-        words = []
-        for part in self.id.split('?')[0].split('/'):
-            if part == '{}' and len(words):
-                singular = self._inflect_engine.singular_noun(words[-1])
-                if singular:
-                    words[-1] = singular
-            else:
-                words.append(part.replace('_', ""))
-        op_group_singular = self._inflect_engine.singular_noun(op_group_name) or op_group_name
-        words.reverse()  # search from tail
-        for word in words:
-            word_singular = self._inflect_engine.singular_noun(word) or word
-            if len(word_singular) > 1 and op_group_singular.lower().endswith(word_singular.lower()):
-                if word == word_singular:
-                    # use singular
-                    op_group_name = op_group_singular
-                elif word != word_singular:
-                    # use plural
-                    op_group_plural = self._inflect_engine.plural_noun(op_group_singular)
-                    if op_group_plural is not False:
-                        op_group_name = op_group_plural
-                break
-        return op_group_name
-
-    def _get_file_path_version(self, file_path):
-        dir_parts = file_path.split(self.resource_provider.folder_path)[-1].split(os.sep)[:-1]
+    @staticmethod
+    def parse_file_path_version(file_path, folder_path):
+        """Parse the version in file path, the result can be shared by all the resources in the file."""
+        dir_parts = file_path.split(folder_path)[-1].split(os.sep)[:-1]
         dir_parts = [part for part in dir_parts if part]
         if len(dir_parts) < 2:
             raise exceptions.InvalidSwaggerValueError(f"Cannot parse file version", file_path)
@@ -151,10 +181,15 @@ class Resource:
 
 
 class ResourceVersion:
+    __slots__ = ('version', 'readiness', 'date')
+
     class Readiness(enum.Enum):
         Preview = 'preview'
         Stable = 'stable'
 
+    # shared instances keyed by version string, which must not be modified
+    _shared = {}
+
     def __init__(self, version):
         readiness = self.Readiness.Stable
         for keyword in ('beta', 'preview', 'privatepreview'):
@@ -174,6 +209,13 @@ class ResourceVersion:
             except ValueError as err:
                 logger.warning(f'ParseVersionDateError: Version={version} : {err}')
 
+    @classmethod
+    def get_shared(cls, version):
+        shared = cls._shared.get(version, None)
+        if shared is None:
+            shared = cls._shared.setdefault(version, cls(_intern(version)))
+        return shared
+
     def __str__(self):
         return self.version
 
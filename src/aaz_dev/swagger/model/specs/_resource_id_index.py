@@ -0,0 +1,126 @@
+import threading
+from collections import namedtuple
+
+
+ResourceIdIndexEntry = namedtuple('ResourceIdIndexEntry', ['module', 'rp', 'versions'])
+
+
+class _Node:
+    __slots__ = ('children', 'resource_id', 'entries')
+
+    def __init__(self):
+        self.children = {}
+        self.resource_id = None
+        self.entries = None
+
+
+class ResourceIdIndex:
+    """A trie of the resource ids in a plane, split by path segments.
+
+    Every resource id maps to the entries of `(module, rp, versions)` which define it. The lookups take the time of
+    the segments count in the resource id, no matter how many resource providers are indexed.
+    """
+
+    def __init__(self):
+        self._root = _Node()
+        self._rp_resource_ids = {}
+        self._lock = threading.RLock()
+
+    @staticmethod
+    def _split(resource_id):
+        path, sep, query = resource_id.partition('?')
+        segments = path.split('/')
+        if sep:
+            # the query part is a leaf segment, which distinguishes the resources defined by `x-ms-paths`
+            segments.append(sep + query)
+        return segments
+
+    def _find_node(self, resource_id):
+        node = self._root
+        for segment in self._split(resource_id):
+            node = node.children.get(segment, None)
+            if node is None:
+                return None
+        return node
+
+    def has_resource_provider(self, rp):
+        with self._lock:
+            return str(rp) in self._rp_resource_ids
+
+    def add_resource_provider(self, module, rp, resource_map):
+        """Index all the resources in the resource map of the resource provider, the previous ones are replaced."""
+        key = str(rp)
+        with self._lock:
+            self.remove_resource_provider(rp)
+            resource_ids = []
+            for resource_id, version_map in resource_map.items():
+                node = self._root
+                for segment in self._split(resource_id):
+                    child = node.children.get(segment, None)
+                    if child is None:
+                        child = node.children[segment] = _Node()
+                    node = child
+                if node.entries is None:
+                    node.resource_id = resource_id
+                    node.entries = []
+                node.entries.append(ResourceIdIndexEntry(str(module), rp, tuple(version_map.keys())))
+                resource_ids.append(resource_id)
+            self._rp_resource_ids[key] = resource_ids
+
+    def remove_resource_provider(self, rp):
+        key = str(rp)
+        with self._lock:
+            resource_ids = self._rp_resource_ids.pop(key, None)
+            if not resource_ids:
+                return
+            for resource_id in resource_ids:
+                path = [self._root]
+                for segment in self._split(resource_id):
+                    path.append(path[-1].children[segment])
+                node = path[-1]
+                node.entries = [entry for entry in node.entries if str(entry.rp) != key] or None
+                if node.entries is None:
+                    node.resource_id = None
+                # prune the branches without resources, so that `has_children` keeps exact
+                segments = self._split(resource_id)
+                for idx in range(len(segments), 0, -1):
+                    node = path[idx]
+                    if node.children or node.entries is not None:
+                        break
+                    del path[idx - 1].children[segments[idx - 1]]
+
+    def get(self, resource_id):
+        """Return the entries of the resource id, or an empty list when it is not indexed."""
+        with self._lock:
+            node = self._find_node(resource_id)
+            if node is None or node.entries is None:
+                return []
+            return [*node.entries]
+
+    def __contains__(self, resource_id):
+        return len(self.get(resource_id)) > 0
+
+    def has_children(self, resource_id):
+        """Whether any resource id is under the resource id, such as the sub resources of a resource."""
+        with self._lock:
+            node = self._find_node(resource_id)
+            return node is not None and len(node.children) > 0
+
+    def iter_prefix(self, prefix):
+        """Return the `(resource_id, entries)` of the resource ids under the prefix, including the prefix itself.
+
+        The prefix is matched by whole path segments, so `/subscriptions/{}/providers/microsoft.foo` doesn't match
+        `/subscriptions/{}/providers/microsoft.foobar`.
+        """
+        with self._lock:
+            node = self._find_node(prefix.rstrip('/')) if prefix.rstrip('/') else self._root
+            if node is None:
+                return []
+            results = []
+            stack = [node]
+            while stack:
+                node = stack.pop()
+                if node.entries is not None:
+                    results.append((node.resource_id, [*node.entries]))
+                stack.extend(node.children[segment] for segment in sorted(node.children, reverse=True))
+            return results
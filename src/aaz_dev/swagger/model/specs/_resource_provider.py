@@ -1,18 +1,51 @@
 import datetime
-import json
 import logging
 import os
 import re
+import threading
 from collections import OrderedDict
 
 import yaml
 
 from swagger.utils.tools import swagger_resource_path_to_resource_id
+from utils.config import Config
+from utils.git_changes import get_git_snapshot, get_file_fingerprint
 from ._resource import Resource, ResourceVersion
+from ._resource_id_index import ResourceIdIndex
+from ._swagger_index import load_swagger_summary, load_swagger_summaries, summary_path_body
 from ._utils import map_path_2_repo
 
 logger = logging.getLogger('backend')
 
+# input files of the yaml blocks in readme.md, keyed by path: (mtime_ns, [(tag, files), ...])
+_readme_input_files_cache = {}
+_readme_input_files_lock = threading.Lock()
+
+_RE_YAML_BLOCK_START = re.compile(r'```\s*yaml\s*(.*\$\(\s*tag\s*\)\s*==\s*[\'"]\s*(.*)\s*[\'"].*)?$')
+
+
+def _iter_readme_yaml_blocks(readme):
+    """Iterate the yaml code blocks in readme in one pass, yields the flags, the tag in flags and the yaml body.
+
+    A block starts at a line contains ```yaml and ends at the next line which is a bare ``` fence. If a line with
+    another fence is met before that, the block is dropped and that line is checked as a start of block.
+    """
+    lines = readme.split('\n')
+    # the last line is not ended with a new line, so it cannot start or end a block
+    end = len(lines) - 1
+    idx = 0
+    while idx < end:
+        match = _RE_YAML_BLOCK_START.search(lines[idx])
+        idx += 1
+        if match is None:
+            continue
+        start = idx
+        while idx < end and '```' not in lines[idx]:
+            idx += 1
+        if idx < end and lines[idx].startswith('```') and not lines[idx][3:].strip():
+            yield match[1], match[2], ''.join(f'{line}\n' for line in lines[start:idx])
+            idx += 1
+
 
 class OpenAPIResourceProvider:
 
@@ -25,34 +58,182 @@ class OpenAPIResourceProvider:
         if readme_path is None:
             logger.warning(f"MissReadmeFile: {self} : {map_path_2_repo(folder_path)}")
         self._tags = None
+        self._tags_mtime = None
+        self._file_tags = None
         self._resource_map = None
+        # the resource map and the trie of its resource ids
+        self._resource_id_index = None
+        self._index = None
+        # tables to refresh the resource map by changed files:
+        #   file path => fingerprint, file path => resources parsed in file, (resource id, version) => file paths,
+        #   (resource id, version) => the resource chosen by `_replace_current_resource`
+        self._file_fingerprints = {}
+        self._file_resources = {}
+        self._resource_key_files = {}
+        self._resource_winners = {}
+        self._resource_tables_readme_mtime = None
+        # whether the files in tables are listed from git snapshot, which lists them in a different order of os.walk
+        self._resource_tables_by_git = None
         self._ignore_resources = {f'/providers/{self.name}/operations'.lower(), }
 
     def __str__(self):
         return f'{self.swagger_module}/ResourceProviders/{self.name}'
 
+    def get_fingerprint(self):
+        """Return a value which changes when any swagger file or the readme file of the resource provider changes.
+
+        The files are listed from git when `Config.GIT_CHANGE_DETECTION` is enabled, then only the changed files are
+        checked by `os.stat`.
+        """
+        snapshot = get_git_snapshot(self.folder_path)
+        stats = []
+        for file_path in self._list_swagger_file_paths(snapshot):
+            try:
+                stats.append((file_path, *self._get_file_fingerprint(file_path, snapshot)))
+            except OSError:
+                continue
+        if self._readme_path:
+            try:
+                stats.append((self._readme_path, *self._get_file_fingerprint(self._readme_path, snapshot)))
+            except OSError:
+                pass
+        return hash(tuple(stats))
+
+    @staticmethod
+    def _get_file_fingerprint(file_path, snapshot):
+        fingerprint = get_file_fingerprint(file_path, snapshot)
+        return (fingerprint, ) if isinstance(fingerprint, str) else tuple(fingerprint)
+
+    def clear_cache(self):
+        """Drop the cached tags and resource map.
+
+        The resources parsed in files are kept, they are checked by file fingerprints when the resource map is built
+        again, so only the changed files are parsed.
+        """
+        self._tags = None
+        self._file_tags = None
+        self._resource_map = None
+        self._resource_id_index = None
+
     def get_resource_map(self, refresh=False):
         if refresh or not self._resource_map:
-            resource_map = {}
-            for root, dirs, files in os.walk(self.folder_path):
-                if 'example' in root:
+            self._resource_map = self._update_resource_map()
+        resource_map = self._resource_map
+        return resource_map
+
+    def get_resource_id_index(self):
+        """Return the trie of the resource ids in the resource map, which is rebuilt when the map is changed."""
+        resource_map = self.get_resource_map()
+        if self._resource_id_index is None or self._resource_id_index[0] is not resource_map:
+            index = ResourceIdIndex()
+            index.add_resource_provider(self.swagger_module, self, resource_map)
+            self._resource_id_index = (resource_map, index)
+        return self._resource_id_index[1]
+
+    def _list_swagger_file_paths(self, snapshot):
+        """List the swagger files from git snapshot if it's available, so that the folder is not walked and only the
+        files changed in working tree are checked by `os.stat`. The files removed from working tree are included."""
+        if snapshot is not None:
+            return [
+                file_path for file_path in snapshot.iter_files(self.folder_path)
+                if file_path.endswith('.json') and 'example' not in os.path.dirname(file_path)
+            ]
+        return self._iter_swagger_file_paths()
+
+    def _iter_swagger_file_paths(self):
+        for root, dirs, files in os.walk(self.folder_path):
+            if 'example' in root:
+                continue
+            for file in files:
+                if not file.endswith('.json'):
                     continue
-                for file in files:
-                    if not file.endswith('.json'):
+                yield os.path.join(root, file)
+
+    def _update_resource_map(self):
+        """Build the resource map by parsing the files changed since the last build.
+
+        The resources of changed or removed files are dropped, then the winners of the affected
+        `(resource id, version)` keys are chosen again. All the tables are rebuilt when the readme file changed,
+        because tags decide the winners. The files are listed from git snapshot when it's available.
+        """
+        readme_mtime = self._get_readme_mtime() if self._readme_path else None
+        snapshot = get_git_snapshot(self.folder_path)
+        if readme_mtime != self._resource_tables_readme_mtime or (snapshot is not None) != self._resource_tables_by_git:
+            self._file_fingerprints = {}
+            self._file_resources = {}
+            self._resource_key_files = {}
+            self._resource_winners = {}
+            self._resource_tables_readme_mtime = readme_mtime
+            self._resource_tables_by_git = snapshot is not None
+
+        file_paths = []
+        fingerprints = {}
+        for file_path in self._list_swagger_file_paths(snapshot):
+            try:
+                fingerprints[file_path] = self._get_file_fingerprint(file_path, snapshot)
+            except OSError:
+                continue
+            file_paths.append(file_path)
+
+        changed_file_paths = [
+            file_path for file_path in file_paths
+            if self._file_fingerprints.get(file_path, None) != fingerprints[file_path]
+        ]
+        removed_file_paths = set(self._file_fingerprints.keys()).difference(fingerprints.keys())
+        if not changed_file_paths and not removed_file_paths and self._resource_map is not None:
+            return self._resource_map
+
+        full_build = not self._file_fingerprints
+        summaries = self._load_file_summaries(changed_file_paths, snapshot)
+        # parse before updating the tables, so that they are kept consistent when any file is invalid
+        file_resources = {}
+        for file_path in changed_file_paths:
+            file_resources[file_path] = [
+                resource for resource in self._parse_resources_in_file(file_path, summaries[file_path])
+                if resource.id not in self._ignore_resources
+            ]
+
+        affected_keys = set()
+        for file_path in [*removed_file_paths, *changed_file_paths]:
+            for resource in self._file_resources.pop(file_path, []):
+                key = (resource.id, resource.version)
+                affected_keys.add(key)
+                file_path_set = self._resource_key_files[key]
+                file_path_set.discard(file_path)
+                if not file_path_set:
+                    del self._resource_key_files[key]
+            self._file_fingerprints.pop(file_path, None)
+
+        for file_path, resources in file_resources.items():
+            for resource in resources:
+                key = (resource.id, resource.version)
+                affected_keys.add(key)
+                self._resource_key_files.setdefault(key, set()).add(file_path)
+            self._file_resources[file_path] = resources
+            self._file_fingerprints[file_path] = fingerprints[file_path]
+
+        # choose the winners of affected keys in the walk order of files, which is the same as a full build
+        file_orders = {file_path: idx for idx, file_path in enumerate(file_paths)}
+        for key in affected_keys:
+            curr_resource = None
+            for file_path in sorted(self._resource_key_files.get(key, ()), key=file_orders.__getitem__):
+                for resource in self._file_resources[file_path]:
+                    if (resource.id, resource.version) != key:
                         continue
-                    file_path = os.path.join(root, file)
-                    for resource in self._parse_resources_in_file(file_path):
-                        if resource.id in self._ignore_resources:
-                            continue
-                        if resource.id not in resource_map:
-                            resource_map[resource.id] = {}
-                        if self._replace_current_resource(
-                                curr_resource=resource_map[resource.id].get(resource.version, None),
-                                resource=resource
-                        ):
-                            resource_map[resource.id][resource.version] = resource
-            self._resource_map = resource_map
-        resource_map = self._resource_map
+                    if self._replace_current_resource(curr_resource=curr_resource, resource=resource):
+                        curr_resource = resource
+            if curr_resource is None:
+                self._resource_winners.pop(key, None)
+            else:
+                self._resource_winners[key] = curr_resource
+
+        resource_map = {}
+        for file_path in file_paths:
+            for resource in self._file_resources[file_path]:
+                version_map = resource_map.setdefault(resource.id, {})
+                if resource.version not in version_map:
+                    version_map[resource.version] = self._resource_winners[(resource.id, resource.version)]
+        self._save_index(prune=full_build)
         return resource_map
 
     def get_resource_map_by_tag(self, tag):
@@ -61,8 +242,10 @@ class OpenAPIResourceProvider:
             logger.error(f"Tag: `{tag}` is not exist")
             return resource_map
 
-        for file_path in self.tags[tag]:
-            for resource in self._parse_resources_in_file(file_path):
+        file_paths = sorted(self.tags[tag])
+        summaries = self._load_file_summaries(file_paths)
+        for file_path in file_paths:
+            for resource in self._parse_resources_in_file(file_path, summaries[file_path]):
                 if resource.id in self._ignore_resources:
                     continue
                 if resource.id not in resource_map:
@@ -72,12 +255,16 @@ class OpenAPIResourceProvider:
                         resource=resource
                 ):
                     resource_map[resource.id][resource.version] = resource
+        self._save_index()
         return resource_map
 
     @property
     def tags(self):
-        if self._tags is None:
+        readme_mtime = self._get_readme_mtime() if self._readme_path else None
+        if self._tags is None or self._tags_mtime != readme_mtime:
             self._tags = self._parse_readme_input_file_tags()
+            self._tags_mtime = readme_mtime
+            self._file_tags = None
         return self._tags
 
     def _parse_readme_input_file_tags(self):
@@ -85,15 +272,33 @@ class OpenAPIResourceProvider:
         if self._readme_path is None:
             return tags
 
+        for tag, files in self._load_readme_input_files():
+            if tag is None:
+                tag = ''
+            tag = OpenAPIResourceProviderTag(tag.strip(), self)
+            if tag not in tags:
+                tags[tag] = set()
+            tags[tag] = tags[tag].union(files)
+
+        tags = [*tags.items()]
+        tags.sort(key=lambda item: item[0].date, reverse=True)
+        tags = OrderedDict(tags)
+        return tags
+
+    def _load_readme_input_files(self):
+        """Load the input files of yaml blocks in readme, the result is shared by resource providers until the readme
+        file changed."""
+        readme_mtime = self._get_readme_mtime()
+        with _readme_input_files_lock:
+            cached = _readme_input_files_cache.get(self._readme_path, None)
+        if cached is not None and cached[0] == readme_mtime:
+            return cached[1]
+
         with open(self._readme_path, 'r', encoding='utf-8') as f:
             readme = f.read()
 
-        re_yaml = re.compile(
-            r'```\s*yaml\s*(.*\$\(\s*tag\s*\)\s*==\s*[\'"]\s*(.*)\s*[\'"].*)?\n((((?!```).)*\n)*)```\s*\n',
-            flags=re.MULTILINE)
-        for piece in re_yaml.finditer(readme):
-            flags = piece[1]
-            yaml_body = piece[3]
+        input_files = []
+        for flags, tag, yaml_body in _iter_readme_yaml_blocks(readme):
             if 'input-file' not in yaml_body:
                 continue
 
@@ -113,24 +318,29 @@ class OpenAPIResourceProvider:
                 files.append(file_path)
 
             if len(files):
-                tag = piece[2]
-                if tag is None:
-                    tag = ''
-                tag = OpenAPIResourceProviderTag(tag.strip(), self)
-                if tag not in tags:
-                    tags[tag] = set()
-                tags[tag] = tags[tag].union(files)
+                input_files.append((tag, files))
 
-        tags = [*tags.items()]
-        tags.sort(key=lambda item: item[0].date, reverse=True)
-        tags = OrderedDict(tags)
-        return tags
+        with _readme_input_files_lock:
+            _readme_input_files_cache[self._readme_path] = (readme_mtime, input_files)
+        return input_files
+
+    def _get_readme_mtime(self):
+        try:
+            return os.stat(self._readme_path).st_mtime_ns
+        except OSError:
+            return None
 
     def _fetch_latest_tag(self, file_path):
-        for tag, file_set in self.tags.items():
-            if file_path in file_set:
-                return tag
-        return None
+        tags = self.tags
+        if self._file_tags is None:
+            # inverted index of file path to the tags using it, the tags are ordered by date from latest
+            file_tags = {}
+            for tag, file_set in tags.items():
+                for path in file_set:
+                    file_tags.setdefault(path, []).append(tag)
+            self._file_tags = file_tags
+        file_tags = self._file_tags.get(file_path, None)
+        return file_tags[0] if file_tags else None
 
     def _replace_current_resource(self, curr_resource, resource):
         if curr_resource is None:
@@ -180,40 +390,87 @@ class OpenAPIResourceProvider:
                        f'\tFile: {map_path_2_repo(resource.file_path)} Path: {resource.path}')
         return False
 
-    def _parse_resources_in_file(self, file_path):
+    def _load_file_summaries(self, file_paths, snapshot=None):
+        """Load the summaries of swagger files.
+
+        Files which are not in index or changed are parsed in a process pool when `Config.SWAGGER_SCAN_WORKERS` is
+        larger than 1, the summaries are returned in a dict so that the resources are still merged in the walk order.
+        """
+        summaries = {}
+        pending = []
+        index = self._get_index()
+        for file_path in file_paths:
+            fingerprint = None
+            if index is not None:
+                fingerprint = index.get_fingerprint(file_path, snapshot)
+                summary = index.get_cached_file_summary(file_path, fingerprint)
+                if summary is not None:
+                    summaries[file_path] = summary
+                    continue
+            pending.append((file_path, fingerprint))
+
+        results = None
+        workers = Config.SWAGGER_SCAN_WORKERS
+        if workers > 1 and len(pending) > 1:
+            results = load_swagger_summaries([file_path for file_path, _ in pending], workers=workers)
+        if results is None:
+            results = [load_swagger_summary(file_path) for file_path, _ in pending]
+
+        for (file_path, fingerprint), summary in zip(pending, results):
+            if index is not None:
+                index.set_file_summary(file_path, fingerprint, summary)
+            summaries[file_path] = summary
+        return summaries
+
+    def _get_index(self):
+        if self._index is None:
+            specs_index = getattr(self.swagger_module, 'index', None)
+            if specs_index is not None:
+                self._index = specs_index.get_folder_index(self.folder_path)
+        return self._index
+
+    def _save_index(self, prune=False):
+        index = self._get_index()
+        if index is not None:
+            index.save(prune=prune)
+
+    def _parse_resources_in_file(self, file_path, summary):
         resources = []
 
-        try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                body = json.load(f)
-        except Exception as err:
-            logger.error(f'InvalidSwaggerFile: {self} : ParseJsonFailed: {file_path} : {err}')
+        if 'error' in summary:
+            logger.error(f'InvalidSwaggerFile: {self} : ParseJsonFailed: {file_path} : {summary["error"]}')
             return resources
 
         # check swagger version
-        swagger_version = body.get('swagger', None)
+        swagger_version = summary['swagger']
         if swagger_version != '2.0':
             logger.error(f'InvalidSwaggerFile: {self} : invalid swagger version {swagger_version} in file {file_path}')
             return resources
 
         # fetch api-version
-        info = body.get('info', {})
-        version = info.get('version', None)
+        version = summary['version']
         if not version:
             logger.error(f'InvalidSwaggerFile: {self} : invalid info version {version} in file {file_path}')
 
-        for path, value in body.get('paths', {}).items():
+        if not summary['paths'] and not summary['x-ms-paths']:
+            return resources
+        # shared by the resources in file
+        file_path_version = Resource.parse_file_path_version(file_path, self.folder_path)
+
+        for path, operations in summary['paths'].items():
             resource = Resource(
                 resource_id=swagger_resource_path_to_resource_id(path),
-                path=path, version=version, file_path=file_path, resource_provider=self, body=value)
+                path=path, version=version, file_path=file_path, resource_provider=self,
+                body=summary_path_body(operations), file_path_version=file_path_version)
             resources.append(resource)
 
         # x-ms-paths:
         #   alternative to Paths Object that allows Path Item Object to have query parameters for non pure REST APIs
-        for path, value in body.get('x-ms-paths', {}).items():
+        for path, operations in summary['x-ms-paths'].items():
             resource = Resource(
                 resource_id=swagger_resource_path_to_resource_id(path),
-                path=path, version=version, file_path=file_path, resource_provider=self, body=value)
+                path=path, version=version, file_path=file_path, resource_provider=self,
+                body=summary_path_body(operations), file_path_version=file_path_version)
             resources.append(resource)
 
         return resources
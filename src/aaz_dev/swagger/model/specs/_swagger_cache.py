@@ -0,0 +1,159 @@
+import hashlib
+import json
+import logging
+import os
+import pickle
+import threading
+
+from utils.config import Config
+
+logger = logging.getLogger('backend')
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def get_swagger_body_cache():
+    """Return the shared body cache configured by `Config`, or None when the cache is disabled."""
+    if not Config.SWAGGER_CACHE_ENABLED:
+        return None
+    key = (Config.get_swagger_cache_folder(), Config.SWAGGER_CACHE_MAX_SIZE)
+    with _caches_lock:
+        if key not in _caches:
+            _caches[key] = SwaggerBodyCache(*key)
+        return _caches[key]
+
+
+class SwaggerBodyCache:
+    """Cache of patched swagger bodies in pickle format.
+
+    An entry is keyed by the file path and validated by the size and mtime of the file. When only the mtime changed,
+    such as the file is checked out again, the entry is still used if the sha1 of the file content is the same.
+    The least recently used entries are removed when the total size exceeds `max_size` in MB.
+    """
+
+    VERSION = 1
+
+    def __init__(self, cache_folder, max_size):
+        self.cache_folder = cache_folder
+        self.max_size = int(max_size * 1024 * 1024)
+        self._total_size = None
+        self._lock = threading.Lock()
+
+    def load(self, file_path, patch):
+        """Load the body of a swagger file, `patch` is called on the body which is not from cache."""
+        stat = os.stat(file_path)
+        entry_path = self._get_entry_path(file_path)
+        header = self._read_header(entry_path)
+        if header is not None and header['size'] == stat.st_size and header['mtime'] == stat.st_mtime_ns:
+            body = self._read_body(entry_path)
+            if body is not None:
+                return body
+
+        with open(file_path, 'rb') as f:
+            data = f.read()
+        digest = hashlib.sha1(data).hexdigest()
+        if header is not None and header['size'] == stat.st_size and header['hash'] == digest:
+            body = self._read_body(entry_path)
+            if body is not None:
+                self._write_entry(entry_path, file_path, stat, digest, body)
+                return body
+
+        body = json.loads(data.decode('utf-8'))
+        patch(body)
+        self._write_entry(entry_path, file_path, stat, digest, body)
+        return body
+
+    def _get_entry_path(self, file_path):
+        key = hashlib.sha1(os.path.abspath(file_path).encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_folder, key[:2], f"{key}.pickle")
+
+    def _read_header(self, entry_path):
+        try:
+            with open(entry_path, 'rb') as f:
+                header = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as err:
+            logger.warning(f"InvalidSwaggerCacheEntry: {entry_path} : {err}")
+            return None
+        if not isinstance(header, dict) or header.get('version', None) != self.VERSION:
+            return None
+        return header
+
+    def _read_body(self, entry_path):
+        try:
+            with open(entry_path, 'rb') as f:
+                pickle.load(f)
+                body = pickle.load(f)
+            # mark the entry as recently used
+            os.utime(entry_path)
+        except Exception as err:
+            logger.warning(f"InvalidSwaggerCacheEntry: {entry_path} : {err}")
+            return None
+        return body
+
+    def _write_entry(self, entry_path, file_path, stat, digest, body):
+        header = {
+            "version": self.VERSION,
+            "file": file_path,
+            "size": stat.st_size,
+            "mtime": stat.st_mtime_ns,
+            "hash": digest,
+        }
+        try:
+            origin_size = os.path.getsize(entry_path)
+        except OSError:
+            origin_size = 0
+        try:
+            os.makedirs(os.path.dirname(entry_path), exist_ok=True)
+            tmp_path = f"{entry_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                pickle.dump(header, f, protocol=pickle.HIGHEST_PROTOCOL)
+                pickle.dump(body, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, entry_path)
+            size = os.path.getsize(entry_path)
+        except OSError as err:
+            logger.warning(f"SaveSwaggerCacheFailed: {entry_path} : {err}")
+            return
+        with self._lock:
+            if self._total_size is None:
+                self._total_size = self._scan_entries_size()
+            else:
+                self._total_size += size - origin_size
+            if self._total_size > self.max_size:
+                self._evict(keep=entry_path)
+
+    def _iter_entries(self):
+        try:
+            folders = os.scandir(self.cache_folder)
+        except OSError:
+            return
+        with folders:
+            for folder in folders:
+                if not folder.is_dir():
+                    continue
+                with os.scandir(folder.path) as entries:
+                    for entry in entries:
+                        if entry.name.endswith('.pickle'):
+                            try:
+                                yield entry.path, entry.stat()
+                            except OSError:
+                                continue
+
+    def _scan_entries_size(self):
+        return sum(stat.st_size for _, stat in self._iter_entries())
+
+    def _evict(self, keep):
+        entries = sorted(self._iter_entries(), key=lambda item: item[1].st_mtime_ns)
+        self._total_size = sum(stat.st_size for _, stat in entries)
+        for entry_path, stat in entries:
+            if self._total_size <= self.max_size:
+                break
+            if entry_path == keep:
+                continue
+            try:
+                os.remove(entry_path)
+            except OSError:
+                continue
+            self._total_size -= stat.st_size
@@ -0,0 +1,88 @@
+import logging
+import re
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger('backend')
+
+
+class SwaggerDependencyGraph:
+    """The graph of swagger files referenced by `$ref` values.
+
+    The raw text of files is scanned for the references to other files, without parsing json, so the transitive
+    files of the selected ones are known before linking starts. Example files are not included, because they are not
+    linked.
+    """
+
+    # the keys whose string value is a reference
+    _RE_FILE_REF = re.compile(r'"(?:\$ref|x-ms-odata|final-state-schema)"\s*:\s*"([^"#]+)')
+
+    def __init__(self, parse_ref_link, workers=1):
+        self._parse_ref_link = parse_ref_link
+        self._workers = workers
+        # referenced files of every scanned file, in the order of scanning
+        self.files = OrderedDict()
+
+    def add_files(self, file_paths):
+        """Scan the files and the files referenced by them transitively.
+
+        :return: the new scanned files.
+        """
+        scanned = []
+        pending = [file_path for file_path in OrderedDict.fromkeys(file_paths) if file_path not in self.files]
+        executor = ThreadPoolExecutor(max_workers=self._workers) if self._workers > 1 else None
+        try:
+            while pending:
+                if executor is not None and len(pending) > 1:
+                    results = list(executor.map(self._scan_file, pending))
+                else:
+                    results = [self._scan_file(file_path) for file_path in pending]
+                next_pending = OrderedDict()
+                for file_path, refs in zip(pending, results):
+                    self.files[file_path] = refs
+                    scanned.append(file_path)
+                    for ref_file_path in refs:
+                        if ref_file_path not in self.files:
+                            next_pending[ref_file_path] = None
+                pending = [*next_pending.keys()]
+        finally:
+            if executor is not None:
+                executor.shutdown(wait=True)
+        return scanned
+
+    def _scan_file(self, file_path):
+        try:
+            with open(file_path, 'r', encoding='utf-8') as f:
+                text = f.read()
+        except (OSError, UnicodeDecodeError) as err:
+            # the error is raised when the file is loaded by linking
+            logger.debug(f"ScanSwaggerReferencesFailed: {file_path} : {err}")
+            return []
+        refs = OrderedDict()
+        for match in self._RE_FILE_REF.finditer(text):
+            try:
+                ref_file_path = self._parse_ref_link((file_path,), match[1])[0]
+            except Exception:
+                continue
+            if ref_file_path != file_path and 'example' not in ref_file_path.lower():
+                refs[ref_file_path] = None
+        return [*refs.keys()]
+
+    def get_transitive_files(self, file_paths):
+        """Return the files and all the files referenced by them, in the breadth first order."""
+        self.add_files(file_paths)
+        visited = OrderedDict.fromkeys(file_paths)
+        queue = [*visited.keys()]
+        while queue:
+            next_queue = []
+            for file_path in queue:
+                for ref_file_path in self.files.get(file_path, ()):
+                    if ref_file_path not in visited:
+                        visited[ref_file_path] = None
+                        next_queue.append(ref_file_path)
+            queue = next_queue
+        return [*visited.keys()]
+
+    def get_referrers(self, file_path):
+        """Return the scanned files which reference the file directly."""
+        return [path for path, refs in self.files.items() if file_path in refs]
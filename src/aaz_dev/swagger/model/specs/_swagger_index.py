@@ -0,0 +1,278 @@
+import atexit
+import hashlib
+import json
+import logging
+import mmap
+import os
+import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from utils.git_changes import get_file_fingerprint
+from ._json_skimmer import JsonSkimmer
+
+logger = logging.getLogger('backend')
+
+_executor = None
+_executor_workers = None
+_executor_lock = threading.Lock()
+
+
+def parse_swagger_summary(file_path):
+    """Parse the fields of a swagger file which are required by resource discovery.
+
+    The summary contains `swagger`, `info.version` and the operationIds of every path item in `paths` and `x-ms-paths`.
+    The file is memory mapped and skimmed, the other sections such as `definitions`, `parameters` and `responses` are
+    skipped without being loaded.
+    """
+    with open(file_path, 'rb') as f:
+        try:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # empty file cannot be mapped
+            data = b''
+        try:
+            return _skim_swagger_summary(JsonSkimmer(data))
+        finally:
+            if isinstance(data, mmap.mmap):
+                data.close()
+
+
+_MISSING = object()
+
+
+def _skim_swagger_summary(skimmer):
+    if not skimmer.is_object():
+        raise ValueError("Swagger body is not an object")
+
+    summary = {
+        "swagger": None,
+        "version": None,
+        "paths": {},
+        "x-ms-paths": {},
+    }
+    for key in skimmer.iter_object():
+        if key == 'swagger':
+            summary['swagger'] = skimmer.read_value()
+        elif key == 'info':
+            summary['version'] = None
+            if not skimmer.is_object():
+                skimmer.skip_value()
+                continue
+            for info_key in skimmer.iter_object():
+                if info_key == 'version':
+                    summary['version'] = skimmer.read_value()
+                else:
+                    skimmer.skip_value()
+        elif key in ('paths', 'x-ms-paths'):
+            paths = {}
+            if skimmer.is_object():
+                for path in skimmer.iter_object():
+                    paths[path] = _skim_path_item(skimmer)
+            else:
+                skimmer.skip_value()
+            summary[key] = paths
+        else:
+            skimmer.skip_value()
+    skimmer.ensure_end()
+    return summary
+
+
+def _skim_path_item(skimmer):
+    if not skimmer.is_object():
+        skimmer.skip_value()
+        return []
+
+    # duplicated keys keep the position of the first one and the value of the last one, the same as json.load
+    operations = {}
+    for method in skimmer.iter_object():
+        op_id = _MISSING
+        if skimmer.is_object():
+            for op_key in skimmer.iter_object():
+                if op_key == 'operationId':
+                    op_id = skimmer.read_value()
+                else:
+                    skimmer.skip_value()
+        else:
+            skimmer.skip_value()
+        operations[method] = op_id
+    return [[method, op_id] for method, op_id in operations.items() if op_id is not _MISSING]
+
+
+def load_swagger_summary(file_path):
+    """Same as `parse_swagger_summary`, but return the error in summary instead of raising it."""
+    try:
+        return parse_swagger_summary(file_path)
+    except Exception as err:
+        return {"error": str(err)}
+
+
+def _shutdown_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            if sys.version_info >= (3, 9):
+                _executor.shutdown(wait=False, cancel_futures=True)
+            else:
+                # `cancel_futures` is not supported before python 3.9
+                _executor.shutdown(wait=False)
+            _executor = None
+
+
+atexit.register(_shutdown_executor)
+
+
+def load_swagger_summaries(file_paths, workers):
+    """Load the summaries of swagger files in a process pool.
+
+    The pool is kept for the process lifetime, so that it can be reused by all the resource providers.
+    Return the summaries in the order of `file_paths`, or None when the process pool is not available.
+    """
+    global _executor, _executor_workers
+    with _executor_lock:
+        if _executor is None or _executor_workers != workers:
+            if _executor is not None:
+                _executor.shutdown(wait=False)
+            try:
+                _executor = ProcessPoolExecutor(max_workers=workers)
+            except (OSError, NotImplementedError) as err:
+                logger.warning(f"ProcessPoolUnavailable: {err}")
+                _executor = None
+                return None
+            _executor_workers = workers
+        executor = _executor
+    chunksize = max(1, len(file_paths) // (workers * 4))
+    return list(executor.map(load_swagger_summary, file_paths, chunksize=chunksize))
+
+
+def summary_path_body(operations):
+    """Convert the operations of a path in summary back to a minimal path item body."""
+    return {method: {"operationId": op_id} for method, op_id in operations}
+
+
+class SwaggerFolderIndex:
+    """Index of the swagger files in one resource provider folder.
+
+    Every entry records the size and mtime of a swagger file with its summary, so that unchanged files can be
+    revalidated by `os.stat` without opening them again. The git blob hash is recorded instead when the file is
+    unchanged in a git snapshot, which is kept after checkouts touch the mtime.
+    """
+
+    VERSION = 1
+
+    def __init__(self, folder_path, index_path):
+        self.folder_path = folder_path
+        self.index_path = index_path
+        self._entries = None
+        self._touched = set()
+        self._dirty = False
+        self._lock = threading.RLock()
+
+    def _load(self):
+        if self._entries is not None:
+            return
+        self._entries = {}
+        if not os.path.isfile(self.index_path):
+            return
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError) as err:
+            logger.warning(f"InvalidSwaggerIndexFile: {self.index_path} : {err}")
+            return
+        if data.get('version', None) != self.VERSION or data.get('folder', None) != self.folder_path:
+            return
+        self._entries = data.get('files', {})
+
+    def _get_key(self, file_path):
+        return os.path.relpath(file_path, self.folder_path).replace(os.sep, '/')
+
+    @staticmethod
+    def get_fingerprint(file_path, snapshot=None):
+        return get_file_fingerprint(file_path, snapshot)
+
+    def get_cached_file_summary(self, file_path, fingerprint):
+        """Return the summary of the swagger file if it's indexed with the same fingerprint, else None."""
+        key = self._get_key(file_path)
+        with self._lock:
+            self._load()
+            self._touched.add(key)
+            entry = self._entries.get(key, None)
+            if entry is not None and entry['fingerprint'] == fingerprint:
+                return entry['summary']
+        return None
+
+    def set_file_summary(self, file_path, fingerprint, summary):
+        key = self._get_key(file_path)
+        with self._lock:
+            self._load()
+            self._touched.add(key)
+            self._entries[key] = {
+                "fingerprint": fingerprint,
+                "summary": summary,
+            }
+            self._dirty = True
+
+    def get_file_summary(self, file_path):
+        """Return the summary of the swagger file. Summary contains an `error` key when the file is invalid."""
+        fingerprint = self.get_fingerprint(file_path)
+        summary = self.get_cached_file_summary(file_path, fingerprint)
+        if summary is None:
+            summary = load_swagger_summary(file_path)
+            self.set_file_summary(file_path, fingerprint, summary)
+        return summary
+
+    def save(self, prune=False):
+        """Write the index back to disk when it changed.
+
+        :param prune: remove the entries of the files which are not accessed since the index is loaded.
+        """
+        with self._lock:
+            if prune:
+                self._load()
+            if self._entries is None:
+                return
+            if prune:
+                for key in [*self._entries.keys()]:
+                    if key not in self._touched:
+                        del self._entries[key]
+                        self._dirty = True
+            if not self._dirty:
+                return
+            data = {
+                "version": self.VERSION,
+                "folder": self.folder_path,
+                "files": self._entries,
+            }
+            try:
+                os.makedirs(os.path.dirname(self.index_path), exist_ok=True)
+                tmp_path = f"{self.index_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    json.dump(data, f, ensure_ascii=False)
+                os.replace(tmp_path, self.index_path)
+            except OSError as err:
+                logger.warning(f"SaveSwaggerIndexFailed: {self.index_path} : {err}")
+                return
+            self._dirty = False
+
+
+class SwaggerSpecsIndex:
+    """Persistent index of an azure-rest-api-specs folder, sharded by resource provider folders."""
+
+    def __init__(self, folder_path, index_folder):
+        self.folder_path = os.path.abspath(folder_path)
+        root_hash = hashlib.sha1(self.folder_path.encode('utf-8')).hexdigest()[:16]
+        self.index_folder = os.path.join(index_folder, root_hash)
+        self._folder_indexes = {}
+        self._lock = threading.Lock()
+
+    def get_folder_index(self, folder_path):
+        folder_path = os.path.abspath(folder_path)
+        with self._lock:
+            if folder_path not in self._folder_indexes:
+                name = hashlib.sha1(folder_path.encode('utf-8')).hexdigest()
+                self._folder_indexes[folder_path] = SwaggerFolderIndex(
+                    folder_path=folder_path,
+                    index_path=os.path.join(self.index_folder, f"{name}.json")
+                )
+            return self._folder_indexes[folder_path]
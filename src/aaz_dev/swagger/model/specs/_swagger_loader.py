@@ -1,41 +1,227 @@
 import json
 import logging
 import os
-from collections import OrderedDict
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
 
 from swagger.utils import exceptions
+from utils.config import Config
+from utils.profiler import span
+from ._swagger_cache import get_swagger_body_cache
+from ._swagger_dependency import SwaggerDependencyGraph
+from ._swagger_reachability import SwaggerReachability
+from ._swagger_residency import SwaggerResidency
 
 logger = logging.getLogger('backend')
 
 
 class SwaggerLoader:
 
-    def __init__(self):
+    # json keys of the swagger objects whose model attribute names are different
+    _MODEL_ATTRS = {
+        'x-ms-paths': 'x_ms_paths',
+        'x-ms-parameterized-host': 'x_ms_parameterized_host',
+        'allOf': 'all_of',
+        'additionalProperties': 'additional_properties',
+    }
+    _JSON_KEYS = {
+        'x_ms_paths': 'x-ms-paths',
+        'x_ms_parameterized_host': 'x-ms-parameterized-host',
+    }
+
+    def __init__(self, pruned=False, max_size=None, defer_examples=False):
+        # resolution table of file paths and json pointers, keyed by traces
         self._loaded = {}
         self.loaded_swaggers = OrderedDict()
-        self._linked_idx = 0
+        # swagger files loaded but not linked yet
+        self._link_queue = deque()
+        self.files_loaded = 0
+        self.refs_resolved = 0
+        self.cache_hits = 0
+        self.file_hits = 0
+
+        # the resident files are bounded by `max_size` in MB, see `SwaggerResidency`
+        max_size = Config.SWAGGER_LOADER_MAX_SIZE if max_size is None else max_size
+        self._residency = SwaggerResidency(int(max_size * 1024 * 1024))
+
+        # In pruned mode, the path items loaded by `load_paths` are materialized as models, and the parts of swagger
+        # files referenced by them are materialized on demand when the references are linked, instead of the whole
+        # files.
+        self.pruned = pruned
+        self._bodies = {}
+        self._reachability = None
+        self._materialized = {}
+        # units materialized but not linked yet
+        self._unit_queue = deque()
+        self._link_seeds = []
+        self._dependency_graph = None
+
+        # patched bodies read ahead by `prefetch_files`, which are consumed when the files are loaded
+        self._prefetched = {}
+        self.files_prefetched = 0
+
+        # The examples of operations are not linked by `link_swaggers` in deferred mode, they're linked by
+        # `link_examples` when they are used, so that the example files are not loaded by command generation.
+        self.defer_examples = defer_examples
 
     def load_file(self, file_path):
         from swagger.model.schema.swagger import Swagger
         loaded = self.get_loaded(file_path)
         if loaded is not None:
+            self.file_hits += 1
             return loaded
 
+        with span("load_file", file=file_path):
+            if 'example' in file_path.lower():
+                try:
+                    with open(file_path, 'r', encoding='utf-8') as f:
+                        loaded = json.load(f)
+                except Exception as err:
+                    logger.error(f'InvalidSwaggerFile: ParseJsonFailed: {file_path} : {err}')
+                    raise
+            else:
+                loaded = Swagger(self._read_swagger_body(file_path))
+                self.loaded_swaggers[file_path] = loaded
+                self._link_queue.append(file_path)
+        self.files_loaded += 1
+        self._cache_loaded(loaded, file_path)
+        return loaded
+
+    def load_paths(self, file_path, paths):
+        """Load the path items of a swagger file.
+
+        In pruned mode, only the path items are materialized, the parts of swagger files referenced by them are
+        materialized when they're linked by `link_swaggers`, otherwise the whole file is loaded.
+        """
+        if not self.pruned:
+            self.load_file(file_path)
+            return
+        if self._reachability is None:
+            self._reachability = SwaggerReachability(
+                self._load_body, self._parse_ref_link, self._get_dependency_graph())
+        body = self._load_body(file_path)
+        self._reachability.add_files([file_path])
+        for path in paths:
+            for section in ('paths', 'x-ms-paths'):
+                if isinstance(body.get(section, None), dict) and path in body[section]:
+                    self._materialize(file_path, [(section, path)])
+        if file_path not in self._link_seeds:
+            self._link_seeds.append(file_path)
+
+    def _load_body(self, file_path):
+        body = self._bodies.get(file_path, None)
+        if body is None:
+            body = self._read_swagger_body(file_path)
+            if not isinstance(body, dict):
+                raise ValueError(f"Invalid swagger file: {file_path}")
+            self._bodies[file_path] = body
+        return body
+
+    def prefetch_files(self, file_paths, workers=None):
+        """Read the swagger files and the files referenced by them transitively in a thread pool, before they are
+        loaded one by one by linking.
+
+        The files which failed to be read are skipped, the errors are raised when they are loaded.
+        :return: the dependency graph of the files.
+        """
+        workers = Config.SWAGGER_PREFETCH_WORKERS if workers is None else workers
+        graph = self._get_dependency_graph(workers)
+        graph.add_files(file_paths)
+        file_paths = [
+            file_path for file_path in graph.get_transitive_files(file_paths)
+            if file_path not in self._prefetched and file_path not in self._bodies
+            and self.get_loaded(file_path) is None
+        ]
+        if workers <= 1 or len(file_paths) <= 1:
+            return graph
+
+        def _read(file_path):
+            try:
+                return self._load_swagger_body(file_path)
+            except Exception:
+                return None
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for file_path, body in zip(file_paths, executor.map(_read, file_paths)):
+                if isinstance(body, dict):
+                    self._prefetched[file_path] = body
+                    self.files_prefetched += 1
+        return graph
+
+    def link_examples(self, operations, workers=None):
+        """Link the examples of operations which are not linked yet, the example files are read in a thread pool
+        before linking.
+
+        The files which failed to be read are skipped, the errors are logged when the examples are linked.
+        """
+        workers = Config.SWAGGER_PREFETCH_WORKERS if workers is None else workers
+        file_paths = []
+        for operation in operations:
+            for key, example in (operation.x_ms_examples or {}).items():
+                if example.is_linked() or not example.ref:
+                    continue
+                try:
+                    file_path = self._parse_ref_link((*operation.traces, "x_ms_examples", key), example.ref)[0]
+                except exceptions.InvalidSwaggerValueError:
+                    continue
+                # the other files are loaded as swagger when linked
+                if 'example' in file_path.lower() and file_path not in file_paths and \
+                        self.get_loaded(file_path) is None:
+                    file_paths.append(file_path)
+
+        with span("link_examples"):
+            if workers > 1 and len(file_paths) > 1:
+                def _read(file_path):
+                    try:
+                        with open(file_path, 'r', encoding='utf-8') as f:
+                            return json.load(f)
+                    except Exception:
+                        return None
+
+                with ThreadPoolExecutor(max_workers=min(workers, len(file_paths))) as executor:
+                    for file_path, body in zip(file_paths, executor.map(_read, file_paths)):
+                        if body is not None:
+                            self.files_loaded += 1
+                            self._cache_loaded(body, file_path)
+
+            for operation in operations:
+                operation.link_examples(self)
+        self._evict()
+
+    @classmethod
+    def build_dependency_graph(cls, file_paths, workers=None):
+        """Build the graph of the swagger files referenced by the files transitively."""
+        workers = Config.SWAGGER_PREFETCH_WORKERS if workers is None else workers
+        graph = SwaggerDependencyGraph(cls._parse_ref_link, workers=workers)
+        graph.add_files(file_paths)
+        return graph
+
+    def _get_dependency_graph(self, workers=None):
+        # the scanned files are kept until the loader is evicted
+        if self._dependency_graph is None:
+            self._dependency_graph = self.build_dependency_graph([], workers=workers)
+        return self._dependency_graph
+
+    def _read_swagger_body(self, file_path):
+        """Read the patched body of a swagger file, from the prefetched bodies or the body cache if it's enabled."""
+        body = self._prefetched.pop(file_path, None)
+        if body is not None:
+            return body
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                body = json.load(f)
+            return self._load_swagger_body(file_path)
         except Exception as err:
             logger.error(f'InvalidSwaggerFile: ParseJsonFailed: {file_path} : {err}')
             raise
 
-        if 'example' in file_path.lower():
-            loaded = body
-        else:
-            self.patch_swagger(body)
-            loaded = Swagger(body)
-            self.loaded_swaggers[file_path] = loaded
-        self._cache_loaded(loaded, file_path)
-        return loaded
+    @classmethod
+    def _load_swagger_body(cls, file_path):
+        cache = get_swagger_body_cache()
+        if cache is not None:
+            return cache.load(file_path, cls.patch_swagger)
+        with open(file_path, 'r', encoding='utf-8') as f:
+            body = json.load(f)
+        cls.patch_swagger(body)
+        return body
 
     @staticmethod
     def patch_swagger(body):
@@ -66,25 +252,250 @@ class SwaggerLoader:
         _patch(body)
 
     def link_swaggers(self):
-        while self._linked_idx < len(self.loaded_swaggers):
-            file_path, swagger = [*self.loaded_swaggers.items()][self._linked_idx]
-            swagger.link(self, file_path)
-            self._linked_idx += 1
+        with span("link_swaggers"):
+            if self._reachability is not None:
+                self._link_materialized_units()
+            # the files loaded by references during linking are appended to the queue, and linked in the same loop
+            while self._link_queue:
+                file_path = self._link_queue.popleft()
+                self.loaded_swaggers[file_path].link(self, file_path)
+        # the prefetched files which are not referenced by the linked parts
+        self._prefetched.clear()
+        self._evict()
+
+    def _link_materialized_units(self):
+        from swagger.model.schema.reference import Linkable
+        while True:
+            # the units referenced during linking are appended to the queue, and linked in the same loop
+            while self._unit_queue:
+                file_path, (section, key) = self._unit_queue.popleft()
+                attr = self._MODEL_ATTRS.get(section, section)
+                swagger = self.loaded_swaggers[file_path]
+                if section == SwaggerReachability.PARAMETERIZED_HOST:
+                    if swagger.x_ms_parameterized_host is not None:
+                        swagger.x_ms_parameterized_host.link(self, file_path, attr)
+                elif isinstance(getattr(swagger, attr)[key], Linkable):
+                    getattr(swagger, attr)[key].link(self, file_path, attr, key)
+            # the discriminator children register themselves to the parent when linked
+            for file_path, unit in [*self._reachability.iter_disc_children(self._is_materialized)]:
+                self._materialize(file_path, [unit])
+            if not self._unit_queue:
+                break
+        self._apply_link_simulation()
+
+    def _is_materialized(self, file_path, unit):
+        return unit in self._materialized.get(file_path, ())
+
+    def _materialize_ref(self, file_path, pointer):
+        """Materialize the units of a swagger file referenced by the json pointer."""
+        if file_path in self.loaded_swaggers and file_path not in self._materialized:
+            # the whole file is loaded by `load_file`
+            return
+        body = self._load_body(file_path)
+        self._reachability.add_files([file_path])
+        if not pointer:
+            units = [
+                (section, key) for section in SwaggerReachability.UNIT_SECTIONS
+                if isinstance(body.get(section, None), dict) for key in body[section]
+            ]
+        elif pointer[0] in SwaggerReachability.UNIT_SECTIONS and len(pointer) > 1 and \
+                isinstance(body.get(pointer[0], None), dict) and pointer[1] in body[pointer[0]]:
+            units = [(pointer[0], pointer[1])]
+        else:
+            # the invalid pointer will be raised by the walk of models
+            units = []
+        self._materialize(file_path, units)
+
+    def _materialize(self, file_path, units):
+        from swagger.model.schema.reference import Linkable
+        from swagger.model.schema.swagger import Swagger
+        body = self._bodies[file_path]
+        materialized = self._materialized.get(file_path, None)
+        units = [unit for unit in units if materialized is None or unit not in materialized]
+        if materialized is None and SwaggerReachability.PARAMETERIZED_HOST in body:
+            units.append((SwaggerReachability.PARAMETERIZED_HOST, None))
+        if not units:
+            return
+
+        data = {section: {} for section in SwaggerReachability.UNIT_SECTIONS if isinstance(body.get(section), dict)}
+        data.setdefault('paths', {})
+        for section, key in units:
+            if section == SwaggerReachability.PARAMETERIZED_HOST:
+                data[section] = body[section]
+            else:
+                data[section][key] = body[section][key]
+
+        swagger = self.loaded_swaggers.get(file_path, None)
+        if swagger is None:
+            for key, value in body.items():
+                if key not in data and key not in SwaggerReachability.UNIT_SECTIONS:
+                    data.setdefault(key, value)
+            swagger = Swagger(data)
+            # the units are linked separately
+            Linkable.link(swagger, self, file_path)
+            self.loaded_swaggers[file_path] = swagger
+            self._materialized[file_path] = set()
+            self.files_loaded += 1
+            self._cache_loaded(swagger, file_path)
+        else:
+            partial = Swagger(data)
+            for section in data:
+                attr = self._MODEL_ATTRS.get(section, section)
+                value = getattr(partial, attr)
+                if isinstance(value, dict) and getattr(swagger, attr) is not None:
+                    getattr(swagger, attr).update(value)
+                elif value is not None:
+                    setattr(swagger, attr, value)
+        self._materialized[file_path].update(units)
+        self._unit_queue.extend((file_path, unit) for unit in units)
+
+    def add_resource_id_template(self, schema, resource_id_template):
+        """Assign the resource id template of a get operation to its response schema."""
+        from swagger.model.schema.schema import Schema
+        if self.pruned:
+            # the templates depend on the link order of the whole files, they're assigned by `_apply_link_simulation`
+            return
+        if isinstance(schema, Schema):
+            schema.resource_id_templates.add(resource_id_template)
+        if schema.ref_instance and isinstance(schema.ref_instance, Schema):
+            schema.ref_instance.resource_id_templates.add(resource_id_template)
+
+    def _apply_link_simulation(self):
+        """Apply the side effects which depend on the link order of the whole files."""
+        from swagger.model.schema.schema import Schema
+        disc_orders, templates = self._reachability.simulate_link(self._link_seeds)
+        self._link_seeds = []
+
+        for (file_path, pointer), resource_id_templates in templates.items():
+            schema = self._get_model(file_path, pointer)
+            if isinstance(schema, Schema):
+                schema.resource_id_templates = set(resource_id_templates)
+
+        disc_parents = {}
+        for file_path, pointer in disc_orders:
+            child = self._get_model(file_path, pointer)
+            if isinstance(child, Schema) and child.disc_parent is not None:
+                disc_parents[id(child.disc_parent)] = child.disc_parent
+        for parent in disc_parents.values():
+            parent.disc_children = dict(sorted(
+                parent.disc_children.items(),
+                key=lambda item: disc_orders.get(self._get_json_pointer(item[1]), len(disc_orders))
+            ))
+
+    def _get_model(self, file_path, pointer):
+        value = self.loaded_swaggers.get(file_path, None)
+        for key in pointer:
+            if isinstance(value, dict):
+                value = value.get(key, None)
+            elif isinstance(value, list):
+                idx = int(key) if str(key).isdigit() else len(value)
+                value = value[idx] if idx < len(value) else None
+            elif value is not None:
+                value = getattr(value, self._MODEL_ATTRS.get(key, key), None)
+            if value is None:
+                return None
+        return value
+
+    def _get_json_pointer(self, model):
+        file_path, *traces = model.traces
+        return file_path, tuple(self._JSON_KEYS.get(trace, trace) for trace in traces)
+
+    @property
+    def max_size(self):
+        return self._residency.max_size
+
+    @max_size.setter
+    def max_size(self, value):
+        self._residency.max_size = value
+
+    @property
+    def resident_bytes(self):
+        return self._residency.resident_bytes
+
+    @property
+    def evictions(self):
+        return self._residency.evictions
+
+    def get_stats(self):
+        return {
+            "filesLoaded": self.files_loaded,
+            "refsResolved": self.refs_resolved,
+            "cacheHits": self.cache_hits,
+            "filesPrefetched": self.files_prefetched,
+            "fileHits": self.file_hits,
+            "fileReloads": self._residency.reloads,
+            "evictions": self.evictions,
+            "residentFiles": len(self._residency.files),
+            "residentBytes": self.resident_bytes,
+            "maxBytes": self.max_size,
+            "pinnedFiles": len(self._residency.pinned_files),
+        }
+
+    def get_loaded_files(self):
+        """Return the resident files, including the example files."""
+        return self._residency.files
 
     def get_loaded(self, *traces):
-        return self._loaded.get(traces, None)
+        loaded = self._loaded.get(traces, None)
+        if loaded is not None:
+            self._residency.touch(traces[0])
+        return loaded
 
     def _cache_loaded(self, loaded, *traces):
         self._loaded[traces] = loaded
+        self._residency.add(traces[0], traces)
+
+    def acquire(self, file_paths):
+        """Pin the files and their link groups in memory until they are released."""
+        self._residency.acquire(file_paths)
+
+    def release(self, file_paths):
+        self._residency.release(file_paths)
+        self._evict()
+
+    def _evict(self):
+        if not self._residency.is_oversize() or self._link_queue:
+            return
+        if self.pruned:
+            # the reachability of all the files is shared, so they are evicted together
+            if not self._residency.pinned_files:
+                self._evict_files(self._residency.files)
+                self._bodies = {}
+                self._reachability = None
+                self._materialized = {}
+                self._link_seeds = []
+                self._dependency_graph = None
+            return
+        file_paths = self._residency.select_evictions()
+        if file_paths:
+            self._evict_files(file_paths)
+
+    def _evict_files(self, file_paths):
+        traces_list, evicted_bytes = self._residency.remove(file_paths)
+        for traces in traces_list:
+            self._loaded.pop(traces, None)
+        for file_path in file_paths:
+            self.loaded_swaggers.pop(file_path, None)
+        logger.info(f"EvictSwaggerFiles: {len(file_paths)} files, {evicted_bytes} bytes")
 
     def load_ref(self, ref_link, *ref_traces):
         traces = self._parse_ref_link(ref_traces, ref_link)
 
         ref = self.get_loaded(*traces)
         if ref is not None:
+            self.cache_hits += 1
+            if traces[0] != ref_traces[0]:
+                self._residency.union(ref_traces[0], traces[0])
             return ref, traces
 
         file_path = traces[0]
+        if self.pruned and self._reachability is not None and 'example' not in file_path.lower():
+            try:
+                self._materialize_ref(file_path, traces[1:])
+            except FileNotFoundError:
+                raise exceptions.InvalidSwaggerValueError(
+                    msg='Cannot find reference swagger file',
+                    key=ref_traces, value=ref_link)
         ref = self.get_loaded(file_path)
         if ref is None:
             try:
@@ -93,6 +504,11 @@ class SwaggerLoader:
                 raise exceptions.InvalidSwaggerValueError(
                     msg='Cannot find reference swagger file',
                     key=ref_traces, value=ref_link)
+        else:
+            self.file_hits += 1
+        if file_path != ref_traces[0]:
+            # the models of both files refer to each other after linking
+            self._residency.union(ref_traces[0], file_path)
 
         for prop in traces[1:]:
             assert prop != ''
@@ -109,6 +525,7 @@ class SwaggerLoader:
                     key=ref_traces, value=ref_link)
 
         assert ref is not None
+        self.refs_resolved += 1
         self._cache_loaded(ref, *traces)
         return ref, traces
 
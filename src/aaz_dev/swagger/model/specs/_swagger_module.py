@@ -8,12 +8,13 @@ from ._typespec_helper import TypeSpecHelper
 
 class SwaggerModule:
 
-    def __init__(self, plane, name, folder_path, parent=None):
+    def __init__(self, plane, name, folder_path, parent=None, index=None):
         assert plane == PlaneEnum.Mgmt or PlaneEnum.is_data_plane(plane), f"Invalid plane: '{plane}'"
         self.plane = plane
         self.name = name
         self.folder_path = folder_path
         self._parent = parent
+        self._index = index
 
     def __str__(self):
         if self._parent is not None:
@@ -30,6 +31,13 @@ class SwaggerModule:
     def __hash__(self):
         return hash(str(self))
 
+    @property
+    def index(self):
+        """The persistent SwaggerSpecsIndex shared by the module and its sub modules."""
+        if self._index is None and self._parent is not None:
+            return self._parent.index
+        return self._index
+
     @property
     def names(self):
         if self._parent is None:
@@ -63,6 +71,32 @@ class MgmtPlaneModule(SwaggerModule):
         rp.extend(self._get_typespec_resource_providers())
         return rp
 
+    def get_modules(self):
+        """Return the module and its sub modules which have resource providers, in the order of
+        `get_resource_providers`.
+
+        Only the folder names and the cached typespec entries are checked, the resource providers are not built.
+        """
+        modules = []
+        if 'resource-manager' not in self.folder_path:
+            folder_path = os.path.join(self.folder_path, 'resource-manager')
+        else:
+            folder_path = self.folder_path
+        if os.path.exists(folder_path):
+            for name in os.listdir(folder_path):
+                path = os.path.join(folder_path, name)
+                if os.path.isdir(path):
+                    if len(name.split('.')) >= 2:
+                        if self not in modules:
+                            modules.append(self)
+                    elif name.lower() != 'common':
+                        sub_module = MgmtPlaneModule(plane=self.plane, name=name, folder_path=path, parent=self)
+                        modules.extend(sub_module.get_modules())
+        if 'resource-manager' not in self.folder_path and self not in modules and \
+                TypeSpecHelper.find_mgmt_plane_entry_files(self.folder_path):
+            modules.append(self)
+        return modules
+
     def _get_openapi_resource_providers(self):
         rp = []
         if 'resource-manager' not in self.folder_path:
@@ -117,6 +151,37 @@ class DataPlaneModule(SwaggerModule):
             rp = [r for r in rp if r.name.lower() == scope]
         return rp
 
+    def get_modules(self):
+        """Return the module and its sub modules which have resource providers, in the order of
+        `get_resource_providers`.
+
+        Only the folder names and the cached typespec entries are checked, the resource providers are not built.
+        """
+        scope = PlaneEnum.get_data_plane_scope(self.plane)
+        modules = []
+        if 'data-plane' not in self.folder_path:
+            folder_path = os.path.join(self.folder_path, 'data-plane')
+        else:
+            folder_path = self.folder_path
+        if os.path.exists(folder_path):
+            for name in os.listdir(folder_path):
+                path = os.path.join(folder_path, name)
+                if os.path.isdir(path):
+                    if name.lower() in ('preview', 'stable'):
+                        continue
+                    if len(name.split('.')) >= 2:
+                        if (not scope or name.lower() == scope) and self not in modules:
+                            modules.append(self)
+                    elif name.lower() != 'common':
+                        sub_module = DataPlaneModule(plane=self.plane, name=name, folder_path=path, parent=self)
+                        modules.extend(sub_module.get_modules())
+        if 'resource-manager' not in self.folder_path and self not in modules:
+            for namespace, _, _ in TypeSpecHelper.find_data_plane_entry_files(self.folder_path):
+                if not scope or namespace.lower() == scope:
+                    modules.append(self)
+                    break
+        return modules
+
     def _get_openapi_resource_providers(self):
         rp = []
         if 'data-plane' not in self.folder_path:
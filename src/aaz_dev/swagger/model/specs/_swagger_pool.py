@@ -0,0 +1,180 @@
+import logging
+import threading
+from collections import OrderedDict
+
+from utils.config import Config
+from utils.git_changes import get_git_snapshot, get_file_fingerprint
+from ._swagger_loader import SwaggerLoader
+
+logger = logging.getLogger('backend')
+
+
+class _PoolEntry:
+    __slots__ = ('key', 'loader', 'fingerprints', 'borrowers', 'lock')
+
+    def __init__(self, key):
+        self.key = key
+        self.loader = None
+        self.fingerprints = None
+        self.borrowers = 0
+        self.lock = threading.Lock()
+
+
+class SwaggerModelPool:
+    """A process-wide pool of linked swagger models, shared by the command and example generators of all workspaces.
+
+    Every entry is a loader which loaded and linked the whole files of the same root files, in the same order. The
+    models depend on all the files linked together, such as the children of a discriminator, so the loaders are not
+    shared by different root files and no swagger files are loaded into a loader after it's linked. The examples of
+    operations are deferred, they're linked by `link_examples` when the example generators use them. The borrowers
+    must not modify the models, the state of a generation is kept in `CMDBuilder`.
+
+    An entry is rebuilt when the fingerprint of any file loaded by it is changed. The entries not borrowed are dropped
+    in the least recently used order when there are more than `Config.SWAGGER_MODEL_POOL_SIZE` entries or their total
+    size exceeds `Config.SWAGGER_LOADER_MAX_SIZE` in MB. The pool is disabled unless `Config.SWAGGER_MODEL_POOL_SIZE` is
+    set, by default the generators load the files they use into their own bounded loaders.
+    """
+
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    @classmethod
+    def shared(cls):
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = cls()
+            return cls._instance
+
+    @staticmethod
+    def is_enabled():
+        return Config.SWAGGER_MODEL_POOL_SIZE > 0
+
+    def __init__(self):
+        self._entries = OrderedDict()
+        # borrowed loaders keyed by id, with their entries and borrowed times
+        self._leases = {}
+        self._lock = threading.Lock()
+        self.builds = 0
+        self.hits = 0
+
+    def borrow(self, file_paths):
+        """Return the linked loader of the files, which must be given back by `give_back`."""
+        key = tuple(OrderedDict.fromkeys(file_paths))
+        with self._lock:
+            entry = self._entries.get(key, None)
+            if entry is None:
+                entry = self._entries[key] = _PoolEntry(key)
+            self._entries.move_to_end(key)
+            # the entry is not dropped while it's building
+            entry.borrowers += 1
+
+        try:
+            with entry.lock:
+                if entry.loader is not None and self._get_fingerprints(entry.fingerprints) != entry.fingerprints:
+                    logger.info(f"SwaggerModelPoolStale: {len(key)} files")
+                    # the borrowers of the stale loader keep using it until they give it back
+                    entry.loader = None
+                if entry.loader is None:
+                    loader = self._build_loader(key)
+                    entry.fingerprints = self._get_fingerprints(loader.get_loaded_files())
+                    entry.loader = loader
+                    with self._lock:
+                        self.builds += 1
+                else:
+                    with self._lock:
+                        self.hits += 1
+                loader = entry.loader
+        except Exception:
+            with self._lock:
+                entry.borrowers -= 1
+                if entry.loader is None and entry.borrowers == 0 and self._entries.get(key, None) is entry:
+                    del self._entries[key]
+            raise
+
+        with self._lock:
+            lease = self._leases.get(id(loader), None)
+            if lease is None:
+                lease = self._leases[id(loader)] = [entry, 0]
+            lease[1] += 1
+        return loader
+
+    def give_back(self, loader):
+        with self._lock:
+            lease = self._leases.get(id(loader), None)
+            if lease is None:
+                return
+            entry = lease[0]
+            lease[1] -= 1
+            if lease[1] == 0:
+                del self._leases[id(loader)]
+            entry.borrowers -= 1
+            self._trim()
+
+    def link_examples(self, loader, operations):
+        """Link the deferred examples of operations in a loader.
+
+        The examples of a borrowed loader are linked under the lock of its entry, so the borrowers of the same entry
+        don't link them concurrently. The example files loaded are added into the fingerprints of the entry.
+        """
+        with self._lock:
+            lease = self._leases.get(id(loader), None)
+        if lease is None:
+            loader.link_examples(operations)
+            return
+        entry = lease[0]
+        with entry.lock:
+            loaded_files = set(loader.get_loaded_files())
+            loader.link_examples(operations)
+            if entry.loader is loader:
+                entry.fingerprints.update(self._get_fingerprints(
+                    [file_path for file_path in loader.get_loaded_files() if file_path not in loaded_files]))
+
+    def clear(self):
+        """Drop the entries which are not borrowed."""
+        with self._lock:
+            for key in [key for key, entry in self._entries.items() if entry.borrowers == 0]:
+                del self._entries[key]
+
+    def get_stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "borrowedEntries": sum(1 for entry in self._entries.values() if entry.borrowers > 0),
+                "builds": self.builds,
+                "hits": self.hits,
+                "residentBytes": self._get_resident_bytes(),
+            }
+
+    @staticmethod
+    def _build_loader(file_paths):
+        # the loader is bounded by the pool, so it never evicts the files itself
+        # the examples are linked by `link_examples` when they're used by the example generators
+        loader = SwaggerLoader(max_size=0, defer_examples=True)
+        loader.prefetch_files(file_paths)
+        for file_path in file_paths:
+            loader.load_file(file_path)
+        loader.link_swaggers()
+        logger.debug(f"SwaggerModelPoolBuild: {loader.get_stats()}")
+        return loader
+
+    @staticmethod
+    def _get_fingerprints(file_paths):
+        fingerprints = OrderedDict()
+        for file_path in file_paths:
+            try:
+                fingerprints[file_path] = get_file_fingerprint(file_path, get_git_snapshot(file_path))
+            except OSError:
+                fingerprints[file_path] = None
+        return fingerprints
+
+    def _get_resident_bytes(self):
+        return sum(entry.loader.resident_bytes for entry in self._entries.values() if entry.loader is not None)
+
+    def _trim(self):
+        max_entries = Config.SWAGGER_MODEL_POOL_SIZE
+        max_bytes = int(Config.SWAGGER_LOADER_MAX_SIZE * 1024 * 1024)
+        for key in [*self._entries.keys()]:
+            if len(self._entries) <= max_entries and (max_bytes <= 0 or self._get_resident_bytes() <= max_bytes):
+                break
+            if self._entries[key].borrowers == 0:
+                del self._entries[key]
@@ -0,0 +1,315 @@
+from collections import OrderedDict, deque
+
+from swagger.utils import exceptions
+from swagger.utils.tools import swagger_resource_path_to_resource_id_template
+
+
+def _iter_dict(value):
+    return value.items() if isinstance(value, dict) else ()
+
+
+def _iter_list(value):
+    return enumerate(value) if isinstance(value, list) else ()
+
+
+class SwaggerReachability:
+    """The side effects of linking whole swagger files, for the pruned loader which only links the reachable parts.
+
+    A unit is an entry of `paths`, `x-ms-paths`, `definitions`, `parameters` or `responses`, or the
+    `x-ms-parameterized-host` of a swagger file. The pruned loader materializes the units on demand when they're
+    referenced by the models linked, so the reachable units are found by the link of models themselves. The side
+    effects of linking the whole files are computed on the raw json bodies here:
+        - The discriminator children of linked definitions are found by `iter_disc_children`, because they register
+          themselves to the parent when linked.
+        - The registration order of discriminator children and the resource id templates, which are assigned by the
+          get operations of all the path items in loaded files, are computed by `simulate_link`.
+    """
+
+    UNIT_SECTIONS = ('paths', 'definitions', 'parameters', 'responses', 'x-ms-paths')
+    PARAMETERIZED_HOST = 'x-ms-parameterized-host'
+
+    # the same order as PathItem.link
+    _METHODS = ('get', 'put', 'post', 'delete', 'head', 'patch')
+
+    def __init__(self, load_body, parse_ref_link, dependency_graph):
+        self._load_body = load_body
+        self._parse_ref_link = parse_ref_link
+        self._dependency_graph = dependency_graph
+        # the files which would be loaded when linking the whole files, in referenced order
+        self.files = OrderedDict()
+        self._disc_parents = {}
+        self._simulation = None
+
+    def add_files(self, file_paths):
+        """Add the files and the files referenced by them transitively."""
+        for file_path in self._dependency_graph.get_transitive_files(file_paths):
+            if file_path in self.files:
+                continue
+            try:
+                self._load_body(file_path)
+            except (OSError, ValueError):
+                # the error will be raised when the file is referenced
+                continue
+            self.files[file_path] = None
+
+    def iter_disc_children(self, is_materialized):
+        """Yield the definitions which are not materialized, whose discriminator parents are materialized."""
+        for file_path in self.files:
+            definitions = self._load_body(file_path).get('definitions', None)
+            if not isinstance(definitions, dict):
+                continue
+            for name in definitions:
+                if is_materialized(file_path, ('definitions', name)):
+                    continue
+                parent = self._get_disc_parent(file_path, name)
+                if parent is not None and is_materialized(parent[0], ('definitions', parent[1])):
+                    yield file_path, ('definitions', name)
+
+    def simulate_link(self, file_paths):
+        """Simulate linking the whole swagger files, continued from the previous simulation.
+
+        :param file_paths: the files loaded before linking, in loaded order.
+        :return: the registration order of discriminator children, as a dict of (file_path, json pointer) to index,
+            and the resource id templates assigned to schemas, as a dict of (file_path, json pointer) to a set.
+        """
+        if self._simulation is None:
+            self._simulation = _LinkSimulation(self)
+        return self._simulation.run(file_paths)
+
+    def _parse_ref(self, file_path, ref_link):
+        try:
+            traces = self._parse_ref_link((file_path, ), ref_link)
+        except exceptions.InvalidSwaggerValueError:
+            # invalid reference will be raised when it's linked
+            return None
+        return traces[0], tuple(traces[1:])
+
+    def _get_value(self, file_path, pointer):
+        value = self._load_body(file_path)
+        for key in pointer:
+            if isinstance(value, dict):
+                value = value.get(key, None)
+            elif isinstance(value, list) and str(key).isdigit() and int(key) < len(value):
+                value = value[int(key)]
+            else:
+                return None
+        return value
+
+    def _resolve_definition(self, file_path, ref_link):
+        target = self._parse_ref(file_path, ref_link)
+        if target is None:
+            return None
+        ref_file_path, pointer = target
+        if len(pointer) != 2 or pointer[0] != 'definitions' or ref_file_path not in self.files:
+            return None
+        return ref_file_path, pointer[1]
+
+    def _get_disc_parent(self, file_path, name):
+        # the same order as Schema.get_disc_parent
+        key = (file_path, name)
+        if key in self._disc_parents:
+            return self._disc_parents[key]
+        self._disc_parents[key] = None
+
+        parent = None
+        definition = self._get_value(file_path, ('definitions', name))
+        if isinstance(definition, dict):
+            for item in definition.get('allOf', None) or []:
+                if isinstance(item, dict) and isinstance(item.get('$ref', None), str):
+                    target = self._resolve_definition(file_path, item['$ref'])
+                    if target is not None:
+                        parent = self._get_disc_parent(*target)
+                        if parent is not None:
+                            break
+            if parent is None and definition.get('discriminator', None) is not None:
+                parent = key
+            if parent is None and isinstance(definition.get('$ref', None), str):
+                target = self._resolve_definition(file_path, definition['$ref'])
+                if target is not None:
+                    parent = self._get_disc_parent(*target)
+        self._disc_parents[key] = parent
+        return parent
+
+    def _is_schema(self, file_path, pointer):
+        from swagger.model.schema.schema import Schema, schema_and_reference_schema_claim_function
+        value = self._get_value(file_path, pointer)
+        if not isinstance(value, dict) or not pointer:
+            return False
+        if pointer[0] == 'definitions' and len(pointer) == 2:
+            return True
+        if pointer[0] == 'definitions' or pointer[-1] == 'schema':
+            return schema_and_reference_schema_claim_function(None, value) is Schema
+        return False
+
+
+class _LinkSimulation:
+    """Walk the json bodies of swagger files in the same order as `SwaggerLoader.link_swaggers` links the whole files."""
+
+    def __init__(self, reachability):
+        self._reachability = reachability
+        self._files = set()
+        self._queue = deque()
+        self._visited = set()
+        self.disc_orders = {}
+        self.templates = {}
+
+    def run(self, file_paths):
+        for file_path in file_paths:
+            self._add_file(file_path)
+        while self._queue:
+            file_path = self._queue.popleft()
+            body = self._reachability._load_body(file_path)
+            # the same order as Swagger.link
+            for path, path_item in _iter_dict(body.get('paths', None)):
+                self._visit_path_item(file_path, ('paths', path), path_item)
+            for name, definition in _iter_dict(body.get('definitions', None)):
+                self._visit_schema(file_path, ('definitions', name), definition)
+            for name, param in _iter_dict(body.get('parameters', None)):
+                self._visit_parameter(file_path, ('parameters', name), param)
+            for name, response in _iter_dict(body.get('responses', None)):
+                self._visit_response(file_path, ('responses', name), response, None)
+            for path, path_item in _iter_dict(body.get('x-ms-paths', None)):
+                self._visit_path_item(file_path, ('x-ms-paths', path), path_item)
+            host = body.get(SwaggerReachability.PARAMETERIZED_HOST, None)
+            if isinstance(host, dict):
+                for idx, param in _iter_list(host.get('parameters', None)):
+                    self._visit_parameter(file_path, (SwaggerReachability.PARAMETERIZED_HOST, 'parameters', idx), param)
+        return self.disc_orders, self.templates
+
+    def _add_file(self, file_path):
+        if file_path not in self._files and file_path in self._reachability.files:
+            self._files.add(file_path)
+            self._queue.append(file_path)
+
+    def _enter(self, file_path, pointer):
+        key = (file_path, pointer)
+        if key in self._visited:
+            return False
+        self._visited.add(key)
+        return True
+
+    def _deref(self, file_path, ref_link):
+        target = self._reachability._parse_ref(file_path, ref_link)
+        if target is None or target[0] not in self._reachability.files:
+            return None
+        # the referenced file is loaded and linked after the current files
+        self._add_file(target[0])
+        return target[0], target[1], self._reachability._get_value(*target)
+
+    def _visit_path_item(self, file_path, pointer, path_item):
+        if not isinstance(path_item, dict) or not self._enter(file_path, pointer):
+            return
+        for idx, param in _iter_list(path_item.get('parameters', None)):
+            self._visit_parameter(file_path, (*pointer, 'parameters', idx), param)
+        for method in SwaggerReachability._METHODS:
+            if isinstance(path_item.get(method, None), dict):
+                self._visit_operation(file_path, (*pointer, method), path_item[method])
+
+    def _visit_operation(self, file_path, pointer, op):
+        # the same order as Operation.link
+        for idx, param in _iter_list(op.get('parameters', None)):
+            self._visit_parameter(file_path, (*pointer, 'parameters', idx), param)
+
+        template = None
+        if pointer[-1] == 'get':
+            template = swagger_resource_path_to_resource_id_template(pointer[-2])
+        for code, response in _iter_dict(op.get('responses', None)):
+            assign = False
+            if template and code != "default":
+                try:
+                    assign = int(code) < 300
+                except ValueError:
+                    pass
+            self._visit_response(file_path, (*pointer, 'responses', code), response, template if assign else None)
+
+        if isinstance(op.get('x-ms-odata', None), str):
+            target = self._deref(file_path, op['x-ms-odata'])
+            if target is not None:
+                self._visit_schema(*target)
+        lro_options = op.get('x-ms-long-running-operation-options', None)
+        if isinstance(lro_options, dict) and isinstance(lro_options.get('final-state-schema', None), str):
+            target = self._deref(file_path, lro_options['final-state-schema'])
+            if target is not None:
+                self._visit_schema(*target)
+
+    def _visit_parameter(self, file_path, pointer, param):
+        if not isinstance(param, dict):
+            return
+        if '$ref' in param and len(param) == 1:
+            target = self._deref(file_path, param['$ref'])
+            if target is not None:
+                self._visit_parameter(*target)
+            return
+        if not self._enter(file_path, pointer):
+            return
+        if param.get('in', None) == 'body':
+            self._visit_schema(file_path, (*pointer, 'schema'), param.get('schema', None))
+
+    def _visit_response(self, file_path, pointer, response, template):
+        from swagger.model.schema.schema import Schema, schema_and_reference_schema_claim_function
+        if not isinstance(response, dict):
+            return
+        if '$ref' in response and len(response) == 1:
+            target = self._deref(file_path, response['$ref'])
+            if target is not None:
+                self._visit_response(*target, template)
+            return
+        # only the first link of a response assigns the template
+        if not self._enter(file_path, pointer):
+            return
+        schema = response.get('schema', None)
+        if not isinstance(schema, dict):
+            return
+        schema_pointer = (*pointer, 'schema')
+        self._visit_schema(file_path, schema_pointer, schema)
+        if template:
+            if schema_and_reference_schema_claim_function(None, schema) is Schema:
+                self.templates.setdefault((file_path, schema_pointer), set()).add(template)
+            if isinstance(schema.get('$ref', None), str):
+                target = self._reachability._parse_ref(file_path, schema['$ref'])
+                if target is not None and self._reachability._is_schema(*target):
+                    self.templates.setdefault(target, set()).add(template)
+
+    def _visit_schema(self, file_path, pointer, schema):
+        # the same order as `_link_ref_chain`
+        chain = []
+        while isinstance(schema, dict) and self._enter(file_path, pointer):
+            chain.append((file_path, pointer, schema))
+            if not isinstance(schema.get('$ref', None), str):
+                break
+            target = self._deref(file_path, schema['$ref'])
+            if target is None:
+                break
+            file_path, pointer, schema = target
+
+        for file_path, pointer, schema in reversed(chain):
+            self._visit_schema_body(file_path, pointer, schema)
+
+    def _visit_schema_body(self, file_path, pointer, schema):
+        # the same order as Schema._link_referenced
+        items = schema.get('items', None)
+        if isinstance(items, list):
+            for idx, item in enumerate(items):
+                self._visit_schema(file_path, (*pointer, 'items', idx), item)
+        elif isinstance(items, dict):
+            self._visit_schema(file_path, (*pointer, 'items'), items)
+        for key, prop in _iter_dict(schema.get('properties', None)):
+            self._visit_schema(file_path, (*pointer, 'properties', key), prop)
+        if isinstance(schema.get('additionalProperties', None), dict):
+            self._visit_schema(file_path, (*pointer, 'additionalProperties'), schema['additionalProperties'])
+        for idx, item in _iter_list(schema.get('allOf', None)):
+            self._visit_schema(file_path, (*pointer, 'allOf', idx), item)
+
+        # the same as Schema._link_disc
+        for item in schema.get('allOf', None) or []:
+            if not isinstance(item, dict) or not isinstance(item.get('$ref', None), str):
+                continue
+            target = self._reachability._resolve_definition(file_path, item['$ref'])
+            if target is None or self._reachability._get_disc_parent(*target) is None:
+                continue
+            disc_value = schema.get('x-ms-discriminator-value', None)
+            if disc_value is None and len(pointer) >= 2 and pointer[-2] == 'definitions':
+                disc_value = pointer[-1]
+            if disc_value is not None:
+                self.disc_orders.setdefault((file_path, pointer), len(self.disc_orders))
+            break
@@ -0,0 +1,133 @@
+import os
+from collections import OrderedDict
+
+
+class SwaggerResidency:
+    """The bookkeeping of the files resident in a swagger loader, which bounds the memory of the loader.
+
+    Loaded files are evicted in the least recently used order when their total size exceeds `max_size` in bytes. The
+    files linked by references are in the same link group and evicted together, because their models refer to each
+    other. The groups with files acquired by active generation tasks are never evicted. The models themselves are
+    kept by the loader, only the traces of them are recorded here.
+    """
+
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self.resident_bytes = 0
+        self.evictions = 0
+        # the files loaded again after they are evicted
+        self.reloads = 0
+        self._file_sizes = {}
+        self._file_traces = {}
+        self._recent_files = OrderedDict()
+        self._group_parents = {}
+        self._group_files = {}
+        self._pins = {}
+        self._evicted_files = set()
+
+    @property
+    def files(self):
+        return [*self._file_sizes.keys()]
+
+    @property
+    def pinned_files(self):
+        return [*self._pins.keys()]
+
+    def __contains__(self, file_path):
+        return file_path in self._file_sizes
+
+    def is_oversize(self):
+        return 0 < self.max_size < self.resident_bytes
+
+    def add(self, file_path, traces):
+        """Record the traces of a model loaded from the file, the file becomes the most recently used one."""
+        if file_path not in self._file_sizes:
+            try:
+                size = os.path.getsize(file_path)
+            except OSError:
+                size = 0
+            self._file_sizes[file_path] = size
+            self.resident_bytes += size
+            self._file_traces[file_path] = []
+            self._group_parents[file_path] = file_path
+            self._group_files[file_path] = [file_path]
+            if file_path in self._evicted_files:
+                self._evicted_files.discard(file_path)
+                self.reloads += 1
+        self._file_traces[file_path].append(traces)
+        self.touch(file_path)
+
+    def touch(self, file_path):
+        if file_path in self._recent_files:
+            self._recent_files.move_to_end(file_path)
+        elif file_path in self._file_sizes:
+            self._recent_files[file_path] = None
+
+    def acquire(self, file_paths):
+        """Pin the files and their link groups in memory until they are released."""
+        for file_path in file_paths:
+            self._pins[file_path] = self._pins.get(file_path, 0) + 1
+
+    def release(self, file_paths):
+        for file_path in file_paths:
+            count = self._pins.get(file_path, 0) - 1
+            if count > 0:
+                self._pins[file_path] = count
+            else:
+                self._pins.pop(file_path, None)
+
+    def _find_group(self, file_path):
+        parent = self._group_parents[file_path]
+        while parent != file_path:
+            grand_parent = self._group_parents[parent]
+            self._group_parents[file_path] = grand_parent
+            file_path, parent = parent, grand_parent
+        return parent
+
+    def union(self, file_path, other_file_path):
+        """Put the files in the same link group, when the models of one file refer to the other."""
+        if file_path not in self._group_parents or other_file_path not in self._group_parents:
+            return
+        group, other_group = self._find_group(file_path), self._find_group(other_file_path)
+        if group == other_group:
+            return
+        if len(self._group_files[group]) < len(self._group_files[other_group]):
+            group, other_group = other_group, group
+        self._group_parents[other_group] = group
+        self._group_files[group].extend(self._group_files.pop(other_group))
+
+    def select_evictions(self):
+        """Return the files of the least recently used groups which are not pinned, until the rest fit in size."""
+        file_paths = []
+        resident_bytes = self.resident_bytes
+        checked_groups = set()
+        for file_path in self._recent_files:
+            if resident_bytes <= self.max_size:
+                break
+            group = self._find_group(file_path)
+            if group in checked_groups:
+                continue
+            checked_groups.add(group)
+            group_files = self._group_files[group]
+            if any(path in self._pins for path in group_files):
+                continue
+            file_paths.extend(group_files)
+            resident_bytes -= sum(self._file_sizes[path] for path in group_files)
+        return file_paths
+
+    def remove(self, file_paths):
+        """Drop the records of files, return the traces of their models and the bytes evicted."""
+        traces_list = []
+        evicted_bytes = 0
+        for file_path in file_paths:
+            if file_path not in self._file_sizes:
+                continue
+            traces_list.extend(self._file_traces.pop(file_path))
+            self._recent_files.pop(file_path, None)
+            group = self._group_parents.pop(file_path, None)
+            self._group_files.pop(group, None)
+            evicted_bytes += self._file_sizes.pop(file_path)
+            self._evicted_files.add(file_path)
+            self.evictions += 1
+        self.resident_bytes -= evicted_bytes
+        return traces_list, evicted_bytes
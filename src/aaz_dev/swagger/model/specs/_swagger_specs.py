@@ -8,8 +8,9 @@ from ._typespec_helper import TypeSpecHelper
 
 class SwaggerSpecs:
 
-    def __init__(self, folder_path):
+    def __init__(self, folder_path, index=None):
         self._folder_path = folder_path
+        self._index = index
 
     @property
     def _spec_folder_path(self):
@@ -17,6 +18,8 @@ class SwaggerSpecs:
 
     def get_mgmt_plane_modules(self, plane):
         modules = []
+        # find the typespec entry files of all the modules in one walk
+        TypeSpecHelper.discover_entry_files(self._spec_folder_path)
         for name in os.listdir(self._spec_folder_path):
             module = self.get_mgmt_plane_module(name, plane=plane)
             if module:
@@ -32,7 +35,7 @@ class SwaggerSpecs:
 
         path = os.path.join(self._spec_folder_path, name)
         if os.path.isdir(os.path.join(path, 'resource-manager')) or TypeSpecHelper.find_mgmt_plane_entry_files(path):
-            module = MgmtPlaneModule(plane=plane, name=name, folder_path=path)
+            module = MgmtPlaneModule(plane=plane, name=name, folder_path=path, index=self._index)
             for name in names[1:]:
                 path = os.path.join(path, name)
                 if not os.path.isdir(path):
@@ -43,6 +46,8 @@ class SwaggerSpecs:
 
     def get_data_plane_modules(self, plane):
         modules = []
+        # find the typespec entry files of all the modules in one walk
+        TypeSpecHelper.discover_entry_files(self._spec_folder_path)
         for name in os.listdir(self._spec_folder_path):
             module = self.get_data_plane_module(name, plane=plane)
             if module:
@@ -58,7 +63,7 @@ class SwaggerSpecs:
 
         path = os.path.join(self._spec_folder_path, name)
         if os.path.isdir(os.path.join(path, 'data-plane')) or TypeSpecHelper.find_data_plane_entry_files(path):
-            module = DataPlaneModule(plane=plane, name=name, folder_path=path)
+            module = DataPlaneModule(plane=plane, name=name, folder_path=path, index=self._index)
             for name in names[1:]:
                 path = os.path.join(path, name)
                 if not os.path.isdir(path):
@@ -71,11 +76,12 @@ class SwaggerSpecs:
 
 class SingleModuleSwaggerSpecs:
 
-    def __init__(self, folder_path, module_name):
+    def __init__(self, folder_path, module_name, index=None):
         if not os.path.isdir(folder_path):
             raise ValueError(f"Path not exist: {folder_path}")
         self._folder_path = folder_path
         self._module_name = module_name
+        self._index = index
 
     def get_mgmt_plane_modules(self, plane):
         names = self._module_name.split('/')
@@ -86,7 +92,9 @@ class SingleModuleSwaggerSpecs:
                 TypeSpecHelper.find_mgmt_plane_entry_files(self._folder_path)):
             module = None
             for name in names:
-                module = MgmtPlaneModule(plane=plane, name=name, folder_path=None, parent=module)
+                module = MgmtPlaneModule(
+                    plane=plane, name=name, folder_path=None, parent=module,
+                    index=self._index if module is None else None)
             module.folder_path = self._folder_path
             assert module is not None
             return [module]
@@ -120,7 +128,9 @@ class SingleModuleSwaggerSpecs:
                 TypeSpecHelper.find_data_plane_entry_files(self._folder_path)):
             module = None
             for name in names:
-                module = DataPlaneModule(plane=plane, name=name, folder_path=None, parent=module)
+                module = DataPlaneModule(
+                    plane=plane, name=name, folder_path=None, parent=module,
+                    index=self._index if module is None else None)
             module.folder_path = self._folder_path
             assert module is not None
             return [module]
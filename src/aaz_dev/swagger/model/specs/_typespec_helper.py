@@ -1,25 +1,120 @@
 import os
 import logging
 import re
+import threading
+import time
+
+from utils.config import Config
 
 logger = logging.getLogger('backend')
 
 
+class _Discovery:
+    __slots__ = ('entries', 'folder_mtimes', 'checked_at')
+
+    def __init__(self, entries, folder_mtimes, checked_at):
+        # entry files keyed by every folder which contains them
+        self.entries = entries
+        # mtime of every walked folder, which changes when a file or sub folder is added or removed in it
+        self.folder_mtimes = folder_mtimes
+        # the last time of checking the walked folders under a folder, keyed by the folder
+        self.checked_at = checked_at
+
+
 class TypeSpecHelper:
 
-    @staticmethod
-    def _iter_entry_files(folder):
+    # entry files discovered by a single walk, keyed by the walked folder
+    _discovered = {}
+    # parsed results of main.tsp files, keyed by path: (mtime_ns, namespace, is_mgmt_plane)
+    _main_tsp_cache = {}
+    _lock = threading.RLock()
+
+    @classmethod
+    def discover_entry_files(cls, folder):
+        """Walk the folder once and record the entry files of all its sub folders.
+
+        The later lookups of the folder or its sub folders are dictionary queries. The walked folders are checked by
+        their mtime every `Config.SWAGGER_SPECS_POLL_INTERVAL` seconds, the folder is walked again when any of them
+        changed.
+        """
         if not os.path.isdir(folder):
             raise ValueError(f"Path not exist: {folder}")
-        ts_path = os.path.join(folder, "main.tsp")
-        cfg_path = os.path.join(folder, "tspconfig.yaml")
-        if os.path.isfile(ts_path) and os.path.isfile(cfg_path):
-            yield ts_path, cfg_path
+        folder = os.path.normpath(folder)
+        entries = {}
+        folder_mtimes = {}
         for root, dirs, files in os.walk(folder):
-            ts_path = os.path.join(root, "main.tsp")
-            cfg_path = os.path.join(root, "tspconfig.yaml")
-            if os.path.isfile(ts_path) and os.path.isfile(cfg_path):
-                yield ts_path, cfg_path
+            try:
+                folder_mtimes[root] = os.stat(root).st_mtime_ns
+            except OSError:
+                folder_mtimes[root] = None
+            if "main.tsp" not in files or "tspconfig.yaml" not in files:
+                continue
+            entry = (os.path.join(root, "main.tsp"), os.path.join(root, "tspconfig.yaml"))
+            path = root
+            while True:
+                entries.setdefault(path, []).append(entry)
+                if path == folder:
+                    break
+                path = os.path.dirname(path)
+        with cls._lock:
+            # the previous results of sub folders are replaced
+            for key in [*cls._discovered.keys()]:
+                if key.startswith(os.path.join(folder, '')):
+                    del cls._discovered[key]
+            cls._discovered[folder] = _Discovery(entries, folder_mtimes, {folder: time.monotonic()})
+
+    @classmethod
+    def clear_cache(cls):
+        with cls._lock:
+            cls._discovered = {}
+            cls._main_tsp_cache = {}
+
+    @classmethod
+    def _iter_entry_files(cls, folder):
+        if not os.path.isdir(folder):
+            raise ValueError(f"Path not exist: {folder}")
+        folder = os.path.normpath(folder)
+        with cls._lock:
+            discovery = cls._find_discovery(folder)
+            if discovery is not None and cls._is_changed(discovery, folder):
+                logger.info(f"TypeSpecFoldersChanged: {folder}")
+                discovery = None
+            if discovery is None:
+                cls.discover_entry_files(folder)
+                discovery = cls._discovered[folder]
+            return discovery.entries.get(folder, [])
+
+    @classmethod
+    def _find_discovery(cls, folder):
+        path = folder
+        while path not in cls._discovered:
+            parent = os.path.dirname(path)
+            if parent == path:
+                return None
+            path = parent
+        return cls._discovered[path]
+
+    @staticmethod
+    def _is_changed(discovery, folder):
+        """Check whether any walked folder under the folder changed, at most once in the poll interval."""
+        interval = Config.SWAGGER_SPECS_POLL_INTERVAL
+        if interval < 0:
+            return False
+        now = time.monotonic()
+        checked_at = discovery.checked_at.get(folder, None)
+        if checked_at is not None and now - checked_at < interval:
+            return False
+        discovery.checked_at[folder] = now
+        prefix = os.path.join(folder, '')
+        for path, mtime in discovery.folder_mtimes.items():
+            if path != folder and not path.startswith(prefix):
+                continue
+            try:
+                if os.stat(path).st_mtime_ns != mtime:
+                    return True
+            except OSError:
+                return True
+        return False
 
     @classmethod
     def find_mgmt_plane_entry_files(cls, folder):
@@ -43,6 +138,22 @@ class TypeSpecHelper:
 
     @classmethod
     def _parse_main_tsp(cls, path):
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            # removed after discovered
+            return None, None
+        with cls._lock:
+            cached = cls._main_tsp_cache.get(path, None)
+        if cached is not None and cached[0] == mtime:
+            return cached[1:]
+        namespace, is_mgmt_plane = cls._read_main_tsp(path)
+        with cls._lock:
+            cls._main_tsp_cache[path] = (mtime, namespace, is_mgmt_plane)
+        return namespace, is_mgmt_plane
+
+    @staticmethod
+    def _read_main_tsp(path):
         with open(path, 'r', encoding='utf-8') as f:
             lines = f.readlines()
         is_mgmt_plane = False
@@ -196,3 +196,17 @@ class SwaggerSpecsApiTestCase(SwaggerSpecsTestCase):
                             rv = c.get(url)
                             assert rv.status_code == 200, rv.get_json()['message']
                             assert rv.get_json() == version
+
+    def test_mgmt_plane_resource_version_dependencies(self):
+        with self.app.test_client() as c:
+            rv = c.get(f'/Swagger/Specs/{PlaneEnum.Mgmt}/network/ResourceProviders/Microsoft.Network/Resources')
+            assert rv.status_code == 200, rv.get_json()['message']
+            resource = rv.get_json()[0]
+            version = resource['versions'][0]
+            rv = c.get(f"{version['url']}/Dependencies")
+            assert rv.status_code == 200, rv.get_json()['message']
+            files = rv.get_json()['files']
+            assert files[0]['file'] == version['file']
+            for file in files[1:]:
+                assert os.path.isfile(file['file'])
+                assert len(file['referencedBy']) > 0
@@ -1,6 +1,12 @@
+import json
 import os
+import shutil
+import tempfile
+from unittest import TestCase
+from unittest.mock import patch
 from swagger.model.specs import SwaggerSpecs, OpenAPIResourceProvider
 from app.tests.common import ApiTestCase
+from utils.config import Config
 from utils.plane import PlaneEnum
 
 
@@ -51,3 +57,277 @@ class SwaggerSpecsTestCase(ApiTestCase):
                     file_path = os.path.join(root, file)
                     if file_path_filter is None or file_path_filter(file_path):
                         yield file_path
+
+
+class TempSwaggerSpecsTestCase(TestCase):
+    """Test case with the swagger specs written into a temporary folder, which is used as the swagger path."""
+
+    def setUp(self):
+        super().setUp()
+        self.specs_folder = self.make_temp_folder()
+        self.dev_folder = self.make_temp_folder()
+        self.patch_config(
+            SWAGGER_PATH=self.specs_folder,
+            SWAGGER_MODULE_PATH=None,
+            AAZ_DEV_FOLDER=self.dev_folder,
+            SWAGGER_SPECS_POLL_INTERVAL=0,
+        )
+
+    def make_temp_folder(self):
+        folder = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, folder)
+        return folder
+
+    def patch_config(self, **values):
+        for key, value in values.items():
+            patcher = patch.object(Config, key, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def write_file(self, file_path, content):
+        """Write a json file, or a text file if the content is a string, return the file path.
+
+        A relative path is in the specs folder. The modified time of an existing file is increased, so the change is
+        found by the caches keyed on it, even when the file is written again in the same tick.
+        """
+        file_path = os.path.join(self.specs_folder, file_path)
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        mtime = os.stat(file_path).st_mtime_ns if os.path.exists(file_path) else None
+        with open(file_path, 'w', encoding='utf-8') as f:
+            if isinstance(content, str):
+                f.write(content)
+            else:
+                json.dump(content, f)
+        if mtime is not None:
+            stat = os.stat(file_path)
+            os.utime(file_path, ns=(stat.st_atime_ns, max(stat.st_mtime_ns, mtime + 1000000000)))
+        return file_path
+
+    def write_definitions(self, file_path, definitions):
+        """Write a swagger file with the definitions only, return the file path."""
+        return self.write_file(file_path, {
+            "swagger": "2.0",
+            "info": {"title": os.path.basename(file_path), "version": "2021-01-01"},
+            "paths": {},
+            "definitions": definitions,
+        })
+
+    def write_swagger(self, module_name, rp_name, version, body, readme=None):
+        """Write the swagger file of a management plane resource provider, return the file path."""
+        module_folder = os.path.join(self.specs_folder, "specification", module_name, "resource-manager")
+        readme_path = os.path.join(module_folder, "readme.md")
+        if readme is not None or not os.path.exists(readme_path):
+            self.write_file(readme_path, readme if readme is not None else f"# {module_name}\n")
+        return self.write_file(os.path.join(module_folder, rp_name, "stable", version, f"{module_name}.json"), body)
+
+    SAMPLE_VERSION = "2021-01-01"
+
+    def write_sample_swaggers(self):
+        """Write the swagger files of `Microsoft.Sample` in module `sample`, return the path of the main file.
+
+        The models are defined across files, with a discriminator of which a child is defined in another file,
+        `allOf` inheritance, a recursive definition and an operation in `x-ms-paths`.
+        """
+        module_folder = os.path.join(self.specs_folder, "specification", "sample", "resource-manager")
+        version_folder = os.path.join(module_folder, "Microsoft.Sample", "stable", self.SAMPLE_VERSION)
+        common_ref = "../../../common/v1/types.json"
+        files = {
+            os.path.join(module_folder, "common", "v1", "types.json"): {
+                "swagger": "2.0",
+                "info": {"title": "common types", "version": "v1"},
+                "paths": {},
+                "definitions": {
+                    "Resource": {
+                        "type": "object",
+                        "properties": {
+                            "id": {"type": "string", "readOnly": True},
+                            "name": {"type": "string", "readOnly": True},
+                            "type": {"type": "string", "readOnly": True},
+                            "systemData": {"$ref": "#/definitions/SystemData", "readOnly": True},
+                        },
+                        "x-ms-azure-resource": True,
+                    },
+                    "TrackedResource": {
+                        "type": "object",
+                        "allOf": [{"$ref": "#/definitions/Resource"}],
+                        "properties": {
+                            "location": {"type": "string", "x-ms-mutability": ["read", "create"]},
+                            "tags": {"type": "object", "additionalProperties": {"type": "string"}},
+                        },
+                        "required": ["location"],
+                    },
+                    "SystemData": {
+                        "type": "object",
+                        "properties": {
+                            "createdBy": {"type": "string"},
+                            "createdAt": {"type": "string", "format": "date-time"},
+                        },
+                    },
+                    "ErrorResponse": {
+                        "type": "object",
+                        "properties": {"code": {"type": "string"}, "message": {"type": "string"}},
+                    },
+                },
+                "parameters": {
+                    "SubscriptionIdParameter": {
+                        "name": "subscriptionId", "in": "path", "required": True, "type": "string"},
+                    "ResourceGroupNameParameter": {
+                        "name": "resourceGroupName", "in": "path", "required": True, "type": "string",
+                        "x-ms-parameter-location": "method"},
+                    "ApiVersionParameter": {
+                        "name": "api-version", "in": "query", "required": True, "type": "string"},
+                },
+            },
+            os.path.join(version_folder, "shapes.json"): {
+                "swagger": "2.0",
+                "info": {"title": "shapes", "version": self.SAMPLE_VERSION},
+                "paths": {},
+                "definitions": {
+                    "Frame": {
+                        "type": "object",
+                        "properties": {"color": {"type": "string", "enum": ["red", "blue"]}},
+                    },
+                    "Square": {
+                        "type": "object",
+                        "allOf": [{"$ref": "./sample.json#/definitions/Shape"}],
+                        "properties": {"side": {"type": "integer", "format": "int32"}},
+                        "x-ms-discriminator-value": "Square",
+                    },
+                },
+            },
+            os.path.join(version_folder, "sample.json"): self._build_sample_swagger(common_ref),
+        }
+        for file_path, body in files.items():
+            self.write_file(file_path, body)
+        self.write_file(os.path.join(module_folder, "readme.md"), "# sample\n")
+        return os.path.join(version_folder, "sample.json")
+
+    def _build_sample_swagger(self, common_ref):
+        parameters = [
+            {"$ref": f"{common_ref}#/parameters/SubscriptionIdParameter"},
+            {"$ref": f"{common_ref}#/parameters/ResourceGroupNameParameter"},
+            {"name": "widgetName", "in": "path", "required": True, "type": "string"},
+            {"$ref": f"{common_ref}#/parameters/ApiVersionParameter"},
+        ]
+        body = {"name": "widget", "in": "body", "required": True, "schema": {"$ref": "#/definitions/Widget"}}
+        responses = {
+            "200": {"description": "OK", "schema": {"$ref": "#/definitions/Widget"}},
+            "default": {"description": "Error", "schema": {"$ref": f"{common_ref}#/definitions/ErrorResponse"}},
+        }
+        no_content = {
+            "200": {"description": "OK"},
+            "204": {"description": "No Content"},
+            "default": {"description": "Error", "schema": {"$ref": f"{common_ref}#/definitions/ErrorResponse"}},
+        }
+        widgets_path = "/subscriptions/{subscriptionId}/resourceGroups/{resourceGroupName}" \
+                       "/providers/Microsoft.Sample/widgets"
+        return {
+            "swagger": "2.0",
+            "info": {"title": "sample", "version": self.SAMPLE_VERSION},
+            "host": "management.azure.com",
+            "schemes": ["https"],
+            "paths": {
+                f"{widgets_path}/{{widgetName}}": {
+                    "get": {"operationId": "Widgets_Get", "parameters": parameters, "responses": responses},
+                    "put": {
+                        "operationId": "Widgets_CreateOrUpdate", "parameters": [*parameters, body],
+                        "responses": {**responses, "201": responses["200"]},
+                    },
+                    "patch": {
+                        "operationId": "Widgets_Update", "parameters": [*parameters, body], "responses": responses},
+                    "delete": {"operationId": "Widgets_Delete", "parameters": parameters, "responses": no_content},
+                },
+                widgets_path: {
+                    "get": {
+                        "operationId": "Widgets_ListByResourceGroup",
+                        "parameters": [parameters[0], parameters[1], parameters[3]],
+                        "responses": {
+                            "200": {"description": "OK", "schema": {"$ref": "#/definitions/WidgetList"}},
+                            "default": responses["default"],
+                        },
+                        "x-ms-pageable": {"nextLinkName": "nextLink"},
+                    },
+                },
+            },
+            "x-ms-paths": {
+                f"{widgets_path}/{{widgetName}}?action=restart": {
+                    "post": {
+                        "operationId": "Widgets_Restart",
+                        "parameters": [*parameters, {
+                            "name": "parameters", "in": "body", "required": True,
+                            "schema": {"$ref": "#/definitions/RestartParameters"},
+                        }],
+                        "responses": no_content,
+                    },
+                },
+            },
+            "definitions": {
+                "Widget": {
+                    "type": "object",
+                    "allOf": [{"$ref": f"{common_ref}#/definitions/TrackedResource"}],
+                    "properties": {
+                        "properties": {"$ref": "#/definitions/WidgetProperties", "x-ms-client-flatten": True},
+                    },
+                },
+                "WidgetProperties": {
+                    "type": "object",
+                    "properties": {
+                        "shape": {"$ref": "#/definitions/Shape"},
+                        "frame": {"$ref": "./shapes.json#/definitions/Frame"},
+                        "parts": {"type": "array", "items": {"$ref": "#/definitions/Part"}},
+                    },
+                },
+                "Part": {
+                    "type": "object",
+                    "properties": {
+                        "name": {"type": "string"},
+                        "parts": {"type": "array", "items": {"$ref": "#/definitions/Part"}},
+                    },
+                },
+                "Shape": {
+                    "type": "object",
+                    "discriminator": "kind",
+                    "required": ["kind"],
+                    "properties": {"kind": {"type": "string"}},
+                },
+                "Circle": {
+                    "type": "object",
+                    "allOf": [{"$ref": "#/definitions/Shape"}],
+                    "properties": {"radius": {"type": "number"}},
+                    "x-ms-discriminator-value": "Circle",
+                },
+                "WidgetList": {
+                    "type": "object",
+                    "properties": {
+                        "value": {"type": "array", "items": {"$ref": "#/definitions/Widget"}},
+                        "nextLink": {"type": "string"},
+                    },
+                },
+                "RestartParameters": {
+                    "type": "object",
+                    "properties": {"force": {"type": "boolean"}},
+                },
+            },
+        }
+
+    def get_sample_resources(self):
+        """Return the resources of `Microsoft.Sample` written by `write_sample_swaggers`, in the order of their ids."""
+        from swagger.controller.specs_manager import SwaggerSpecsManager
+        module_manager = SwaggerSpecsManager().get_module_manager(PlaneEnum.Mgmt, ["sample"])
+        resource_map = module_manager.get_resource_map(
+            module_manager.get_openapi_resource_provider("Microsoft.Sample"))
+        return [resource_map[resource_id][self.SAMPLE_VERSION] for resource_id in sorted(resource_map)]
+
+    def generate_command_groups(self, resources, generator=None):
+        """Return the primitives of the draft command groups of resources, which are generated by one generator."""
+        from command.model.configuration import CMDBuildInVariants
+        from swagger.controller.command_generator import SwaggerCommandGenerator
+        generator = generator or SwaggerCommandGenerator()
+        generator.load_resources(resources)
+        try:
+            return [
+                generator.create_draft_command_group(resource, instance_var=CMDBuildInVariants.Instance).to_primitive()
+                for resource in resources
+            ]
+        finally:
+            generator.release_resources(resources)
@@ -0,0 +1,100 @@
+import json
+import os
+
+from command.model.configuration import CMDBuildInVariants
+from swagger.controller.command_generator import SwaggerCommandGenerator
+from swagger.controller.parallel_generator import generate_draft_command_groups, _split_resources
+from swagger.controller.specs_manager import SwaggerSpecsManager
+from swagger.tests.common import TempSwaggerSpecsTestCase
+from utils.plane import PlaneEnum
+
+
+class ParallelGeneratorTest(TempSwaggerSpecsTestCase):
+
+    VERSION = "2021-01-01"
+
+    def setUp(self):
+        super().setUp()
+        file_path = self.write_swagger("foo", "Microsoft.Foo", self.VERSION, self._build_swagger(("Widget", "Gadget")))
+        self.write_file(os.path.join(os.path.dirname(file_path), "gizmo.json"), self._build_swagger(("Gizmo", )))
+
+    def _build_swagger(self, names):
+        paths = {}
+        definitions = {
+            # the recursive definition is converted to a cls definition
+            "Part": {
+                "type": "object",
+                "properties": {
+                    "name": {"type": "string"},
+                    "parts": {"type": "array", "items": {"$ref": "#/definitions/Part"}},
+                },
+            },
+        }
+        for name in names:
+            plural = f"{name.lower()}s"
+            parameters = [
+                {"name": "subscriptionId", "in": "path", "required": True, "type": "string"},
+                {"name": f"{name.lower()}Name", "in": "path", "required": True, "type": "string"},
+                {"name": "api-version", "in": "query", "required": True, "type": "string"},
+            ]
+            response = {"200": {"description": "OK", "schema": {"$ref": f"#/definitions/{name}"}}}
+            paths[f"/subscriptions/{{subscriptionId}}/providers/Microsoft.Foo/{plural}/{{{name.lower()}Name}}"] = {
+                "get": {"operationId": f"{name}s_Get", "parameters": parameters, "responses": response},
+                "put": {
+                    "operationId": f"{name}s_CreateOrUpdate",
+                    "parameters": [
+                        *parameters,
+                        {"name": "body", "in": "body", "required": True, "schema": {"$ref": f"#/definitions/{name}"}}
+                    ],
+                    "responses": response,
+                },
+                "delete": {"operationId": f"{name}s_Delete", "parameters": parameters, "responses": {"200": {"description": "OK"}}},
+            }
+            definitions[name] = {
+                "type": "object",
+                "properties": {
+                    "id": {"type": "string", "readOnly": True},
+                    "tags": {"type": "object", "additionalProperties": {"type": "string"}},
+                    "size": {"type": "integer", "format": "int32"},
+                    "parts": {"type": "array", "items": {"$ref": "#/definitions/Part"}},
+                },
+            }
+        return {
+            "swagger": "2.0",
+            "info": {"title": "foo", "version": self.VERSION},
+            "paths": paths,
+            "definitions": definitions,
+        }
+
+    def test_generate_in_input_order(self):
+        module_manager = SwaggerSpecsManager().get_module_manager(PlaneEnum.Mgmt, ["foo"])
+        resource_map = module_manager.get_resource_map(module_manager.get_openapi_resource_provider("Microsoft.Foo"))
+        resources = [resource_map[resource_id][self.VERSION] for resource_id in sorted(resource_map, reverse=True)]
+        resource_options = [{}, {"methods": ("get",)}, {}]
+
+        generator = SwaggerCommandGenerator()
+        generator.load_resources(resources)
+        expected = [
+            (generator.create_draft_command_group(
+                resource, instance_var=CMDBuildInVariants.Instance, **options).to_primitive(), None)
+            for resource, options in zip(resources, resource_options)
+        ]
+        generator.release_resources(resources)
+
+        # the resources of the same file are dispatched to one worker
+        self.assertEqual(_split_resources([resource.file_path for resource in resources], 2), [[0, 2], [1]])
+        results = generate_draft_command_groups(
+            plane=PlaneEnum.Mgmt, mod_names=["foo"], version=self.VERSION,
+            resources=resources, resource_options=resource_options, workers=2)
+        self.assertEqual(results, expected)
+        self.assertEqual(len(results[1][0]["commands"]), 1)
+        self.assertIn("@Part_read", json.dumps(results))
+
+    def test_generate_sample_resources(self):
+        self.write_sample_swaggers()
+        resources = self.get_sample_resources()
+        expected = [(data, None) for data in self.generate_command_groups(resources)]
+        results = generate_draft_command_groups(
+            plane=PlaneEnum.Mgmt, mod_names=["sample"], version=self.SAMPLE_VERSION,
+            resources=resources, resource_options=[{}] * len(resources), workers=2)
+        self.assertEqual(results, expected)
@@ -0,0 +1,159 @@
+import os
+import threading
+from unittest.mock import patch
+
+from swagger.controller.specs_manager import SwaggerSpecsManager, SwaggerSpecsModuleManager
+from swagger.tests.common import TempSwaggerSpecsTestCase
+from utils import exceptions
+from utils.plane import PlaneEnum
+
+
+class SwaggerSpecsManagerTest(TempSwaggerSpecsTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.file_path = self._write_swagger(["/subscriptions/{subscriptionId}/providers/Microsoft.Foo/widgets"])
+
+    def _write_swagger(self, paths):
+        body = {
+            "swagger": "2.0",
+            "info": {"version": "2021-01-01"},
+            "paths": {path: {"get": {"operationId": f"Widgets_Get{idx}"}} for idx, path in enumerate(paths)},
+        }
+        return self.write_swagger("foo", "Microsoft.Foo", "2021-01-01", body)
+
+    def test_shared_manager(self):
+        manager = SwaggerSpecsManager.shared()
+        self.assertIs(manager, SwaggerSpecsManager.shared())
+        module_manager = manager.get_module_manager(PlaneEnum.Mgmt, ["foo"])
+        self.assertIs(module_manager, SwaggerSpecsManager.shared().get_module_manager(PlaneEnum.Mgmt, ["foo"]))
+
+        manager.refresh()
+        self.assertIsNot(module_manager, manager.get_module_manager(PlaneEnum.Mgmt, ["foo"]))
+
+    def test_invalidate_changed_resource_provider(self):
+        module_manager = SwaggerSpecsManager.shared().get_module_manager(PlaneEnum.Mgmt, ["foo"])
+        rp = module_manager.get_openapi_resource_provider("Microsoft.Foo")
+        resource_map = module_manager.get_resource_map(rp)
+        self.assertEqual(len(resource_map), 1)
+        self.assertIs(resource_map, module_manager.get_resource_map(rp))
+        resource_id_index = rp.get_resource_id_index()
+        self.assertIs(resource_id_index, rp.get_resource_id_index())
+        self.assertNotIn("/subscriptions/{}/providers/microsoft.foo/gadgets", resource_id_index)
+
+        self._write_swagger([
+            "/subscriptions/{subscriptionId}/providers/Microsoft.Foo/widgets",
+            "/subscriptions/{subscriptionId}/providers/Microsoft.Foo/gadgets",
+        ])
+        os.utime(self.file_path, ns=(0, os.stat(self.file_path).st_mtime_ns + 1000000000))
+        resource_map = module_manager.get_resource_map(rp)
+        self.assertEqual(len(resource_map), 2)
+        self.assertIn("/subscriptions/{}/providers/microsoft.foo/gadgets", rp.get_resource_id_index())
+        grouped = module_manager.get_grouped_resource_map("Microsoft.Foo")
+        self.assertEqual(sum(len(v) for v in grouped.values()), 2)
+
+    def test_resource_id_index(self):
+        manager = SwaggerSpecsManager.shared()
+        module_manager = manager.get_module_manager(PlaneEnum.Mgmt, ["foo"])
+        widgets_id = "/subscriptions/{}/providers/microsoft.foo/widgets"
+        gadgets_id = "/subscriptions/{}/providers/microsoft.foo/gadgets"
+        version_map = module_manager.get_resource_version_map(widgets_id)
+        self.assertEqual(list(version_map.keys()), ["2021-01-01"])
+
+        index = manager.get_resource_id_index(PlaneEnum.Mgmt)
+        self.assertIs(index, module_manager.resource_id_index)
+        entries = index.get(widgets_id)
+        self.assertEqual(len(entries), 1)
+        self.assertEqual(entries[0].module, "mgmt-plane/foo")
+        self.assertEqual(entries[0].rp.name, "Microsoft.Foo")
+        self.assertEqual(entries[0].versions, ("2021-01-01",))
+
+        with self.assertRaises(exceptions.ResourceNotFind):
+            module_manager.get_resource_in_version(gadgets_id, "2021-01-01")
+
+        self._write_swagger([
+            "/subscriptions/{subscriptionId}/providers/Microsoft.Foo/gadgets",
+        ])
+        os.utime(self.file_path, ns=(0, os.stat(self.file_path).st_mtime_ns + 1000000000))
+        resource = module_manager.get_resource_in_version(gadgets_id, "2021-01-01")
+        self.assertEqual(resource.id, gadgets_id)
+        self.assertNotIn(widgets_id, index)
+        self.assertIn(gadgets_id, index)
+
+    def test_index_resource_providers_of_namespace(self):
+        self.write_swagger("foo", "Microsoft.Bar", "2021-01-01", {
+            "swagger": "2.0",
+            "info": {"version": "2021-01-01"},
+            "paths": {
+                f"/subscriptions/{{subscriptionId}}/providers/{namespace}/{name}": {
+                    "get": {"operationId": f"{name.capitalize()}_Get"}
+                } for namespace, name in (("Microsoft.Bar", "things"), ("Microsoft.Other", "others"))
+            },
+        })
+        module_manager = SwaggerSpecsManager.shared().get_module_manager(PlaneEnum.Mgmt, ["foo"])
+        foo_rp = module_manager.get_openapi_resource_provider("Microsoft.Foo")
+        bar_rp = module_manager.get_openapi_resource_provider("Microsoft.Bar")
+
+        # only the resource provider of the namespace in resource id is loaded
+        version_map = module_manager.get_resource_version_map("/subscriptions/{}/providers/microsoft.foo/widgets")
+        self.assertEqual(version_map["2021-01-01"].resource_provider, foo_rp)
+        self.assertNotIn(str(bar_rp), module_manager._resource_map_cache)
+
+        # the other resource providers are loaded when the resource id is not defined by the one of its namespace
+        resource = module_manager.get_resource_in_version(
+            "/subscriptions/{}/providers/microsoft.other/others", "2021-01-01")
+        self.assertEqual(resource.resource_provider, bar_rp)
+
+    def test_build_resource_id_index_without_manager_lock(self):
+        manager = SwaggerSpecsManager.shared()
+        build_resource_id_index = SwaggerSpecsModuleManager.build_resource_id_index
+        unblocked = []
+
+        def _build_resource_id_index(module_manager):
+            # the other requests get the module managers while the index is building
+            thread = threading.Thread(
+                target=lambda: unblocked.append(manager.get_module_manager(PlaneEnum.Mgmt, ["foo"])))
+            thread.start()
+            thread.join(timeout=10)
+            return build_resource_id_index(module_manager)
+
+        with patch.object(SwaggerSpecsModuleManager, "build_resource_id_index", _build_resource_id_index):
+            index = manager.get_resource_id_index(PlaneEnum.Mgmt)
+        self.assertEqual(len(unblocked), 1)
+        self.assertIn("/subscriptions/{}/providers/microsoft.foo/widgets", index)
+
+    def test_get_modules(self):
+        spec_folder = os.path.join(self.specs_folder, "specification")
+        for path in [
+            "bar/resource-manager/Microsoft.Bar/stable",
+            "bar/resource-manager/common",
+            "bar/resource-manager/sub/Microsoft.Sub/stable",
+            "baz/data-plane/Microsoft.Baz/stable",
+            "baz/data-plane/Other.Thing/stable",
+            "empty/resource-manager/common",
+        ]:
+            os.makedirs(os.path.join(spec_folder, path))
+        tsp_folder = os.path.join(spec_folder, "qux", "Qux.Management")
+        self.write_file(os.path.join(tsp_folder, "main.tsp"), '@armProviderNamespace\nnamespace Microsoft.Qux;\n')
+        self.write_file(os.path.join(tsp_folder, "tspconfig.yaml"), '\n')
+
+        manager = SwaggerSpecsManager.shared()
+        data_plane = PlaneEnum.Data("Microsoft.Baz")
+        for plane, top_modules in [
+            (PlaneEnum.Mgmt, manager.specs.get_mgmt_plane_modules(plane=PlaneEnum.Mgmt)),
+            (data_plane, manager.specs.get_data_plane_modules(plane=data_plane)),
+        ]:
+            # the modules are the same as the ones of the resource providers
+            expected = []
+            for module in top_modules:
+                for rp in module.get_resource_providers():
+                    if str(rp.swagger_module) not in expected:
+                        expected.append(str(rp.swagger_module))
+            self.assertEqual([str(module) for module in manager.get_modules(plane)], expected)
+
+        self.assertEqual(
+            sorted(str(module) for module in manager.get_modules(PlaneEnum.Mgmt)),
+            ["mgmt-plane/bar", "mgmt-plane/bar/sub", "mgmt-plane/foo", "mgmt-plane/qux"])
+        self.assertEqual(
+            [str(module) for module in manager.get_modules(data_plane)],
+            ["data-plane:microsoft.baz/baz"])
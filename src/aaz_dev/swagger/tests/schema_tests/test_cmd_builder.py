@@ -0,0 +1,241 @@
+from unittest.mock import patch
+
+from command.model.configuration import CMDClsSchema, CMDSchemaHasher
+from swagger.model.schema.cmd_builder import CMDBuilder, CMDSchemaCache
+from swagger.model.schema.fields import MutabilityEnum
+from swagger.model.specs import SwaggerLoader
+from swagger.tests.common import TempSwaggerSpecsTestCase
+from swagger.utils import exceptions
+from utils.config import Config
+
+
+class CMDBuilderTest(TempSwaggerSpecsTestCase):
+
+    PATH = "/subscriptions/{subscriptionId}/providers/Microsoft.Foo/widgets/{widgetName}"
+
+    def _load_swagger(self, body):
+        file_path = self.write_file("foo.json", body)
+        loader = SwaggerLoader()
+        swagger = loader.load_file(file_path)
+        loader.link_swaggers()
+        return swagger
+
+    def _load_path_item(self):
+        parameters = [
+            {"name": "subscriptionId", "in": "path", "required": True, "type": "string"},
+            {"name": "widgetName", "in": "path", "required": True, "type": "string"},
+            {"name": "api-version", "in": "query", "required": True, "type": "string"},
+        ]
+
+        def _operation(operation_id, with_body):
+            operation = {
+                "operationId": operation_id,
+                "parameters": [*parameters],
+                "responses": {"200": {"description": "OK", "schema": {"$ref": "#/definitions/Widget"}}},
+            }
+            if with_body:
+                operation["parameters"].append(
+                    {"name": "body", "in": "body", "required": True, "schema": {"$ref": "#/definitions/Widget"}})
+            return operation
+
+        body = {
+            "swagger": "2.0",
+            "info": {"title": "foo", "version": "2021-01-01"},
+            "paths": {
+                self.PATH: {
+                    "get": _operation("Widgets_Get", False),
+                    "put": _operation("Widgets_CreateOrUpdate", True),
+                    "patch": _operation("Widgets_Update", True),
+                }
+            },
+            "definitions": {
+                "Widget": {
+                    "type": "object",
+                    "properties": {
+                        "id": {"type": "string", "readOnly": True},
+                        "systemData": {"$ref": "#/definitions/SystemData", "readOnly": True},
+                        "properties": {"$ref": "#/definitions/WidgetProperties"},
+                    },
+                },
+                "WidgetProperties": {
+                    "type": "object",
+                    "properties": {
+                        "size": {"type": "integer", "format": "int32", "minimum": 1},
+                        "parts": {"type": "array", "items": {"$ref": "#/definitions/Part"}},
+                    },
+                },
+                "Part": {
+                    "type": "object",
+                    "properties": {
+                        "name": {"type": "string"},
+                        "parts": {"type": "array", "items": {"$ref": "#/definitions/Part"}},
+                    },
+                },
+                "SystemData": {
+                    "type": "object",
+                    "properties": {
+                        "createdBy": {"type": "string"},
+                        "createdAt": {"type": "string", "format": "date-time"},
+                    },
+                },
+            },
+        }
+        return self._load_swagger(body).paths[self.PATH]
+
+    def _build_operations(self, path_item, schema_cache):
+        results = []
+        for method, mutability in (
+                ("get", MutabilityEnum.Read), ("put", MutabilityEnum.Create), ("patch", MutabilityEnum.Update)):
+            builder = CMDBuilder(path=self.PATH, method=method, mutability=mutability, schema_cache=schema_cache)
+            op = builder(path_item)
+            builder.apply_cls_definitions(op)
+            results.append(op.to_primitive())
+        # the generic update operations share the builder
+        builder = CMDBuilder(path=self.PATH, schema_cache=schema_cache)
+        get_op = builder(path_item, method="get", mutability=MutabilityEnum.Read)
+        put_op = builder(path_item, method="put", mutability=MutabilityEnum.Update)
+        builder.apply_cls_definitions(get_op, put_op)
+        results.extend([get_op.to_primitive(), put_op.to_primitive()])
+        return results
+
+    def test_convert_by_cache(self):
+        path_item = self._load_path_item()
+        schema_cache = CMDSchemaCache()
+        expected = self._build_operations(path_item, None)
+        self.assertEqual(self._build_operations(path_item, schema_cache), expected)
+        self.assertGreater(schema_cache.hits, 0)
+
+        # the cached schemas are not changed by the returned ones
+        hits = schema_cache.hits
+        self.assertEqual(self._build_operations(path_item, schema_cache), expected)
+        self.assertGreater(schema_cache.hits, hits)
+
+    def test_deep_nested_schema(self):
+        depth = 60
+        definitions = {}
+        for idx in range(depth):
+            properties = {"name": {"type": "string"}}
+            if idx + 1 < depth:
+                properties["next"] = {"$ref": f"#/definitions/D{idx + 1}"}
+            definitions[f"D{idx}"] = {"type": "object", "properties": properties}
+        definitions["LoopA"] = {"type": "object", "allOf": [{"$ref": "#/definitions/LoopB"}]}
+        definitions["LoopB"] = {"type": "object", "allOf": [{"$ref": "#/definitions/LoopA"}]}
+        swagger = self._load_swagger({
+            "swagger": "2.0",
+            "info": {"title": "foo", "version": "2021-01-01"},
+            "paths": {},
+            "definitions": definitions,
+        })
+
+        builder = CMDBuilder(path=self.PATH, method="get", mutability=MutabilityEnum.Read)
+        model = builder(swagger.definitions["D0"])
+        for _ in range(depth - 1):
+            model = [prop for prop in model.props if prop.name == "next"][0]
+        self.assertEqual([prop.name for prop in model.props], ["name"])
+        # the parents are popped after conversion
+        self.assertEqual(builder._context.ids, {})
+
+        with self.assertRaises(exceptions.InvalidSwaggerValueError):
+            builder(swagger.definitions["LoopA"])
+        self.assertEqual(builder._context.ids, {})
+
+    def test_parent_ids(self):
+        root = CMDBuilder(path=self.PATH, parent_ids=[("a",)])
+        root.id = ("b",)
+        sub_builder = CMDBuilder(path=self.PATH, parent=root)
+        sub_builder.id = ("c",)
+        self.assertEqual(CMDBuilder(path=self.PATH, parent=sub_builder).parent_ids, [("a",), ("b",), ("c",)])
+        self.assertTrue(root.find_traces("a"))
+        self.assertFalse(root.find_traces("b"))
+
+    def _build_identical_definitions(self):
+        sku = {"type": "object", "properties": {"name": {"type": "string"}, "tier": {"type": "string"}}}
+        swagger = self._load_swagger({
+            "swagger": "2.0",
+            "info": {"title": "foo", "version": "2021-01-01"},
+            "paths": {
+                self.PATH: {
+                    "get": {
+                        "operationId": "Widgets_Get",
+                        "parameters": [
+                            {"name": "subscriptionId", "in": "path", "required": True, "type": "string"},
+                            {"name": "widgetName", "in": "path", "required": True, "type": "string"},
+                            {"name": "api-version", "in": "query", "required": True, "type": "string"},
+                        ],
+                        "responses": {"200": {"description": "OK", "schema": {"$ref": "#/definitions/Widget"}}},
+                    },
+                },
+            },
+            "definitions": {
+                "Widget": {
+                    "type": "object",
+                    "properties": {
+                        "sku": {"$ref": "#/definitions/Sku"},
+                        "backupSku": {"$ref": "#/definitions/BackupSku"},
+                        "skus": {"type": "array", "items": {"$ref": "#/definitions/Sku"}},
+                    },
+                },
+                "Sku": sku,
+                "BackupSku": sku,
+            },
+        })
+        builder = CMDBuilder(path=self.PATH, method="get", mutability=MutabilityEnum.Read)
+        op = builder(swagger.paths[self.PATH])
+        builder.apply_cls_definitions(op)
+        schema = [response for response in op.http.responses if not response.is_error][0].body.json.schema
+        return builder, {prop.name: prop for prop in schema.props}
+
+    def test_merge_identical_cls_definitions(self):
+        with patch.object(Config, "CLS_STRUCTURAL_SHARING", False):
+            builder, props = self._build_identical_definitions()
+        self.assertEqual(sorted(builder.cls_definitions), ["BackupSku_read", "Sku_read", "Widget_read"])
+        self.assertEqual(props["sku"].cls, "Sku_read")
+        self.assertIsNone(props["backupSku"].cls)
+        self.assertEqual(props["backupSku"].type, "object")
+
+        with patch.object(Config, "CLS_STRUCTURAL_SHARING", True):
+            builder, props = self._build_identical_definitions()
+        self.assertEqual(sorted(builder.cls_definitions), ["Sku_read", "Widget_read"])
+        self.assertEqual(builder.cls_definitions["Sku_read"]["count"], 3)
+        self.assertEqual(props["sku"].cls, "Sku_read")
+        self.assertIsInstance(props["backupSku"], CMDClsSchema)
+        self.assertEqual(props["backupSku"].type, "@Sku_read")
+        self.assertEqual(props["backupSku"].name, "backupSku")
+        self.assertIs(props["backupSku"].implement, props["sku"])
+        self.assertEqual(props["skus"].item.type, "@Sku_read")
+
+    def test_schema_hash(self):
+        with patch.object(Config, "CLS_STRUCTURAL_SHARING", False):
+            _, props = self._build_identical_definitions()
+        hasher = CMDSchemaHasher()
+        # the position of schemas is not a part of the structure
+        self.assertEqual(hasher.hash_structure(props["sku"]), hasher.hash_structure(props["backupSku"]))
+        self.assertNotEqual(hasher.hash(props["sku"]), hasher.hash(props["backupSku"]))
+        self.assertNotEqual(hasher.hash_structure(props["sku"]), hasher.hash_structure(props["skus"]))
+
+
+class CMDSchemaCacheGenerationTest(TempSwaggerSpecsTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.write_sample_swaggers()
+
+    def test_convert_shared_schemas_once(self):
+        resources = self.get_sample_resources()
+        self.assertFalse(Config.CMD_SCHEMA_CACHE)
+        expected = self.generate_command_groups(resources)
+
+        schema_caches = []
+
+        class _SchemaCache(CMDSchemaCache):
+            def __init__(self):
+                super().__init__()
+                schema_caches.append(self)
+
+        self.patch_config(CMD_SCHEMA_CACHE=True)
+        with patch("swagger.controller.command_generator.CMDSchemaCache", _SchemaCache):
+            self.assertEqual(self.generate_command_groups(resources), expected)
+        self.assertEqual(len(schema_caches), len(resources))
+        # the resource model is shared by the responses of get, put and patch operations
+        self.assertGreater(schema_caches[1].hits, 0)
+
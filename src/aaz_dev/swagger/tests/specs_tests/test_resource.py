@@ -0,0 +1,77 @@
+import json
+import os
+from unittest import TestCase, mock
+
+from swagger.model.specs import Resource
+from swagger.model.specs._resource import ResourceVersion
+from swagger.model.specs._resource import _get_operation_group_name
+from swagger.tests.common import TempSwaggerSpecsTestCase
+from utils import inflection
+from utils.config import Config
+
+
+class _FakeResourceProvider:
+    name = "Microsoft.Foo"
+    folder_path = os.path.join(os.sep, "specification", "foo", "resource-manager", "Microsoft.Foo")
+
+
+class ResourceOperationGroupNameTest(TempSwaggerSpecsTestCase):
+
+    def _new_resource(self, version, body):
+        file_path = os.path.join(_FakeResourceProvider.folder_path, "stable", version, "foo.json")
+        return Resource(
+            resource_id="/subscriptions/{}/providers/microsoft.foo/widgets/{}",
+            path="/subscriptions/{subscriptionId}/providers/Microsoft.Foo/widgets/{name}",
+            version=version, file_path=file_path, resource_provider=_FakeResourceProvider(), body=body)
+
+    def test_operation_group_name(self):
+        body = {
+            "get": {"operationId": "Widgets_Get"},
+            "put": {"operationId": "Widget_CreateOrUpdate"},
+        }
+        resource = self._new_resource("2021-01-01", body)
+        self.assertEqual(resource.get_operation_group_name(), "Widget")
+
+        # the name is shared by the same resource in other versions
+        hits = _get_operation_group_name.cache_info().hits
+        self.assertEqual(self._new_resource("2022-01-01", body).get_operation_group_name(), "Widget")
+        self.assertEqual(_get_operation_group_name.cache_info().hits, hits + 1)
+
+        resource = self._new_resource("2021-01-01", {"get": {"operationId": "invalid"}})
+        with self.assertLogs('backend', level='ERROR'):
+            self.assertIsNone(resource.get_operation_group_name())
+
+    def test_word_table(self):
+        table_path = self.write_file(
+            os.path.join(self.make_temp_folder(), "words.json"), {"singular_noun": {"gadgetz": "gadget"}})
+        with mock.patch.object(Config, "INFLECTION_WORD_TABLE", table_path):
+            inflection._inflect.cache_clear()
+            self.assertEqual(inflection.singular_noun("gadgetz"), "gadget")
+            self.assertEqual(inflection.singular_noun("sprockets"), "sprocket")
+            inflection.save_word_table()
+        inflection._inflect.cache_clear()
+        with open(table_path, 'r', encoding='utf-8') as f:
+            self.assertEqual(json.load(f)["singular_noun"]["sprockets"], "sprocket")
+
+
+class ResourceRecordTest(TestCase):
+
+    def test_shared_versions(self):
+        rp = _FakeResourceProvider()
+        file_path = os.path.join(rp.folder_path, "preview", "2021-01-01-preview", "foo.json")
+        file_path_version = Resource.parse_file_path_version(file_path, rp.folder_path)
+        self.assertEqual(file_path_version.readiness, ResourceVersion.Readiness.Preview)
+
+        resources = [
+            Resource(
+                resource_id=f"/subscriptions/{{}}/providers/microsoft.foo/widget{idx}s",
+                path=f"/subscriptions/{{subscriptionId}}/providers/Microsoft.Foo/widget{idx}s",
+                version="2021-01-01-preview", file_path=file_path, resource_provider=rp,
+                body={"get": {"operationId": f"Widget{idx}s_List"}}, file_path_version=file_path_version)
+            for idx in range(2)
+        ]
+        self.assertIs(resources[0]._version, resources[1]._version)
+        self.assertIs(resources[0].file_path_version, resources[1].file_path_version)
+        self.assertEqual(resources[0].version, "2021-01-01-preview")
+        with self.assertRaises(AttributeError):
+            resources[0].extra = None
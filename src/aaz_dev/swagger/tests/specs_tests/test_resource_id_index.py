@@ -0,0 +1,67 @@
+from unittest import TestCase
+
+from swagger.model.specs import ResourceIdIndex
+
+
+class _FakeResourceProvider:
+
+    def __init__(self, name):
+        self.name = name
+
+    def __str__(self):
+        return f"mgmt-plane/foo/ResourceProviders/{self.name}"
+
+
+class ResourceIdIndexTest(TestCase):
+
+    def setUp(self):
+        self.rp_foo = _FakeResourceProvider("Microsoft.Foo")
+        self.rp_bar = _FakeResourceProvider("Microsoft.Bar")
+        self.index = ResourceIdIndex()
+        self.index.add_resource_provider("mgmt-plane/foo", self.rp_foo, {
+            "/subscriptions/{}/providers/microsoft.foo/widgets": {"2021-01-01": None, "2022-01-01": None},
+            "/subscriptions/{}/providers/microsoft.foo/widgets/{}": {"2021-01-01": None},
+            "/subscriptions/{}/providers/microsoft.foo/widgets/{}?action=start": {"2021-01-01": None},
+        })
+        self.index.add_resource_provider("mgmt-plane/foo", self.rp_bar, {
+            "/subscriptions/{}/providers/microsoft.foo/widgets": {"2020-01-01": None},
+            "/subscriptions/{}/providers/microsoft.foobar/items": {"2020-01-01": None},
+        })
+
+    def test_get(self):
+        entries = self.index.get("/subscriptions/{}/providers/microsoft.foo/widgets")
+        self.assertEqual([(e.rp.name, e.versions) for e in entries], [
+            ("Microsoft.Foo", ("2021-01-01", "2022-01-01")),
+            ("Microsoft.Bar", ("2020-01-01",)),
+        ])
+        self.assertIn("/subscriptions/{}/providers/microsoft.foo/widgets/{}?action=start", self.index)
+        self.assertNotIn("/subscriptions/{}/providers/microsoft.foo", self.index)
+        self.assertNotIn("/subscriptions/{}/providers/microsoft.foo/gadgets", self.index)
+
+    def test_has_children(self):
+        self.assertTrue(self.index.has_children("/subscriptions/{}/providers/microsoft.foo/widgets"))
+        self.assertTrue(self.index.has_children("/subscriptions/{}/providers/microsoft.foo/widgets/{}"))
+        self.assertFalse(self.index.has_children("/subscriptions/{}/providers/microsoft.foobar/items"))
+        self.assertFalse(self.index.has_children("/subscriptions/{}/providers/microsoft.baz"))
+
+    def test_iter_prefix(self):
+        resource_ids = [resource_id for resource_id, _ in self.index.iter_prefix(
+            "/subscriptions/{}/providers/microsoft.foo/")]
+        self.assertEqual(resource_ids, [
+            "/subscriptions/{}/providers/microsoft.foo/widgets",
+            "/subscriptions/{}/providers/microsoft.foo/widgets/{}",
+            "/subscriptions/{}/providers/microsoft.foo/widgets/{}?action=start",
+        ])
+        self.assertEqual(len(self.index.iter_prefix("/")), 4)
+        self.assertEqual(self.index.iter_prefix("/subscriptions/{}/providers/microsoft.baz"), [])
+
+    def test_remove_resource_provider(self):
+        self.index.remove_resource_provider(self.rp_bar)
+        entries = self.index.get("/subscriptions/{}/providers/microsoft.foo/widgets")
+        self.assertEqual([e.rp.name for e in entries], ["Microsoft.Foo"])
+        self.assertNotIn("/subscriptions/{}/providers/microsoft.foobar/items", self.index)
+        self.assertFalse(self.index.has_children("/subscriptions/{}/providers/microsoft.foobar"))
+        self.assertFalse(self.index.has_resource_provider(self.rp_bar))
+
+        self.index.remove_resource_provider(self.rp_foo)
+        self.assertEqual(self.index.iter_prefix("/"), [])
@@ -1,6 +1,9 @@
-from swagger.tests.common import SwaggerSpecsTestCase
+from swagger.tests.common import SwaggerSpecsTestCase, TempSwaggerSpecsTestCase
 from datetime import datetime
 from swagger.model.specs import TypeSpecResourceProvider, OpenAPIResourceProvider
+from unittest.mock import patch
+import os
+import subprocess
 import time
 
 
@@ -74,3 +77,183 @@ class ResourceProviderLoaderTest(SwaggerSpecsTestCase):
         delta = datetime.now() - start
         print(delta.total_seconds())
         time.sleep(1)
+
+
+class OpenAPIResourceProviderTagsTest(TempSwaggerSpecsTestCase):
+
+    README = """# Foo
+
+``` yaml
+openapi-type: arm
+tag: package-2022-01
+```
+
+### Tag: package-2021-01
+
+``` yaml $(tag) == 'package-2021-01'
+input-file:
+  - Microsoft.Foo/stable/2021-01-01/foo.json
+```
+
+``` powershell
+# ``` yaml is not a block here
+```
+
+### Tag: package-2022-01
+
+```yaml $(tag) == 'package-2022-01'
+input-file:
+  - Microsoft.Foo/stable/2021-01-01/foo.json
+  - Microsoft.Foo/stable/2022-01-01/foo.json
+```
+"""
+
+    def setUp(self):
+        super().setUp()
+        self.rp_folder = os.path.join(self.specs_folder, "Microsoft.Foo")
+        self.file_paths = [
+            self.write_file(os.path.join(self.rp_folder, "stable", version, "foo.json"), {})
+            for version in ("2021-01-01", "2022-01-01")
+        ]
+        self.readme_path = self.write_file("readme.md", self.README)
+
+    def test_parse_readme_tags(self):
+        rp = OpenAPIResourceProvider("Microsoft.Foo", self.rp_folder, self.readme_path, swagger_module=None)
+        self.assertEqual([str(tag) for tag in rp.tags], ["package-2022-01", "package-2021-01"])
+        self.assertEqual(rp.tags["package-2021-01"], {self.file_paths[0]})
+        self.assertEqual(rp.tags["package-2022-01"], set(self.file_paths))
+        self.assertEqual(str(rp._fetch_latest_tag(self.file_paths[0])), "package-2022-01")
+        self.assertIsNone(rp._fetch_latest_tag(os.path.join(self.rp_folder, "foo.json")))
+
+        # the tags are parsed again after readme changed
+        self.write_file(self.readme_path, self.README.split("### Tag: package-2022-01")[0])
+        self.assertEqual([str(tag) for tag in rp.tags], ["package-2021-01"])
+        self.assertEqual(str(rp._fetch_latest_tag(self.file_paths[0])), "package-2021-01")
+
+
+class OpenAPIResourceProviderRefreshTest(TempSwaggerSpecsTestCase):
+
+    README = """# Foo
+
+``` yaml $(tag) == 'package-2021-01'
+input-file:
+  - Microsoft.Foo/stable/2021-01-01/foo.json
+```
+"""
+
+    def setUp(self):
+        super().setUp()
+        self.module_folder = os.path.join(self.specs_folder, "specification", "foo", "resource-manager")
+        self.rp_folder = os.path.join(self.module_folder, "Microsoft.Foo")
+        self.readme_path = self.write_file(os.path.join(self.module_folder, "readme.md"), self.README)
+        self.tagged_file = self._write_list_swagger("2021-01-01", "foo.json", "2021-01-01", ["widgets", "gadgets"])
+        self.untagged_file = self._write_list_swagger("2021-01-01", "bar.json", "2021-01-01", ["widgets"])
+        self.latest_file = self._write_list_swagger("2022-01-01", "foo.json", "2022-01-01", ["widgets"])
+
+    def _write_list_swagger(self, folder_version, name, version, resource_names):
+        """Write a swagger file with the list operations of resources."""
+        return self.write_file(os.path.join(self.rp_folder, "stable", folder_version, name), {
+            "swagger": "2.0",
+            "info": {"version": version},
+            "paths": {
+                f"/subscriptions/{{subscriptionId}}/providers/Microsoft.Foo/{resource_name}": {
+                    "get": {"operationId": f"{resource_name.capitalize()}_List"}
+                } for resource_name in resource_names
+            },
+        })
+
+    def _build_rp(self):
+        rp = OpenAPIResourceProvider("Microsoft.Foo", self.rp_folder, self.readme_path, swagger_module=None)
+        rp.parsed_files = []
+        parse_resources_in_file = rp._parse_resources_in_file
+
+        def _parse_resources_in_file(file_path, summary):
+            rp.parsed_files.append(file_path)
+            return parse_resources_in_file(file_path, summary)
+
+        rp._parse_resources_in_file = _parse_resources_in_file
+        return rp
+
+    @staticmethod
+    def _dump(resource_map):
+        return [
+            (resource_id, [(version, resource.file_path) for version, resource in version_map.items()])
+            for resource_id, version_map in resource_map.items()
+        ]
+
+    def test_refresh_changed_files(self):
+        widgets_id = "/subscriptions/{}/providers/microsoft.foo/widgets"
+        gadgets_id = "/subscriptions/{}/providers/microsoft.foo/gadgets"
+        rp = self._build_rp()
+        resource_map = rp.get_resource_map()
+        self.assertEqual(len(rp.parsed_files), 3)
+        self.assertEqual(resource_map[widgets_id]["2021-01-01"].file_path, self.tagged_file)
+        self.assertIs(rp.get_resource_map(refresh=True), resource_map)
+        self.assertEqual(len(rp.parsed_files), 3)
+
+        # the resource of the other file wins after it's removed from the file in tag
+        self._write_list_swagger("2021-01-01", "foo.json", "2021-01-01", ["gadgets"])
+        rp.parsed_files = []
+        resource_map = rp.get_resource_map(refresh=True)
+        self.assertEqual(rp.parsed_files, [self.tagged_file])
+        self.assertEqual(resource_map[widgets_id]["2021-01-01"].file_path, self.untagged_file)
+        self.assertEqual(self._dump(resource_map), self._dump(self._build_rp().get_resource_map()))
+
+        # removed files
+        os.remove(self.tagged_file)
+        rp.clear_cache()
+        rp.parsed_files = []
+        resource_map = rp.get_resource_map()
+        self.assertEqual(rp.parsed_files, [])
+        self.assertNotIn(gadgets_id, resource_map)
+        self.assertEqual(self._dump(resource_map), self._dump(self._build_rp().get_resource_map()))
+
+        # all files are parsed again after readme changed
+        self.write_file(self.readme_path, self.README.replace("2021-01-01/foo.json", "2022-01-01/foo.json"))
+        rp.parsed_files = []
+        rp.get_resource_map(refresh=True)
+        self.assertEqual(len(rp.parsed_files), 2)
+
+    def test_refresh_by_git_changes(self):
+        git = ['git', '-C', self.specs_folder, '-c', 'user.name=test', '-c', 'user.email=test@example.com']
+        try:
+            subprocess.run([*git, 'init', '-q'], check=True)
+            subprocess.run([*git, 'add', '-A'], check=True)
+            subprocess.run([*git, 'commit', '-q', '-m', 'init'], check=True)
+        except (OSError, subprocess.CalledProcessError):
+            self.skipTest("git is not available")
+
+        self.patch_config(GIT_CHANGE_DETECTION=True)
+        rp = self._build_rp()
+        rp.get_resource_map()
+        fingerprint = rp.get_fingerprint()
+        self.assertEqual(len(rp.parsed_files), 3)
+
+        # the files unchanged in git are not parsed again after their mtime changed
+        for file_path in (self.tagged_file, self.latest_file):
+            stat = os.stat(file_path)
+            os.utime(file_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1000000000))
+        self.assertEqual(rp.get_fingerprint(), fingerprint)
+        rp.parsed_files = []
+        rp.get_resource_map(refresh=True)
+        self.assertEqual(rp.parsed_files, [])
+
+        # modified and untracked files
+        self._write_list_swagger("2021-01-01", "foo.json", "2021-01-01", ["gadgets"])
+        new_file = self._write_list_swagger("2023-01-01", "foo.json", "2023-01-01", ["widgets"])
+        self.assertNotEqual(rp.get_fingerprint(), fingerprint)
+        rp.parsed_files = []
+        # the files are listed from git snapshot instead of walking the folder
+        with patch("swagger.model.specs._resource_provider.os.walk", side_effect=AssertionError):
+            resource_map = rp.get_resource_map(refresh=True)
+        self.assertEqual(sorted(rp.parsed_files), sorted([self.tagged_file, new_file]))
+        self.assertEqual(self._dump(resource_map), self._dump(self._build_rp().get_resource_map()))
+
+        # removed tracked files
+        os.remove(self.untagged_file)
+        rp.parsed_files = []
+        with patch("swagger.model.specs._resource_provider.os.walk", side_effect=AssertionError):
+            resource_map = rp.get_resource_map(refresh=True)
+        self.assertEqual(rp.parsed_files, [])
+        self.assertNotIn("2021-01-01", resource_map["/subscriptions/{}/providers/microsoft.foo/widgets"])
+        self.assertEqual(self._dump(resource_map), self._dump(self._build_rp().get_resource_map()))
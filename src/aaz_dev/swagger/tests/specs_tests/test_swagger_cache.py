@@ -0,0 +1,58 @@
+import os
+
+from swagger.model.specs import SwaggerLoader
+from swagger.model.specs._swagger_cache import SwaggerBodyCache
+from swagger.tests.common import TempSwaggerSpecsTestCase
+
+
+class SwaggerBodyCacheTest(TempSwaggerSpecsTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.cache_folder = self.make_temp_folder()
+        self.file_path = self.write_definitions("foo.json", {"A": {"type": "object"}})
+
+    def _load(self, cache, file_path):
+        patched = []
+
+        def _patch(body):
+            patched.append(file_path)
+            SwaggerLoader.patch_swagger(body)
+
+        return cache.load(file_path, _patch), len(patched) > 0
+
+    def test_load(self):
+        cache = SwaggerBodyCache(self.cache_folder, max_size=10)
+        body, patched = self._load(cache, self.file_path)
+        self.assertTrue(patched)
+        self.assertTrue(body["definitions"]["A"]["additionalProperties"])
+
+        body, patched = self._load(SwaggerBodyCache(self.cache_folder, max_size=10), self.file_path)
+        self.assertFalse(patched)
+        self.assertTrue(body["definitions"]["A"]["additionalProperties"])
+
+        # only the mtime changed
+        stat = os.stat(self.file_path)
+        os.utime(self.file_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1000000000))
+        _, patched = self._load(cache, self.file_path)
+        self.assertFalse(patched)
+
+        # content changed
+        self.write_definitions("foo.json", {"B": {"type": "object"}})
+        body, patched = self._load(cache, self.file_path)
+        self.assertTrue(patched)
+        self.assertIn("B", body["definitions"])
+
+    def test_evict(self):
+        definitions = {f"D{i}": {"type": "string", "description": "x" * 100} for i in range(100)}
+        file_paths = [self.write_definitions(f"foo{idx}.json", definitions) for idx in range(3)]
+        cache = SwaggerBodyCache(self.cache_folder, max_size=0)
+        for file_path in file_paths:
+            self._load(cache, file_path)
+
+        entries = [name for _, _, files in os.walk(self.cache_folder) for name in files]
+        self.assertEqual(len(entries), 1)
+        _, patched = self._load(cache, file_paths[-1])
+        self.assertFalse(patched)
+        _, patched = self._load(cache, file_paths[0])
+        self.assertTrue(patched)
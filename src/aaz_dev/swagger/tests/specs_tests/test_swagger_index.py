@@ -0,0 +1,107 @@
+import json
+import os
+
+from swagger.model.specs import SwaggerSpecsIndex
+from swagger.model.specs._swagger_index import load_swagger_summaries, parse_swagger_summary
+from swagger.tests.common import TempSwaggerSpecsTestCase
+
+
+class SwaggerSpecsIndexTest(TempSwaggerSpecsTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.index_folder = self.make_temp_folder()
+        self.rp_folder = os.path.join(self.specs_folder, "Microsoft.Foo")
+        self.file_path = self.write_file(
+            os.path.join(self.rp_folder, "stable", "2021-01-01", "foo.json"),
+            self._build_swagger("2021-01-01", ["Widgets_Get"]))
+
+    @staticmethod
+    def _build_swagger(version, op_ids):
+        return {
+            "swagger": "2.0",
+            "info": {"version": version},
+            "paths": {
+                f"/widgets/{{name{idx}}}": {"get": {"operationId": op_id}} for idx, op_id in enumerate(op_ids)
+            },
+            "definitions": {"Widget": {"type": "object"}},
+        }
+
+    def test_file_summary(self):
+        index = SwaggerSpecsIndex(self.specs_folder, self.index_folder).get_folder_index(self.rp_folder)
+        summary = index.get_file_summary(self.file_path)
+        self.assertEqual(summary["swagger"], "2.0")
+        self.assertEqual(summary["version"], "2021-01-01")
+        self.assertEqual(summary["paths"], {"/widgets/{name0}": [["get", "Widgets_Get"]]})
+        self.assertEqual(summary["x-ms-paths"], {})
+        index.save()
+        self.assertTrue(os.path.isfile(index.index_path))
+
+    def test_reuse_and_revalidate(self):
+        index = SwaggerSpecsIndex(self.specs_folder, self.index_folder).get_folder_index(self.rp_folder)
+        index.get_file_summary(self.file_path)
+        index.save()
+
+        # a new index instance reads the entries from disk
+        index = SwaggerSpecsIndex(self.specs_folder, self.index_folder).get_folder_index(self.rp_folder)
+        summary = index.get_file_summary(self.file_path)
+        self.assertEqual(summary["paths"], {"/widgets/{name0}": [["get", "Widgets_Get"]]})
+
+        # changed file is parsed again
+        self.write_file(self.file_path, self._build_swagger("2022-01-01", ["Widgets_Get", "Widgets_List"]))
+        summary = index.get_file_summary(self.file_path)
+        self.assertEqual(summary["version"], "2022-01-01")
+        self.assertEqual(len(summary["paths"]), 2)
+
+    def test_invalid_file(self):
+        self.write_file(self.file_path, "{invalid")
+        index = SwaggerSpecsIndex(self.specs_folder, self.index_folder).get_folder_index(self.rp_folder)
+        summary = index.get_file_summary(self.file_path)
+        self.assertIn("error", summary)
+
+    def test_prune(self):
+        index = SwaggerSpecsIndex(self.specs_folder, self.index_folder).get_folder_index(self.rp_folder)
+        index.get_file_summary(self.file_path)
+        index.save()
+
+        os.remove(self.file_path)
+        index = SwaggerSpecsIndex(self.specs_folder, self.index_folder).get_folder_index(self.rp_folder)
+        index.save(prune=True)
+        with open(index.index_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        self.assertEqual(data["files"], {})
+
+    def test_load_summaries_in_process_pool(self):
+        invalid_file_path = self.write_file(os.path.join(self.rp_folder, "invalid.json"), "{invalid")
+        summaries = load_swagger_summaries([self.file_path, invalid_file_path, self.file_path], workers=2)
+        self.assertEqual(len(summaries), 3)
+        self.assertEqual(summaries[0]["version"], "2021-01-01")
+        self.assertIn("error", summaries[1])
+        self.assertEqual(summaries[0], summaries[2])
+
+    def test_skim_summary(self):
+        self.write_file(self.file_path, """{
+            "definitions": {"A": {"description": "} ] \\" {[", "enum": [[], {}]}},
+            "swagger": "2.0",
+            "paths": {
+                "/a": {"parameters": [{"$ref": "#/parameters/P"}], "get": {"operationId": "A_Get", "responses": {}}},
+                "/b": {"put": {"x": 1}, "get": {"operationId": "B_Get"}, "put": {"operationId": "B_Put"}}
+            },
+            "info": {"title": "foo", "version": "2021-01-01"},
+            "x-ms-paths": {"/c?op=d": {"post": {"operationId": "C_D"}}}
+        }""")
+        summary = parse_swagger_summary(self.file_path)
+        self.assertEqual(summary, {
+            "swagger": "2.0",
+            "version": "2021-01-01",
+            "paths": {
+                "/a": [["get", "A_Get"]],
+                "/b": [["put", "B_Put"], ["get", "B_Get"]],
+            },
+            "x-ms-paths": {"/c?op=d": [["post", "C_D"]]},
+        })
+
+        for content in ("", "[]", '{"paths": {"/a": {}}', '{"definitions": {"A": "}', "{} {}"):
+            self.write_file(self.file_path, content)
+            with self.assertRaises(ValueError):
+                parse_swagger_summary(self.file_path)
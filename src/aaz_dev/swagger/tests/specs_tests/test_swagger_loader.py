@@ -1,7 +1,12 @@
-from swagger.tests.common import SwaggerSpecsTestCase
+from swagger.tests.common import SwaggerSpecsTestCase, TempSwaggerSpecsTestCase
 from swagger.model.specs import SwaggerLoader
 from swagger.utils import exceptions
+from unittest.mock import patch
+from utils import profiler
+from utils.config import Config
 import json
+import os
+import sys
 
 
 class SwaggerLoaderTest(SwaggerSpecsTestCase):
@@ -47,3 +52,325 @@ class SwaggerLoaderTest(SwaggerSpecsTestCase):
                     except Exception:
                         print(file_path)
                         raise
+
+
+class SwaggerLoaderLinkTest(TempSwaggerSpecsTestCase):
+
+    def test_link_deep_reference_chain(self):
+        depth = sys.getrecursionlimit() * 2
+        definitions = {f"D{idx}": {"$ref": f"#/definitions/D{idx + 1}"} for idx in range(depth)}
+        definitions[f"D{depth}"] = {"$ref": "common.json#/definitions/Resource"}
+        file_path = self.write_file("main.json", {
+            "swagger": "2.0",
+            "info": {"title": "main", "version": "2021-01-01"},
+            "paths": {
+                "/resources/{name}": {
+                    "get": {
+                        "operationId": "Resources_Get",
+                        "parameters": [{"$ref": "common.json#/parameters/NameParameter"}],
+                        "responses": {"200": {"description": "OK", "schema": {"$ref": "#/definitions/D0"}}},
+                    }
+                }
+            },
+            "definitions": definitions,
+        })
+        self.write_file("common.json", {
+            "swagger": "2.0",
+            "info": {"title": "common", "version": "2021-01-01"},
+            "paths": {},
+            "parameters": {
+                "NameParameter": {"name": "name", "in": "path", "required": True, "type": "string"},
+            },
+            "definitions": {
+                "Resource": {"type": "object", "readOnly": True, "properties": {"id": {"type": "string"}}},
+            },
+        })
+
+        loader = SwaggerLoader()
+        loader.load_file(file_path)
+        loader.link_swaggers()
+
+        self.assertEqual(loader.files_loaded, 2)
+        self.assertEqual(len(loader.loaded_swaggers), 2)
+        swagger = loader.get_loaded(file_path)
+        self.assertTrue(swagger.definitions["D0"].read_only)
+        self.assertTrue(loader.refs_resolved >= depth)
+
+        # resolved references are reused
+        cache_hits = loader.cache_hits
+        loader.load_ref("#/definitions/D0", file_path, "paths")
+        self.assertEqual(loader.cache_hits, cache_hits + 1)
+
+    def test_link_pruned(self):
+        file_path = self.write_file("main.json", {
+            "swagger": "2.0",
+            "info": {"title": "main", "version": "2021-01-01"},
+            "paths": {
+                "/pets/{name}": {
+                    "get": {
+                        "operationId": "Pets_Get",
+                        "responses": {"200": {"description": "OK", "schema": {"$ref": "#/definitions/Pet"}}},
+                    }
+                },
+                "/others/{name}": {
+                    "get": {
+                        "operationId": "Others_Get",
+                        "responses": {"200": {"description": "OK", "schema": {"$ref": "others.json#/definitions/Other"}}},
+                    }
+                },
+            },
+            "definitions": {
+                "Pet": {
+                    "type": "object",
+                    "discriminator": "kind",
+                    "required": ["kind"],
+                    "properties": {"kind": {"type": "string"}, "id": {"type": "string", "readOnly": True}},
+                },
+                "Cat": {"type": "object", "allOf": [{"$ref": "#/definitions/Pet"}]},
+                "Unused": {"type": "object", "properties": {"broken": {"$ref": "#/definitions/Missing"}}},
+            },
+        })
+        self.write_file("others.json", {
+            "swagger": "2.0",
+            "info": {"title": "others", "version": "2021-01-01"},
+            "paths": {},
+            "definitions": {
+                "Dog": {"type": "object", "allOf": [{"$ref": "main.json#/definitions/Pet"}]},
+                "Other": {"type": "object", "properties": {"pet": {"$ref": "main.json#/definitions/Pet"}}},
+            },
+        })
+
+        full_loader = SwaggerLoader()
+        full_loader.load_file(file_path)
+        with self.assertRaises(exceptions.InvalidSwaggerValueError):
+            full_loader.link_swaggers()
+
+        loader = SwaggerLoader(pruned=True)
+        loader.load_paths(file_path, ["/pets/{name}"])
+        loader.link_swaggers()
+
+        swagger = loader.get_loaded(file_path)
+        self.assertEqual([*swagger.paths], ["/pets/{name}"])
+        self.assertEqual(sorted(swagger.definitions), ["Cat", "Pet"])
+        # discriminator children in loaded files are registered in the order of linking whole files
+        pet = swagger.definitions["Pet"]
+        self.assertEqual([*pet.disc_children], ["Cat", "Dog"])
+        self.assertEqual(pet.resource_id_templates, {"/pets/{}"})
+        self.assertEqual(sorted(loader.get_loaded(os.path.join(self.specs_folder, "others.json")).definitions), ["Dog"])
+
+    def test_prefetch_referenced_files(self):
+        file_path = self.write_file("main.json", {
+            "swagger": "2.0",
+            "info": {"title": "main", "version": "2021-01-01"},
+            "paths": {
+                "/resources/{name}": {
+                    "get": {
+                        "operationId": "Resources_Get",
+                        "parameters": [{"$ref": "./common/types.json#/parameters/NameParameter"}],
+                        "responses": {"200": {"description": "OK", "schema": {"$ref": "#/definitions/Resource"}}},
+                        "x-ms-examples": {"Get": {"$ref": "./examples/Get.json"}},
+                    }
+                }
+            },
+            "definitions": {
+                "Resource": {"type": "object", "properties": {"error": {"$ref": "common/errors.json#/definitions/E"}}},
+            },
+        })
+        self.write_file(os.path.join("common", "types.json"), {
+            "swagger": "2.0",
+            "info": {"title": "types", "version": "2021-01-01"},
+            "paths": {},
+            "parameters": {
+                "NameParameter": {"name": "name", "in": "path", "required": True, "type": "string"},
+            },
+            "definitions": {
+                "Unused": {"type": "object", "properties": {"e": {"$ref": "../common/errors.json#/definitions/E"}}},
+            },
+        })
+        self.write_file(os.path.join("common", "errors.json"), {
+            "swagger": "2.0",
+            "info": {"title": "errors", "version": "2021-01-01"},
+            "paths": {},
+            "definitions": {"E": {"type": "object", "properties": {"code": {"type": "string"}}}},
+        })
+        types_path = os.path.join(self.specs_folder, "common", "types.json")
+        errors_path = os.path.join(self.specs_folder, "common", "errors.json")
+
+        graph = SwaggerLoader.build_dependency_graph([file_path], workers=2)
+        self.assertEqual(graph.get_transitive_files([file_path]), [file_path, types_path, errors_path])
+        self.assertEqual(graph.files[file_path], [types_path, errors_path])
+        self.assertEqual(graph.get_referrers(errors_path), [file_path, types_path])
+
+        loader = SwaggerLoader()
+        loader.prefetch_files([file_path], workers=2)
+        self.assertEqual(loader.files_prefetched, 3)
+        loader.load_file(file_path)
+        loader.link_swaggers()
+        self.assertEqual(len(loader.loaded_swaggers), 3)
+        self.assertEqual(loader._prefetched, {})
+        swagger = loader.get_loaded(file_path)
+        self.assertEqual(swagger.paths["/resources/{name}"].get.parameters[0].name, "name")
+        self.assertIs(
+            swagger.definitions["Resource"].properties["error"].ref_instance,
+            loader.get_loaded(errors_path).definitions["E"])
+
+    def test_evict_link_groups(self):
+        a_path = self.write_definitions("a.json", {"A": {"$ref": "c.json#/definitions/C"}})
+        b_path = self.write_definitions("b.json", {"B": {"type": "object"}})
+        c_path = self.write_definitions("c.json", {"C": {"type": "string"}})
+
+        loader = SwaggerLoader(max_size=1 / 1024 / 1024)
+        loader.acquire([a_path])
+        loader.load_file(a_path)
+        loader.link_swaggers()
+        # the files in the group of acquired file are kept
+        self.assertEqual(loader.get_stats()["residentFiles"], 2)
+        self.assertEqual(loader.evictions, 0)
+
+        loader.release([a_path])
+        self.assertEqual(loader.evictions, 2)
+        self.assertEqual(loader.resident_bytes, 0)
+        self.assertIsNone(loader.get_loaded(c_path))
+        self.assertEqual(len(loader.loaded_swaggers), 0)
+
+        # the least recently used groups are evicted first
+        loader.max_size = os.path.getsize(b_path) + 1
+        loader.load_file(a_path)
+        loader.load_file(b_path)
+        loader.link_swaggers()
+        self.assertEqual([*loader.loaded_swaggers], [b_path])
+        self.assertEqual(loader.evictions, 4)
+
+        # the evicted files are loaded again
+        loader.acquire([a_path])
+        swagger = loader.load_file(a_path)
+        loader.link_swaggers()
+        self.assertIs(swagger.definitions["A"].ref_instance, loader.get_loaded(c_path).definitions["C"])
+        stats = loader.get_stats()
+        self.assertEqual(stats["pinnedFiles"], 1)
+        self.assertEqual(stats["filesLoaded"], 7)
+        self.assertEqual(stats["fileReloads"], 4)
+
+    def test_profile_spans(self):
+        file_path = self.write_file("main.json", {
+            "swagger": "2.0",
+            "info": {"title": "main", "version": "2021-01-01"},
+            "paths": {},
+            "definitions": {"A": {"$ref": "others.json#/definitions/B"}},
+        })
+        self.write_file("others.json", {
+            "swagger": "2.0",
+            "info": {"title": "others", "version": "2021-01-01"},
+            "paths": {},
+            "definitions": {"B": {"type": "string"}},
+        })
+        trace_file = os.path.join(self.specs_folder, "profile", "trace.json")
+
+        with patch.object(Config, "PROFILE_ENABLED", False):
+            self.assertIs(profiler.span("root"), profiler.span("others"))
+
+        with patch.object(Config, "PROFILE_ENABLED", True), patch.object(Config, "PROFILE_TRACE_FILE", trace_file):
+            with self.assertLogs('backend', level='INFO') as logs:
+                with profiler.span("root", version="2021-01-01"):
+                    loader = SwaggerLoader()
+                    with profiler.span("load_resources", resource="main"):
+                        loader.load_file(file_path)
+                    loader.link_swaggers()
+        report = logs.output[0].split('\n')
+        self.assertIn("Profile: root version=2021-01-01", report[0])
+        # the phases are reported in total and under the resources enclosing them
+        self.assertTrue(any(line.startswith("\tload_file: ") and line.endswith(" in 2 spans") for line in report))
+        idx = [idx for idx, line in enumerate(report) if line.startswith("\tload_resources resource=main ")][0]
+        self.assertTrue(report[idx + 1].startswith("\t\tload_file: "))
+        self.assertTrue(report[idx + 1].endswith(" in 1 spans"))
+        self.assertEqual(len(report), idx + 2)
+
+        with open(trace_file, 'r', encoding='utf-8') as f:
+            content = f.read()
+        self.assertTrue(content.startswith("[\n"))
+        # the trace array is left open for appending, which is accepted by the trace viewers
+        events = json.loads(content.rstrip().rstrip(',') + "]")
+        self.assertEqual(events[0]["name"], "root")
+        self.assertEqual(events[0]["args"], {"version": "2021-01-01"})
+        names = [event["name"] for event in events[1:]]
+        self.assertEqual(names.count("load_file"), 2)
+        self.assertEqual(names.count("link_swaggers"), 1)
+        for event in events:
+            self.assertEqual(event["ph"], "X")
+            self.assertGreaterEqual(event["dur"], 0)
+
+        # the trace file without directory is written into the working directory
+        cwd = os.getcwd()
+        os.chdir(self.specs_folder)
+        try:
+            with patch.object(Config, "PROFILE_ENABLED", True), \
+                    patch.object(Config, "PROFILE_TRACE_FILE", "trace_rel.json"):
+                with self.assertLogs('backend', level='INFO'):
+                    with profiler.span("root"):
+                        pass
+        finally:
+            os.chdir(cwd)
+        self.assertTrue(os.path.isfile(os.path.join(self.specs_folder, "trace_rel.json")))
+
+    def test_link_deferred_examples(self):
+        file_path = self.write_file("main.json", {
+            "swagger": "2.0",
+            "info": {"title": "main", "version": "2021-01-01"},
+            "paths": {
+                "/resources/{name}": {
+                    "get": {
+                        "operationId": "Resources_Get",
+                        "responses": {"200": {"description": "OK"}},
+                        "x-ms-examples": {
+                            "Get": {"$ref": "./examples/Get.json"},
+                            "GetAll": {"$ref": "./examples/GetAll.json"},
+                            "Missing": {"$ref": "./examples/Missing.json"},
+                        },
+                    }
+                }
+            },
+        })
+        self.write_file(os.path.join("examples", "Get.json"), {"parameters": {"name": "a"}})
+        self.write_file(os.path.join("examples", "GetAll.json"), {"parameters": {"name": "b"}})
+
+        loader = SwaggerLoader(defer_examples=True)
+        swagger = loader.load_file(file_path)
+        loader.link_swaggers()
+        operation = swagger.paths["/resources/{name}"].get
+        self.assertEqual(loader.files_loaded, 1)
+        self.assertFalse(operation.x_ms_examples["Get"].is_linked())
+
+        loader.link_examples([operation], workers=2)
+        self.assertEqual(loader.files_loaded, 3)
+        self.assertEqual(operation.x_ms_examples["Get"].ref_instance, {"parameters": {"name": "a"}})
+        self.assertEqual(operation.x_ms_examples["GetAll"].ref_instance, {"parameters": {"name": "b"}})
+        # the missing example file is skipped
+        self.assertIsNone(operation.x_ms_examples["Missing"].ref_instance)
+        self.assertTrue(operation.x_ms_examples["Missing"].is_linked())
+
+        # the examples are linked by linking swaggers without deferred mode
+        loader = SwaggerLoader()
+        swagger = loader.load_file(file_path)
+        loader.link_swaggers()
+        self.assertEqual(loader.files_loaded, 3)
+        self.assertEqual(
+            swagger.paths["/resources/{name}"].get.x_ms_examples["Get"].ref_instance, {"parameters": {"name": "a"}})
+
+
+class SwaggerLoaderPrunedGenerationTest(TempSwaggerSpecsTestCase):
+
+    def test_generate_pruned_command_groups(self):
+        from swagger.controller.command_generator import SwaggerCommandGenerator
+        self.write_sample_swaggers()
+        resources = self.get_sample_resources()
+
+        self.patch_config(SWAGGER_PRUNED_LOADING=False)
+        expected = self.generate_command_groups(resources)
+
+        self.patch_config(SWAGGER_PRUNED_LOADING=True)
+        generator = SwaggerCommandGenerator()
+        self.assertTrue(generator.loader.pruned)
+        self.assertEqual(self.generate_command_groups(resources, generator=generator), expected)
+        # the resources are generated with the parts of files they reach only
+        for resource, command_group in zip(resources, expected):
+            self.assertEqual(self.generate_command_groups([resource]), [command_group])
@@ -0,0 +1,170 @@
+from unittest.mock import patch
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from swagger.controller.command_generator import SwaggerCommandGenerator
+from swagger.controller.example_generator import ExampleGenerator
+from swagger.model.specs import SwaggerModelPool
+from swagger.tests.common import TempSwaggerSpecsTestCase
+from utils.config import Config
+
+
+class SwaggerModelPoolTest(TempSwaggerSpecsTestCase):
+
+    def test_share_linked_models(self):
+        a_path = self.write_definitions("a.json", {"A": {"$ref": "c.json#/definitions/C"}})
+        b_path = self.write_definitions("b.json", {"B": {"type": "object"}})
+        c_path = self.write_definitions("c.json", {"C": {"type": "string"}})
+
+        pool = SwaggerModelPool()
+        loader = pool.borrow([a_path, a_path])
+        self.assertIs(pool.borrow([a_path]), loader)
+        self.assertEqual(sorted(loader.get_loaded_files()), [a_path, c_path])
+        self.assertIs(
+            loader.get_loaded(a_path).definitions["A"].ref_instance, loader.get_loaded(c_path).definitions["C"])
+        # the models linked with different files are not shared
+        ab_loader = pool.borrow([a_path, b_path])
+        self.assertIsNot(ab_loader, loader)
+        stats = pool.get_stats()
+        self.assertEqual(stats["builds"], 2)
+        self.assertEqual(stats["hits"], 1)
+        self.assertEqual(stats["borrowedEntries"], 2)
+
+        # the loader is rebuilt when a referenced file is changed
+        self.write_definitions("c.json", {"C": {"type": "integer"}})
+        new_loader = pool.borrow([a_path])
+        self.assertIsNot(new_loader, loader)
+        self.assertEqual(new_loader.get_loaded(c_path).definitions["C"].type, "integer")
+        # the stale loader is still usable by its borrowers
+        self.assertEqual(loader.get_loaded(c_path).definitions["C"].type, "string")
+
+        for borrowed in (loader, loader, new_loader):
+            pool.give_back(borrowed)
+        with patch.object(Config, "SWAGGER_MODEL_POOL_SIZE", 1):
+            pool.give_back(pool.borrow([b_path]))
+            # only the borrowed entry is kept
+            self.assertEqual(pool.get_stats()["entries"], 1)
+        pool.clear()
+        self.assertEqual(pool.get_stats()["entries"], 1)
+        pool.give_back(ab_loader)
+        pool.clear()
+        self.assertEqual(pool.get_stats()["entries"], 0)
+
+    def test_generators_borrow_from_shared_pool(self):
+        a_path = self.write_definitions("a.json", {"A": {"type": "object"}})
+
+        class _Resource:
+            file_path = a_path
+            path = "/a"
+
+        resources = [_Resource()]
+        with patch.object(Config, "SWAGGER_MODEL_POOL_SIZE", 8), \
+                patch.object(Config, "SWAGGER_PRUNED_LOADING", False), \
+                patch.object(SwaggerModelPool, "_instance", SwaggerModelPool()):
+            command_generator = SwaggerCommandGenerator()
+            example_generator = ExampleGenerator()
+            command_generator.load_resources(resources)
+            example_generator.load_examples(resources)
+            self.assertIs(command_generator.loader, example_generator.loader)
+            self.assertEqual(SwaggerModelPool.shared().get_stats()["builds"], 1)
+
+            example_generator.release_examples(resources)
+            command_generator.release_resources(resources)
+            self.assertIs(command_generator.loader, command_generator._own_loader)
+            self.assertEqual(SwaggerModelPool.shared().get_stats()["borrowedEntries"], 0)
+
+    def test_link_examples_of_borrowed_loader(self):
+        file_path = self.write_file("main.json", {
+            "swagger": "2.0",
+            "info": {"title": "main", "version": "2021-01-01"},
+            "paths": {
+                "/widgets": {
+                    "get": {
+                        "operationId": "Widgets_List",
+                        "responses": {"200": {"description": "OK"}},
+                        "x-ms-examples": {
+                            "List": {"$ref": "./examples/list.json"},
+                            "ListAll": {"$ref": "./examples/list_all.json"},
+                        },
+                    }
+                }
+            },
+        })
+        for name in ("list.json", "list_all.json"):
+            self.write_file(os.path.join("examples", name), {"parameters": {"name": name}})
+        example_path = os.path.join(self.specs_folder, "examples", "list.json")
+
+        class _Resource:
+            path = "/widgets"
+
+        _Resource.file_path = file_path
+        resources = [_Resource()]
+        with patch.object(Config, "SWAGGER_MODEL_POOL_SIZE", 8), \
+                patch.object(Config, "SWAGGER_PRUNED_LOADING", False), \
+                patch.object(SwaggerModelPool, "_instance", SwaggerModelPool()):
+            command_generator = SwaggerCommandGenerator()
+            command_generator.load_resources(resources)
+            loader = command_generator.loader
+            self.assertTrue(loader.defer_examples)
+            # the example files are not loaded for command generation
+            self.assertIsNone(loader.get_loaded(example_path))
+            operation = loader.get_loaded(file_path).paths["/widgets"].get
+            self.assertFalse(operation.x_ms_examples["List"].is_linked())
+
+            example_generator = ExampleGenerator()
+            example_generator.load_examples(resources)
+            self.assertIs(example_generator.loader, loader)
+            self.assertEqual(operation.x_ms_examples["List"].ref_instance, {"parameters": {"name": "list.json"}})
+            self.assertEqual(
+                operation.x_ms_examples["ListAll"].ref_instance, {"parameters": {"name": "list_all.json"}})
+            files_loaded = loader.files_loaded
+            example_generator.release_examples(resources)
+
+            # the linked examples are reused by the other borrowers
+            example_generator = ExampleGenerator()
+            example_generator.load_examples(resources)
+            self.assertIs(example_generator.loader, loader)
+            self.assertEqual(loader.files_loaded, files_loaded)
+            example_generator.release_examples(resources)
+            command_generator.release_resources(resources)
+
+            # the entry is rebuilt when an example file is changed
+            self.write_file(example_path, {"parameters": {"name": "changed"}})
+            example_generator = ExampleGenerator()
+            example_generator.load_examples(resources)
+            self.assertIsNot(example_generator.loader, loader)
+            operation = example_generator.loader.get_loaded(file_path).paths["/widgets"].get
+            self.assertEqual(operation.x_ms_examples["List"].ref_instance, {"parameters": {"name": "changed"}})
+            example_generator.release_examples(resources)
+            self.assertEqual(SwaggerModelPool.shared().get_stats()["borrowedEntries"], 0)
+
+
+class SwaggerModelPoolGenerationTest(TempSwaggerSpecsTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.write_sample_swaggers()
+        self.patch_config(SWAGGER_PRUNED_LOADING=False)
+
+    def test_disabled_by_default(self):
+        self.assertEqual(Config.SWAGGER_MODEL_POOL_SIZE, 0)
+        self.assertFalse(SwaggerModelPool.is_enabled())
+
+    def test_workspaces_generate_concurrently_from_borrowed_loader(self):
+        resources = self.get_sample_resources()
+        self.patch_config(SWAGGER_MODEL_POOL_SIZE=0)
+        expected = self.generate_command_groups(resources)
+
+        pool = SwaggerModelPool()
+        self.patch_config(SWAGGER_MODEL_POOL_SIZE=8)
+        with patch.object(SwaggerModelPool, "_instance", pool):
+            # every workspace has its own generator, which borrows the same loader from the pool
+            with ThreadPoolExecutor(max_workers=4) as executor:
+                results = [*executor.map(lambda _: self.generate_command_groups(resources), range(8))]
+            for result in results:
+                self.assertEqual(result, expected)
+            self.assertEqual(pool.get_stats()["builds"], 1)
+            self.assertEqual(pool.get_stats()["hits"], 7)
+            # the shared models are not modified by the borrowers
+            self.assertEqual(self.generate_command_groups(resources), expected)
+            self.assertEqual(pool.get_stats()["borrowedEntries"], 0)
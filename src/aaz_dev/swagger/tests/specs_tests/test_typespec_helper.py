@@ -0,0 +1,65 @@
+import os
+from unittest.mock import patch
+
+from swagger.model.specs import TypeSpecHelper
+from swagger.tests.common import TempSwaggerSpecsTestCase
+from utils.config import Config
+
+
+class TypeSpecHelperTest(TempSwaggerSpecsTestCase):
+
+    def setUp(self):
+        super().setUp()
+        TypeSpecHelper.clear_cache()
+        self.addCleanup(TypeSpecHelper.clear_cache)
+        self.mgmt_ts_path = self._write_entry(os.path.join("foo", "Foo.Management"), "Microsoft.Foo", True)
+        self.data_ts_path = self._write_entry(os.path.join("foo", "Foo.Data"), "Foo.Data", False)
+        self.top_ts_path = self._write_entry("bar", "Microsoft.Bar", True)
+
+    def _write_entry(self, folder, namespace, is_mgmt_plane):
+        content = f"namespace {namespace};\n"
+        if is_mgmt_plane:
+            content = "@armProviderNamespace\n" + content
+        self.write_file(os.path.join(folder, "tspconfig.yaml"), "emit: []\n")
+        return self.write_file(os.path.join(folder, "main.tsp"), content)
+
+    def test_find_entry_files(self):
+        TypeSpecHelper.discover_entry_files(self.specs_folder)
+        foo_folder = os.path.join(self.specs_folder, "foo")
+        self.assertEqual(
+            [(namespace, ts_path) for namespace, ts_path, _ in TypeSpecHelper.find_mgmt_plane_entry_files(foo_folder)],
+            [("Microsoft.Foo", self.mgmt_ts_path)])
+        self.assertEqual(
+            [(namespace, ts_path) for namespace, ts_path, _ in TypeSpecHelper.find_data_plane_entry_files(foo_folder)],
+            [("Foo.Data", self.data_ts_path)])
+        # the entry file in the top folder is found once
+        bar_folder = os.path.join(self.specs_folder, "bar")
+        self.assertEqual(len(TypeSpecHelper.find_mgmt_plane_entry_files(bar_folder)), 1)
+        self.assertEqual(TypeSpecHelper.find_data_plane_entry_files(bar_folder), [])
+
+    def test_reparse_changed_main_tsp(self):
+        foo_folder = os.path.join(self.specs_folder, "foo")
+        self.assertEqual(len(TypeSpecHelper.find_data_plane_entry_files(foo_folder)), 1)
+
+        self._write_entry(os.path.join("foo", "Foo.Data"), "Microsoft.FooData", True)
+        self.assertEqual(TypeSpecHelper.find_data_plane_entry_files(foo_folder), [])
+        self.assertEqual(
+            sorted(namespace for namespace, _, _ in TypeSpecHelper.find_mgmt_plane_entry_files(foo_folder)),
+            ["Microsoft.Foo", "Microsoft.FooData"])
+
+    def test_discover_changed_folders(self):
+        foo_folder = os.path.join(self.specs_folder, "foo")
+        TypeSpecHelper.discover_entry_files(self.specs_folder)
+        self.assertEqual(len(TypeSpecHelper.find_mgmt_plane_entry_files(foo_folder)), 1)
+
+        new_ts_path = self._write_entry(os.path.join("foo", "Foo.New"), "Microsoft.FooNew", True)
+        stat = os.stat(foo_folder)
+        os.utime(foo_folder, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1000000000))
+        # the folders are not checked again within the poll interval
+        with patch.object(Config, "SWAGGER_SPECS_POLL_INTERVAL", 3600):
+            self.assertEqual(len(TypeSpecHelper.find_mgmt_plane_entry_files(foo_folder)), 1)
+        self.assertEqual(
+            sorted(ts_path for _, ts_path, _ in TypeSpecHelper.find_mgmt_plane_entry_files(foo_folder)),
+            sorted([self.mgmt_ts_path, new_ts_path]))
+        # the entry files of the other folders are kept
+        self.assertEqual(len(TypeSpecHelper.find_mgmt_plane_entry_files(os.path.join(self.specs_folder, "bar"))), 1)
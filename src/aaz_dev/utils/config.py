@@ -25,6 +25,53 @@ class Config:
         os.environ.get("AAZ_DEV_WORKSPACE_FOLDER", os.path.join(AAZ_DEV_FOLDER, "workspaces"))
     )
 
+    # persistent index of swagger files, used to skip parsing unchanged files when discovering resources
+    SWAGGER_INDEX_ENABLED = os.environ.get("AAZ_SWAGGER_INDEX", "true").lower() not in ("false", "0", "no", "off")
+
+    # number of processes to parse swagger files when building resource maps, 0 to use all the cpus
+    SWAGGER_SCAN_WORKERS = int(os.environ.get("AAZ_SWAGGER_SCAN_WORKERS", 1)) or os.cpu_count() or 1
+
+    # minimal seconds between two checks of the swagger files changes of a resource provider, negative to disable.
+    # the files are checked in requests, use the refresh api of specs to reload the changed files immediately
+    SWAGGER_SPECS_POLL_INTERVAL = float(os.environ.get("AAZ_SWAGGER_POLL_INTERVAL", 60))
+
+    # cache of parsed and patched swagger bodies under AAZ_DEV_FOLDER, and its max size in MB
+    SWAGGER_CACHE_ENABLED = os.environ.get("AAZ_SWAGGER_CACHE", "true").lower() not in ("false", "0", "no", "off")
+    SWAGGER_CACHE_MAX_SIZE = float(os.environ.get("AAZ_SWAGGER_CACHE_MAX_SIZE", 1024))
+
+    # max size in MB of the swagger files kept loaded by a swagger loader, 0 for unlimited
+    SWAGGER_LOADER_MAX_SIZE = float(os.environ.get("AAZ_SWAGGER_LOADER_MAX_SIZE", 0))
+
+    # number of linked swagger models of different files shared by the generators of all workspaces, 0 to disable.
+    # the pool is opt-in, the loaders built by it keep the whole files loaded instead of bounding them
+    SWAGGER_MODEL_POOL_SIZE = int(os.environ.get("AAZ_SWAGGER_MODEL_POOL_SIZE", 0))
+
+    # number of processes to generate the draft commands of the resources added together, 0 to use all the cpus
+    COMMAND_GENERATION_WORKERS = int(os.environ.get("AAZ_COMMAND_GENERATION_WORKERS", 1)) or os.cpu_count() or 1
+
+    # number of threads to read the swagger files referenced by the selected resources before linking, 1 to disable
+    SWAGGER_PREFETCH_WORKERS = int(os.environ.get("AAZ_SWAGGER_PREFETCH_WORKERS", 4))
+
+    # only load the parts of swagger files reachable from the selected resources when generating commands
+    SWAGGER_PRUNED_LOADING = os.environ.get("AAZ_SWAGGER_PRUNED_LOADING", "false").lower() in ("true", "1", "yes", "on")
+
+    # merge the cls definitions of a command generation with the same structure, which changes the cls names in cfgs
+    CLS_STRUCTURAL_SHARING = os.environ.get("AAZ_CLS_STRUCTURAL_SHARING", "false").lower() in ("true", "1", "yes", "on")
+
+    # convert the swagger schemas shared by the operations of a resource once, such as the resource model in the
+    # responses of get, put and patch operations
+    CMD_SCHEMA_CACHE = os.environ.get("AAZ_CMD_SCHEMA_CACHE", "false").lower() in ("true", "1", "yes", "on")
+
+    # detect the changed files of swagger and aaz folders by git commands instead of checking every file by os.stat
+    GIT_CHANGE_DETECTION = os.environ.get("AAZ_GIT_CHANGE_DETECTION", "false").lower() in ("true", "1", "yes", "on")
+
+    # time the phases of command generation, report them by logger and append them into the trace file
+    PROFILE_ENABLED = os.environ.get("AAZ_PROFILE", "false").lower() in ("true", "1", "yes", "on")
+    PROFILE_TRACE_FILE = os.environ.get("AAZ_PROFILE_TRACE_FILE", None)
+
+    # optional json file to keep the inflected words across processes
+    INFLECTION_WORD_TABLE = os.environ.get("AAZ_INFLECTION_WORD_TABLE", None)
+
     # Flask configurations
     HOST = os.environ.get("AAZ_HOST", '127.0.0.1')
     PORT = int(os.environ.get("AAZ_PORT", 5000))
@@ -88,6 +135,42 @@ class Config:
         cls.DEFAULT_RESOURCE_PROVIDER = value
         return cls.DEFAULT_RESOURCE_PROVIDER
 
+    @classmethod
+    def validate_and_setup_swagger_scan_workers(cls, ctx, param, value):
+        if value < 0:
+            raise ValueError(f"Invalid workers number: {value}")
+        cls.SWAGGER_SCAN_WORKERS = value or os.cpu_count() or 1
+        return cls.SWAGGER_SCAN_WORKERS
+
+    @classmethod
+    def validate_and_setup_command_generation_workers(cls, ctx, param, value):
+        if value < 0:
+            raise ValueError(f"Invalid workers number: {value}")
+        cls.COMMAND_GENERATION_WORKERS = value or os.cpu_count() or 1
+        return cls.COMMAND_GENERATION_WORKERS
+
+    @classmethod
+    def validate_and_setup_profile(cls, ctx, param, value):
+        if value:
+            cls.PROFILE_ENABLED = True
+        return cls.PROFILE_ENABLED
+
+    @classmethod
+    def validate_and_setup_swagger_pruned_loading(cls, ctx, param, value):
+        cls.SWAGGER_PRUNED_LOADING = value
+        return cls.SWAGGER_PRUNED_LOADING
+
+    @classmethod
+    def validate_and_setup_no_swagger_cache(cls, ctx, param, value):
+        if value:
+            cls.SWAGGER_CACHE_ENABLED = False
+        return not cls.SWAGGER_CACHE_ENABLED
+
+    @classmethod
+    def validate_and_setup_git_change_detection(cls, ctx, param, value):
+        cls.GIT_CHANGE_DETECTION = value
+        return cls.GIT_CHANGE_DETECTION
+
     @classmethod
     def validate_and_setup_cli_path(cls, ctx, param, value):
         # TODO: verify folder structure
@@ -115,6 +198,18 @@ class Config:
                 raise ValueError(f"Path '{cls.AAZ_DEV_WORKSPACE_FOLDER}' is not a folder.")
         return cls.AAZ_DEV_WORKSPACE_FOLDER
     
+    @classmethod
+    def get_swagger_index_folder(cls):
+        return os.path.join(cls.AAZ_DEV_FOLDER, "swagger_index")
+
+    @classmethod
+    def get_swagger_cache_folder(cls):
+        return os.path.join(cls.AAZ_DEV_FOLDER, "swagger_cache")
+
+    @classmethod
+    def get_profile_trace_file(cls):
+        return cls.PROFILE_TRACE_FILE or os.path.join(cls.AAZ_DEV_FOLDER, "profile", "trace.json")
+
     @classmethod
     def get_swagger_root(cls):
         if cls.SWAGGER_PATH:
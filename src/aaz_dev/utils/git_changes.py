@@ -0,0 +1,155 @@
+import bisect
+import logging
+import os
+import subprocess
+import threading
+import time
+
+from utils.config import Config
+
+logger = logging.getLogger('backend')
+
+
+class GitSnapshot:
+    """The state of the files in a git checkout, read by a few git commands instead of `os.stat` every file.
+
+    The fingerprint of a file is its blob hash in git index if the file in working tree is the same, else None, then
+    the callers should fall back to `os.stat`.
+    """
+
+    def __init__(self, folder, head, blobs, dirty):
+        self.folder = folder
+        self.head = head
+        self._blobs = blobs
+        self._dirty = dirty
+        self._file_paths = sorted({*blobs.keys(), *dirty})
+
+    def get_fingerprint(self, file_path):
+        file_path = os.path.abspath(file_path)
+        if file_path in self._dirty:
+            return None
+        return self._blobs.get(file_path, None)
+
+    def contains(self, file_path):
+        return os.path.abspath(file_path).startswith(os.path.join(self.folder, ''))
+
+    def iter_files(self, folder):
+        """Iterate the tracked and untracked files under the folder in path order. Removed files are included."""
+        prefix = os.path.join(os.path.abspath(folder), '')
+        idx = bisect.bisect_left(self._file_paths, prefix)
+        while idx < len(self._file_paths) and self._file_paths[idx].startswith(prefix):
+            yield self._file_paths[idx]
+            idx += 1
+
+
+class GitChangeSource:
+    """Read the changed files of a folder in git checkout.
+
+    It runs `git ls-files -s` for the blob hashes of tracked files, `git diff --name-only` for the files changed in
+    working tree and `git ls-files --others` for untracked files. Nothing is fetched from remote.
+    """
+
+    _sources = {}
+    _sources_lock = threading.Lock()
+
+    @classmethod
+    def shared(cls, folder):
+        folder = os.path.abspath(folder)
+        with cls._sources_lock:
+            if folder not in cls._sources:
+                cls._sources[folder] = cls(folder)
+            return cls._sources[folder]
+
+    @classmethod
+    def expire_snapshots(cls):
+        """Drop the snapshots of all the folders, so that they are read again by the next `snapshot`."""
+        with cls._sources_lock:
+            sources = [*cls._sources.values()]
+        for source in sources:
+            with source._lock:
+                source._snapshot = None
+
+    def __init__(self, folder):
+        self.folder = os.path.abspath(folder)
+        self._available = None
+        self._snapshot = None
+        self._snapshot_at = None
+        self._lock = threading.Lock()
+
+    def _git(self, *args):
+        result = subprocess.run(
+            ['git', '-C', self.folder, *args],
+            stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=True
+        )
+        return result.stdout.decode('utf-8', errors='surrogateescape')
+
+    def _to_path(self, relative_path):
+        return os.path.join(self.folder, *relative_path.split('/'))
+
+    def snapshot(self, max_age=0):
+        """Return the snapshot of the folder, which is reused for `max_age` seconds. Return None if the folder is not
+        in a git checkout or git is not available."""
+        with self._lock:
+            if self._available is False:
+                return None
+            now = time.monotonic()
+            if self._snapshot is not None and now - self._snapshot_at <= max_age:
+                return self._snapshot
+            try:
+                head = self._git('rev-parse', '--verify', '--quiet', 'HEAD').strip() or None
+            except (OSError, subprocess.CalledProcessError):
+                head = None
+            try:
+                blobs = {}
+                # <mode> <object> <stage>\t<file>, paths are relative to the folder
+                for line in self._git('ls-files', '-s', '-z').split('\0'):
+                    if not line:
+                        continue
+                    info, relative_path = line.split('\t', 1)
+                    blobs[self._to_path(relative_path)] = info.split(' ')[1]
+                dirty = set()
+                for relative_path in self._git('diff', '--name-only', '--relative', '-z').split('\0'):
+                    if relative_path:
+                        dirty.add(self._to_path(relative_path))
+                for relative_path in self._git('ls-files', '--others', '--exclude-standard', '-z').split('\0'):
+                    if relative_path:
+                        dirty.add(self._to_path(relative_path))
+            except (OSError, subprocess.CalledProcessError) as err:
+                logger.info(f"GitChangeSourceUnavailable: {self.folder} : {err}")
+                self._available = False
+                return None
+            self._available = True
+            self._snapshot = GitSnapshot(self.folder, head, blobs, dirty)
+            self._snapshot_at = now
+            return self._snapshot
+
+
+def get_git_snapshot(path):
+    """Return the git snapshot of the configured swagger or aaz folder which contains the path.
+
+    Return None when `Config.GIT_CHANGE_DETECTION` is disabled or the folder is not a git checkout. The snapshot is
+    reused within `Config.SWAGGER_SPECS_POLL_INTERVAL` seconds.
+    """
+    if not Config.GIT_CHANGE_DETECTION:
+        return None
+    path = os.path.abspath(path)
+    for folder in (Config.SWAGGER_PATH, Config.SWAGGER_MODULE_PATH, Config.AAZ_PATH):
+        if not folder:
+            continue
+        folder = os.path.abspath(folder)
+        if path == folder or path.startswith(os.path.join(folder, '')):
+            return GitChangeSource.shared(folder).snapshot(max_age=max(Config.SWAGGER_SPECS_POLL_INTERVAL, 0))
+    return None
+
+
+def get_file_fingerprint(file_path, snapshot=None):
+    """Return the blob hash of the file from git snapshot if it is unchanged, else its size and mtime.
+
+    Raise OSError if the file does not exist.
+    """
+    if snapshot is not None:
+        fingerprint = snapshot.get_fingerprint(file_path)
+        if fingerprint is not None:
+            return fingerprint
+    stat = os.stat(file_path)
+    return [stat.st_size, stat.st_mtime_ns]
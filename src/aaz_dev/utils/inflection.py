@@ -0,0 +1,90 @@
+import atexit
+import json
+import logging
+import os
+import threading
+from functools import lru_cache
+
+import inflect
+
+from utils.config import Config
+
+logger = logging.getLogger('backend')
+
+_engine = inflect.engine()
+_engine_lock = threading.Lock()
+
+# results of the inflect engine, keyed by method name then word, which is loaded from `Config.INFLECTION_WORD_TABLE`
+# and saved back at exit
+_word_table = None
+_word_table_path = None
+_word_table_dirty = False
+_word_table_lock = threading.Lock()
+
+
+def singular_noun(word):
+    """Return the singular of a plural noun, or False if the word is not a plural noun."""
+    return _inflect('singular_noun', word)
+
+
+def plural_noun(word):
+    """Return the plural of a singular noun, or False if the word cannot be inflected."""
+    return _inflect('plural_noun', word)
+
+
+@lru_cache(maxsize=8192)
+def _inflect(method, word):
+    global _word_table_dirty
+    table = _get_word_table()
+    if table is not None:
+        with _word_table_lock:
+            words = table.setdefault(method, {})
+            if word in words:
+                return words[word]
+
+    with _engine_lock:
+        result = getattr(_engine, method)(word)
+
+    if table is not None:
+        with _word_table_lock:
+            table[method][word] = result
+            _word_table_dirty = True
+    return result
+
+
+def _get_word_table():
+    global _word_table, _word_table_path
+    if not Config.INFLECTION_WORD_TABLE:
+        return None
+    with _word_table_lock:
+        if _word_table is None or _word_table_path != Config.INFLECTION_WORD_TABLE:
+            _word_table_path = Config.INFLECTION_WORD_TABLE
+            _word_table = {}
+            if os.path.isfile(_word_table_path):
+                try:
+                    with open(_word_table_path, 'r', encoding='utf-8') as f:
+                        _word_table = json.load(f)
+                except (OSError, ValueError) as err:
+                    logger.warning(f"InvalidInflectionWordTable: {_word_table_path} : {err}")
+        return _word_table
+
+
+def save_word_table():
+    """Save the words inflected in this process to the word table file."""
+    global _word_table_dirty
+    with _word_table_lock:
+        if _word_table is None or not _word_table_dirty:
+            return
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(_word_table_path)), exist_ok=True)
+            tmp_path = f"{_word_table_path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(_word_table, f, ensure_ascii=False, sort_keys=True)
+            os.replace(tmp_path, _word_table_path)
+        except OSError as err:
+            logger.warning(f"SaveInflectionWordTableFailed: {_word_table_path} : {err}")
+            return
+        _word_table_dirty = False
+
+
+atexit.register(save_word_table)
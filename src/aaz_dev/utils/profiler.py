@@ -0,0 +1,141 @@
+import json
+import logging
+import os
+import threading
+import time
+
+from utils.config import Config
+
+logger = logging.getLogger('backend')
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        return False
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class _Span:
+    __slots__ = ('name', 'attrs', 'start', 'duration', 'children', 'resource_span')
+
+    def __init__(self, name, attrs):
+        self.name = name
+        self.attrs = attrs
+        self.start = None
+        self.duration = None
+        # the finished spans under it, only collected by the root spans
+        self.children = None
+        # the innermost span of a resource which encloses it
+        self.resource_span = None
+
+    def __enter__(self):
+        stack = _get_stack()
+        if not stack:
+            self.children = []
+        else:
+            parent = stack[-1]
+            self.resource_span = parent if 'resource' in parent.attrs else parent.resource_span
+        stack.append(self)
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.duration = time.perf_counter_ns() - self.start
+        stack = _get_stack()
+        stack.pop()
+        if stack:
+            stack[0].children.append(self)
+        else:
+            _report(self)
+        return False
+
+
+_local = threading.local()
+_trace_lock = threading.Lock()
+
+
+def _get_stack():
+    stack = getattr(_local, 'stack', None)
+    if stack is None:
+        stack = _local.stack = []
+    return stack
+
+
+def span(name, **attrs):
+    """Return a context manager to time a phase, the spans in it are nested as its children.
+
+    When `Config.PROFILE_ENABLED` is False, a shared noop context manager is returned. The root spans of every thread
+    report their phases through the `backend` logger and append them into the trace file.
+    """
+    if not Config.PROFILE_ENABLED:
+        return _NOOP_SPAN
+    return _Span(name, attrs)
+
+
+def _report(root):
+    spans = [root, *root.children]
+    phases = {}
+    # the phases of every resource, which are grouped by the innermost resource span enclosing them
+    resource_spans = [s for s in spans if 'resource' in s.attrs]
+    resource_phases = {id(s): {} for s in resource_spans}
+    for s in root.children:
+        _add_phase(phases, s)
+        if s.resource_span is not None:
+            _add_phase(resource_phases[id(s.resource_span)], s)
+
+    lines = [f"Profile: {_format_span(root)}"]
+    lines.extend(_format_phases(phases, "\t"))
+    for s in resource_spans:
+        lines.append(f"\t{_format_span(s)}")
+        lines.extend(_format_phases(resource_phases[id(s)], "\t\t"))
+    logger.info('\n'.join(lines))
+
+    _write_trace(spans)
+
+
+def _add_phase(phases, s):
+    total, count = phases.get(s.name, (0, 0))
+    phases[s.name] = (total + s.duration, count + 1)
+
+
+def _format_phases(phases, indent):
+    for name, (total, count) in sorted(phases.items(), key=lambda item: item[1][0], reverse=True):
+        yield f"{indent}{name}: {total / 1e6:.1f}ms in {count} spans"
+
+
+def _format_span(s):
+    attrs = ' '.join(f"{k}={v}" for k, v in s.attrs.items())
+    return f"{s.name} {attrs + ' ' if attrs else ''}{s.duration / 1e6:.1f}ms"
+
+
+def _write_trace(spans):
+    """Append the spans as the complete events of chrome trace format, the array is left open for appending."""
+    trace_file = Config.get_profile_trace_file()
+    pid = os.getpid()
+    tid = threading.get_ident()
+    events = ''.join(json.dumps({
+        "name": s.name,
+        "ph": "X",
+        "ts": s.start / 1e3,
+        "dur": s.duration / 1e3,
+        "pid": pid,
+        "tid": tid,
+        "args": {k: str(v) for k, v in s.attrs.items()},
+    }) + ",\n" for s in spans)
+    with _trace_lock:
+        try:
+            if os.path.dirname(trace_file):
+                os.makedirs(os.path.dirname(trace_file), exist_ok=True)
+            with open(trace_file, 'a', encoding='utf-8') as f:
+                if f.tell() == 0:
+                    f.write("[\n")
+                f.write(events)
+        except OSError as err:
+            logger.warning(f"WriteProfileTraceFailed: {trace_file} : {err}")